@@ -0,0 +1,92 @@
+"""Local follow-up selection: pick the next question without calling the LLM.
+
+Each library of candidate follow-ups (an instance's own questions plus the
+generic fallbacks) is indexed once as sparse TF-IDF vectors in an inverted
+index. Selecting a follow-up scores only the candidates that share a term
+with the participant's message, so a turn costs microseconds. Libraries are
+cached by content, so agents for the same instance share one index.
+"""
+import functools
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Optional
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+STOPWORDS = frozenset("""
+a about all also am an and any are as at be been but by can could did do does doing don't for from get got
+had has have how i i'm if in into is it it's its just me more most my no not of on or our out so some than that
+the their them then there these they this those to too up us very was we were what when where which who why
+will with would you your
+""".split())
+
+
+def _stem(word: str) -> str:
+    # Light suffix stripping so "invoices"/"invoice" and "exporting"/"export" match
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """Lower-cased, stemmed content words of ``text``."""
+    return [_stem(word) for word in _WORD.findall(text.lower()) if len(word) > 1 and word not in STOPWORDS]
+
+
+class FollowUpLibrary:
+    """Candidate follow-up questions indexed for keyword relevance."""
+
+    def __init__(self, questions: tuple):
+        self.questions = questions
+        documents = [Counter(tokenize(question)) for question in questions]
+        document_frequency = Counter(term for document in documents for term in document)
+        count = len(documents)
+        self.idf = {term: math.log((1 + count) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        # term -> [(question index, L2-normalised tf-idf weight)]
+        self.postings: dict[str, list] = defaultdict(list)
+        for index, document in enumerate(documents):
+            weights = {term: tf * self.idf[term] for term, tf in document.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                self.postings[term].append((index, weight / norm))
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def scores(self, message: str) -> dict:
+        """Relevance of each candidate sharing a term with ``message``."""
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(message)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for index, weight in self.postings[term]:
+                scores[index] += weight * idf
+        return scores
+
+    def select(self, message: str, used: set) -> Optional[int]:
+        """Index of the most relevant question not in ``used``, or None if all are used.
+
+        Without any keyword overlap the first unused question wins, so an
+        instance's own questions (listed first) are asked before generic ones.
+        """
+        best, best_score = None, 0.0
+        for index, score in self.scores(message).items():
+            if index in used:
+                continue
+            if score > best_score or (score == best_score and best is not None and index < best):
+                best, best_score = index, score
+        if best is None:
+            best = next((i for i in range(len(self.questions)) if i not in used), None)
+        return best
+
+
+@functools.lru_cache(maxsize=256)
+def get_library(questions: tuple) -> FollowUpLibrary:
+    """The shared index for a tuple of candidate questions."""
+    return FollowUpLibrary(questions)
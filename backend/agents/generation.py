@@ -0,0 +1,133 @@
+"""Per-task generation policy: model tier, output budget and stop sequences.
+
+Interview turns need one short question, quickly; summaries and insight
+extraction need a stronger model and room to write. Each task maps to a
+model tier (``LLM_MODEL_FAST`` / ``LLM_MODEL_LARGE``, both defaulting to
+``LLM_MODEL``) and a ``max_tokens`` ceiling.
+
+With ``GENERATION_ADAPTIVE_TOKENS`` on, ``max_tokens`` follows the observed
+reply lengths of the task: the p99 of the last replies times
+``GENERATION_TOKEN_HEADROOM``, never below ``GENERATION_MIN_TOKENS`` or above
+the ceiling. A truncated reply counts as twice the budget it hit, so the
+budget grows back quickly when replies get longer.
+
+Conversational tasks end at their first question (a ``?`` followed by a
+newline). The stop is applied to the stream on our side rather than sent to
+the server, which would strip the ``?`` along with the newline and report a
+natural end the same way: :func:`find_stop` locates the match, the reply
+keeps the ``?``, and closing the stream makes the server stop generating.
+"""
+import math
+import os
+import threading
+from collections import deque
+from typing import NamedTuple, Optional
+
+from . import llm_client
+from ..telemetry import metrics
+
+GENERATION_ADAPTIVE_TOKENS = os.getenv("GENERATION_ADAPTIVE_TOKENS", "true").lower() == "true"
+GENERATION_TOKEN_HEADROOM = float(os.getenv("GENERATION_TOKEN_HEADROOM", "1.5"))
+GENERATION_MIN_TOKENS = int(os.getenv("GENERATION_MIN_TOKENS", "48"))
+GENERATION_WINDOW = int(os.getenv("GENERATION_WINDOW", "200"))
+GENERATION_MIN_SAMPLES = int(os.getenv("GENERATION_MIN_SAMPLES", "20"))
+GENERATION_STOP_AFTER_QUESTION = os.getenv("GENERATION_STOP_AFTER_QUESTION", "true").lower() == "true"
+
+# Ends generation once the model finishes its first question and moves on
+QUESTION_STOP = ("?\n",)
+
+
+def tier_model(tier: str) -> str:
+    """Model for a tier: ``LLM_MODEL_FAST`` / ``LLM_MODEL_LARGE``, else ``LLM_MODEL``."""
+    return os.getenv(f"LLM_MODEL_{tier.upper()}") or llm_client.default_model()
+
+
+class TaskPolicy:
+    """Static settings of one kind of completion."""
+
+    __slots__ = ("tier", "max_tokens", "stop", "adaptive")
+
+    def __init__(self, tier: str, max_tokens: int, stop: tuple = (), adaptive: bool = True):
+        self.tier = tier
+        self.max_tokens = max_tokens
+        self.stop = stop if GENERATION_STOP_AFTER_QUESTION else ()
+        self.adaptive = adaptive
+
+
+TASKS = {
+    "turn": TaskPolicy("fast", 500, QUESTION_STOP),
+    "opening": TaskPolicy("fast", 200, QUESTION_STOP),
+    "warm_up": TaskPolicy("fast", 1, adaptive=False),
+    "persona": TaskPolicy("fast", 150),
+    "summary": TaskPolicy("large", 1000),
+    "insights": TaskPolicy("large", 1500),
+}
+
+
+class GenerationParams(NamedTuple):
+    model: str
+    max_tokens: int
+    stop: tuple
+
+
+class ReplyLengths:
+    """Recent completion lengths of one task."""
+
+    def __init__(self, window: int = GENERATION_WINDOW):
+        self._lengths: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def observe(self, completion_tokens: int, truncated: bool = False):
+        with self._lock:
+            self._lengths.append(completion_tokens * 2 if truncated else completion_tokens)
+
+    def budget(self, ceiling: int) -> int:
+        """``max_tokens`` for the next completion."""
+        with self._lock:
+            if len(self._lengths) < GENERATION_MIN_SAMPLES:
+                return ceiling
+            ordered = sorted(self._lengths)
+        p99 = ordered[math.ceil(0.99 * len(ordered)) - 1]
+        return max(GENERATION_MIN_TOKENS, min(ceiling, math.ceil(p99 * GENERATION_TOKEN_HEADROOM)))
+
+
+_lengths: dict[str, ReplyLengths] = {task: ReplyLengths() for task in TASKS}
+
+
+def params_for(task: str, model: Optional[str] = None) -> GenerationParams:
+    """Model, ``max_tokens`` and stop sequences for the next ``task`` completion.
+
+    ``model`` overrides the tier (an agent configured with an explicit model).
+    """
+    policy = TASKS[task]
+    max_tokens = policy.max_tokens
+    if GENERATION_ADAPTIVE_TOKENS and policy.adaptive:
+        max_tokens = _lengths[task].budget(policy.max_tokens)
+    return GenerationParams(model or tier_model(policy.tier), max_tokens, policy.stop)
+
+
+def observe(task: str, completion_tokens: int, finish_reason: Optional[str]):
+    """Record the length of a finished completion."""
+    if TASKS[task].adaptive:
+        _lengths[task].observe(completion_tokens, truncated=finish_reason == "length")
+
+
+def find_stop(task: str, text: str, start: int = 0) -> Optional[int]:
+    """Length of the reply if ``text`` reaches a stop sequence of ``task``, else None.
+
+    Only matches ending after ``start`` are looked for, so a stream can be
+    checked chunk by chunk. The reply keeps the stop sequence up to its
+    trailing whitespace, so a question keeps its ``?``.
+    """
+    for sequence in TASKS[task].stop:
+        index = text.find(sequence, max(0, start - len(sequence) + 1))
+        if index >= 0:
+            return index + len(sequence.rstrip())
+    return None
+
+
+for _task in TASKS:
+    metrics.LLM_MAX_TOKENS.set_function(lambda task=_task: params_for(task).max_tokens, task=_task)
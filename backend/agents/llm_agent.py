@@ -1,8 +1,10 @@
 """LLM-powered agent implementation using LiteLLM."""
 import os
-import random
+import time
 from typing import Optional
-from .prompts import EXPLORER_PROMPT
+from . import followups, generation, llm_cache, llm_client, turn_log
+from .prompts import EXPLORER_PROMPT, OPENING_INSTRUCTION
+from ..telemetry import metrics, tracing
 
 
 class LLMAgent:
@@ -22,6 +24,9 @@ class LLMAgent:
         "What do you do when that happens?",
     ]
 
+    # Generation policy (model tier, output budget, stop) of a conversational turn
+    turn_task = "turn"
+
     def __init__(
         self,
         agent_type: str,
@@ -31,13 +36,14 @@ class LLMAgent:
     ):
         self.agent_type = "explorer"  # Always explorer now
         self.context = context
-        self.conversation_history = []
+        self.history = turn_log.TurnLog()
         self.turn_count = 0
         self.max_turns = context.get("max_turns", 20)
 
         # LLM configuration
-        self.model = model or os.getenv("LLM_MODEL", "ollama/llama3.2")
-        self.api_base = api_base or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        # An explicit model overrides the per-task tiers of the generation policy
+        self.model = model
+        self.api_base = api_base or llm_client.default_api_base()
         self.use_mock = os.getenv("USE_MOCK_LLM", "false").lower() == "true"
 
         # Build system prompt
@@ -46,6 +52,37 @@ class LLMAgent:
         # Track if LLM is available
         self._llm_available = None
 
+        # Usage for this conversation
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.fallback_count = 0
+
+        # Local follow-ups, shared per question set; indices already asked
+        self._follow_ups = followups.get_library(self._follow_up_candidates())
+        self._used_follow_ups: set[int] = set()
+
+        # Opening pre-generated by prepare(), if any
+        self._prepared_opening: Optional[str] = None
+        self.personalized_opening = os.getenv("LLM_PERSONALIZED_OPENING", "false").lower() == "true"
+
+    @property
+    def conversation_history(self) -> list:
+        """The conversation as message dicts (built on each access)."""
+        return list(self.history)
+
+    @staticmethod
+    def participant_context(participant: dict, instance: dict) -> dict:
+        """Agent context for interviewing ``participant`` on ``instance``."""
+        return {
+            "participant_name": participant.get("name", "Participant"),
+            "participant_background": participant.get("background", ""),
+            "objective": instance.get("objective", ""),
+            "timebox_minutes": instance.get("timebox_minutes", 10),
+            "max_turns": instance.get("max_turns", 20),
+            "instance_id": instance["id"],
+            "questions": instance.get("questions") or [],
+        }
+
     def _build_system_prompt(self) -> str:
         """Build the system prompt with context variables."""
         # Fill in context variables with defaults for missing keys
@@ -73,69 +110,178 @@ class LLMAgent:
 
     def get_opening_message(self) -> str:
         """Generate an opening message for the conversation."""
+        if self._prepared_opening:
+            return self._prepared_opening
         objective = self.context.get('objective', 'your daily workflows')
         return f"Hey! Thanks for chatting with me. I'm trying to understand how your team handles {objective} so we can find opportunities to make things easier. To kick things off - what's a task you do regularly that feels repetitive or takes longer than it should?"
 
+    def _follow_up_candidates(self) -> tuple:
+        """The instance's questions, then the generic fallbacks, without duplicates."""
+        return tuple(dict.fromkeys([*self.context.get("questions", []), *self.FALLBACK_RESPONSES]))
+
     def _get_fallback_response(self, user_message: str) -> str:
-        """Get a contextual fallback response when LLM is unavailable."""
-        # Try to pick a response that hasn't been used recently
-        used = [msg["content"] for msg in self.conversation_history if msg["role"] == "assistant"]
-        available = [r for r in self.FALLBACK_RESPONSES if r not in used]
+        """Pick the unused follow-up most relevant to the participant's message."""
+        index = self._follow_ups.select(user_message, self._used_follow_ups)
+        if index is None:
+            # Every follow-up has been asked; start over
+            self._used_follow_ups.clear()
+            index = self._follow_ups.select(user_message, self._used_follow_ups)
+        self._used_follow_ups.add(index)
+        return self._follow_ups.questions[index]
+
+    async def warm_up(self) -> None:
+        """Load the model and prefill the system prompt before the first turn.
+
+        A one-token completion over the system prompt makes the LLM server load
+        the model and cache the prompt prefix, so the participant's first reply
+        only pays for its own tokens.
+        """
+        if self.use_mock:
+            return
+        await self._call_llm([{"role": "system", "content": self.system_prompt}], task="warm_up")
+
+    async def prepare(self) -> None:
+        """Warm the model and, if enabled, pre-generate a personalized opening."""
+        if self.use_mock:
+            return
+        if not self.personalized_opening:
+            await self.warm_up()
+            return
 
-        if not available:
-            available = self.FALLBACK_RESPONSES
+        # Generating the opening also prefills the system prompt
+        opening = await self._call_llm([
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": OPENING_INSTRUCTION},
+        ], task="opening")
+        if opening:
+            self._prepared_opening = opening.strip()
 
-        return random.choice(available)
+    async def _call_llm(self, messages: list, task: str = "turn") -> Optional[str]:
+        """Stream a completion over the shared connection pool and return the text.
 
-    def _call_llm_sync(self, messages: list) -> Optional[str]:
-        """Call the LLM synchronously and return the response."""
+        ``task`` selects the model tier, ``max_tokens`` and stop sequences (see
+        ``generation``). Goes through the response cache first when
+        ``LLM_CACHE_MODE`` is set.
+        """
+        model, max_tokens, stop = generation.params_for(task, self.model)
+        params = {"temperature": 0.7}
+        cache = llm_cache.get_cache()
         try:
-            from litellm import completion
-
-            response = completion(
-                model=self.model,
-                messages=messages,
-                api_base=self.api_base,
-                temperature=0.7,
-                max_tokens=500,
-            )
-            return response.choices[0].message.content
+            with metrics.timed("llm_total"), tracing.span(
+                "llm.completion",
+                model=model,
+                task=task,
+                max_tokens=max_tokens,
+                instance_id=self.context.get("instance_id"),
+            ) as span:
+                if cache is not None:
+                    # The adaptive max_tokens stays out of the key so recordings keep matching
+                    key_params = {**params, "stop": list(stop)} if stop else params
+                    key = llm_cache.cache_key(model, messages, task=task, **key_params)
+                    cached = await cache.lookup(key)
+                    span.set_attribute("llm.cache", "hit" if cached else "miss")
+                    if cached is not None:
+                        self.prompt_tokens += cached["prompt_tokens"]
+                        self.completion_tokens += cached["completion_tokens"]
+                        return cached["response"]
+                    if cache.replay_only:
+                        return None
+
+                start = time.perf_counter()
+                response = await llm_client.acompletion(
+                    model=model,
+                    messages=messages,
+                    api_base=self.api_base,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    max_tokens=max_tokens,
+                    **params,
+                )
+                text = ""
+                # Content chunks received; about one token each
+                streamed = 0
+                usage = None
+                finish_reason = None
+                async for chunk in response:
+                    content = None
+                    if chunk.choices:
+                        content = chunk.choices[0].delta.content
+                        finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    if content:
+                        if not text:
+                            ttft = time.perf_counter() - start
+                            metrics.observe_stage("llm_ttft", ttft)
+                            span.set_attribute("llm.ttft_ms", round(ttft * 1000, 3))
+                        received = len(text)
+                        text += content
+                        streamed += 1
+                        end = generation.find_stop(task, text, received) if stop else None
+                        if end is not None:
+                            # Hanging up stops the generation on the server
+                            text, finish_reason = text[:end], "stop"
+                            await response.aclose()
+                            break
+                    usage = getattr(chunk, "usage", None) or usage
+
+                span.set_attribute("llm.finish_reason", finish_reason)
+                if usage:
+                    span.set_attribute("llm.prompt_tokens", usage.prompt_tokens)
+                    span.set_attribute("llm.completion_tokens", usage.completion_tokens)
+
+            if usage:
+                self.prompt_tokens += usage.prompt_tokens
+                self.completion_tokens += usage.completion_tokens
+                metrics.LLM_TOKENS.inc(usage.prompt_tokens, model=model, direction="in")
+                metrics.LLM_TOKENS.inc(usage.completion_tokens, model=model, direction="out")
+                generation.observe(task, usage.completion_tokens, finish_reason)
+            elif streamed:
+                # No usage report, as when the stream was closed at its stop
+                self.completion_tokens += streamed
+                metrics.LLM_TOKENS.inc(streamed, model=model, direction="out")
+                generation.observe(task, streamed, finish_reason)
+            text = text.strip() or None
+            # A reply cut off at max_tokens would be replayed truncated even once the budget grows
+            if cache is not None and text and finish_reason != "length":
+                cache.put(
+                    key, model, text,
+                    usage.prompt_tokens if usage else 0,
+                    usage.completion_tokens if usage else streamed,
+                )
+            return text
         except Exception as e:
             print(f"LLM call failed: {e}")
             return None
 
-    async def chat(self, user_message: str) -> str:
-        """Process a user message and return agent response."""
+    async def chat(self, user_message: str, local_only: bool = False) -> str:
+        """Process a user message and return agent response.
+
+        ``local_only`` skips the LLM and answers with a local follow-up, e.g.
+        while the server is shedding load.
+        """
         # Check guardrails
-        passed, guardrail_response = self._check_guardrails(user_message)
+        with metrics.timed("guardrails"):
+            passed, guardrail_response = self._check_guardrails(user_message)
         if not passed:
             return guardrail_response
 
         # Add user message to history
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
+        self.history.append("user", user_message)
 
         assistant_message = None
 
         # Try LLM first if not in mock mode
-        if not self.use_mock:
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                *self.conversation_history
-            ]
-            assistant_message = self._call_llm_sync(messages)
+        if not self.use_mock and not local_only:
+            assistant_message = await self._call_llm(self.history.messages(self.system_prompt), self.turn_task)
 
         # Fallback to predefined responses if LLM fails or mock mode
         if assistant_message is None:
+            reason = "mock" if self.use_mock else "local" if local_only else "llm_error"
+            metrics.LLM_FALLBACKS.inc(reason=reason)
+            self.fallback_count += 1
             assistant_message = self._get_fallback_response(user_message)
 
         # Add to history
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": assistant_message
-        })
+        self.history.append("assistant", assistant_message)
 
         self.turn_count += 1
         return assistant_message
@@ -145,6 +291,6 @@ class LLMAgent:
         return {
             "agent_type": self.agent_type,
             "turn_count": self.turn_count,
-            "messages": len(self.conversation_history),
+            "messages": len(self.history) + self.history.dropped,
             "max_turns": self.max_turns,
         }
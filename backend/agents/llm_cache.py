@@ -0,0 +1,178 @@
+"""Content-addressed cache of LLM responses, with record and replay.
+
+Entries are keyed by a hash of the model, the messages and the sampling
+parameters, so identical conversations (previews, simulations, load tests)
+get the same answer without another completion. ``LLM_CACHE_MODE`` picks the
+behaviour:
+
+- ``off`` (default): no caching
+- ``memory``: in-process LRU of ``LLM_CACHE_MAX_ENTRIES`` responses
+- ``record``: LRU backed by the append-only segment file ``LLM_CACHE_FILE``;
+  misses go to the LLM and the response is appended
+- ``replay``: serve responses from ``LLM_CACHE_FILE`` only; a miss returns
+  nothing (the agent falls back) and no LLM server is contacted. Each hit
+  waits ``LLM_CACHE_REPLAY_LATENCY_MS`` plus the recorded completion tokens
+  at ``LLM_CACHE_REPLAY_TOKENS_PER_SECOND`` to mimic a real model.
+
+    LLM_CACHE_MODE=record python -m backend.scripts.simulate_interviews --interviews 20
+    LLM_CACHE_MODE=replay python -m backend.scripts.simulate_interviews --interviews 20
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from ..telemetry import metrics
+
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off").lower()
+LLM_CACHE_FILE = Path(os.getenv("LLM_CACHE_FILE", "llm_cache.jsonl"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_REPLAY_LATENCY_MS = float(os.getenv("LLM_CACHE_REPLAY_LATENCY_MS", "0"))
+LLM_CACHE_REPLAY_TOKENS_PER_SECOND = float(os.getenv("LLM_CACHE_REPLAY_TOKENS_PER_SECOND", "0"))
+
+MODES = ("off", "memory", "record", "replay")
+
+
+def cache_key(model: str, messages: list, **params) -> str:
+    """SHA-256 of the model, messages and sampling parameters in canonical JSON."""
+    canonical = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """LRU of decoded entries in front of an optional append-only segment file.
+
+    The segment holds one JSON entry per line; an index of byte offsets keeps
+    every recorded key addressable while only ``max_entries`` stay decoded in
+    memory. When a key is recorded twice the later line wins.
+    """
+
+    def __init__(
+        self,
+        mode: str = LLM_CACHE_MODE,
+        path: Optional[Path] = LLM_CACHE_FILE,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        replay_latency_ms: float = LLM_CACHE_REPLAY_LATENCY_MS,
+        replay_tokens_per_second: float = LLM_CACHE_REPLAY_TOKENS_PER_SECOND,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM_CACHE_MODE {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.path = Path(path) if path and mode in ("record", "replay") else None
+        self.max_entries = max_entries
+        self.replay_latency_ms = replay_latency_ms
+        self.replay_tokens_per_second = replay_tokens_per_second
+        self._entries: OrderedDict = OrderedDict()
+        self._offsets: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self._load_index()
+
+    @property
+    def replay_only(self) -> bool:
+        return self.mode == "replay"
+
+    def __len__(self) -> int:
+        return len(self._offsets) if self.path is not None else len(self._entries)
+
+    def _load_index(self):
+        if not self.path.exists():
+            if self.replay_only:
+                print(f"LLM_CACHE_MODE=replay but {self.path} does not exist; every call will miss")
+            return
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final line from an interrupted recording; drop it so appends start on a new line
+                    if not self.replay_only:
+                        os.truncate(self.path, offset)
+                    break
+                try:
+                    key = json.loads(line)["key"]
+                except (ValueError, KeyError):
+                    key = None
+                if key:
+                    self._offsets[key] = (offset, len(line))
+                offset += len(line)
+
+    def _read_segment(self, key: str) -> Optional[dict]:
+        location = self._offsets.get(key)
+        if location is None:
+            return None
+        offset, length = location
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def _remember(self, key: str, entry: dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        """The cached entry for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self.path is not None:
+                entry = self._read_segment(key)
+                if entry is not None:
+                    self._remember(key, entry)
+        metrics.LLM_CACHE.inc(result="hit" if entry is not None else "miss")
+        return entry
+
+    async def lookup(self, key: str) -> Optional[dict]:
+        """``get``, plus the synthetic model latency when replaying a hit."""
+        entry = self.get(key)
+        if entry is not None and self.replay_only:
+            delay = self.replay_latency_ms / 1000
+            if self.replay_tokens_per_second > 0:
+                delay += entry.get("completion_tokens", 0) / self.replay_tokens_per_second
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return entry
+
+    def put(self, key: str, model: str, response: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        """Cache a response; in record mode it is also appended to the segment."""
+        if self.replay_only:
+            return
+        entry = {
+            "key": key,
+            "model": model,
+            "response": response,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            self._remember(key, entry)
+            if self.path is not None:
+                line = (json.dumps(entry, ensure_ascii=False) + "\n").encode()
+                with open(self.path, "ab") as f:
+                    offset = f.tell()
+                    f.write(line)
+                self._offsets[key] = (offset, len(line))
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_cache() -> Optional[LLMResponseCache]:
+    """The process-wide cache, or None when ``LLM_CACHE_MODE=off``."""
+    global _cache
+    if LLM_CACHE_MODE == "off":
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache()
+    return _cache
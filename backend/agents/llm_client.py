@@ -0,0 +1,201 @@
+"""Process-wide LLM client: lazy LiteLLM import, pooled HTTP and model warm-up.
+
+LiteLLM takes seconds to import, so it is loaded once per process, either
+eagerly by the app's lifespan hook or on first use, never per request.
+
+Every completion goes through one shared ``httpx.AsyncClient`` so turns reuse
+keep-alive connections to the LLM server instead of paying a TCP (and TLS)
+handshake each time. The pool is bounded per endpoint by
+``LLM_HTTP_MAX_CONNECTIONS``, and the time a request waits for a connection
+is recorded as the ``queue_wait`` stage. HTTP/2 is negotiated on TLS
+endpoints when ``LLM_HTTP2`` is on and the ``h2`` package is installed.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from ..telemetry import metrics
+
+_litellm = None
+_lock = threading.Lock()
+
+# Seconds spent importing LiteLLM, for the readiness report
+import_seconds: Optional[float] = None
+
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", str(LLM_HTTP_MAX_CONNECTIONS)))
+LLM_HTTP_KEEPALIVE_SECONDS = float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "60"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+
+# Providers LiteLLM serves through its own httpx handler, which accepts the shared client
+_HANDLER_PROVIDERS = ("ollama", "ollama_chat")
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http_handler = None
+_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def default_model() -> str:
+    return os.getenv("LLM_MODEL", "ollama/llama3.2")
+
+
+def default_api_base() -> str:
+    return os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
+
+def get_litellm():
+    """Import LiteLLM once and return the module."""
+    global _litellm, import_seconds
+    if _litellm is None:
+        with _lock:
+            if _litellm is None:
+                # Use the bundled model cost map instead of fetching it over the network at import
+                os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+                start = time.perf_counter()
+                import litellm
+
+                import_seconds = time.perf_counter() - start
+                _litellm = litellm
+    return _litellm
+
+
+def is_loaded() -> bool:
+    return _litellm is not None
+
+
+def _http2_available() -> bool:
+    if not LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def _trace(event: str, info: dict):
+    # httpcore connection events; a request that skips connect_tcp reused a pooled connection
+    if event == "connection.connect_tcp.complete":
+        metrics.LLM_HTTP_CONNECTIONS.inc()
+    elif event in ("http11.send_request_headers.started", "http2.send_request_headers.started"):
+        metrics.LLM_HTTP_REQUESTS.inc(protocol="HTTP/2" if event.startswith("http2") else "HTTP/1.1")
+
+
+# First event of a request that holds a pool connection: opening a new one, or sending on one
+_CONNECTION_ACQUIRED = (
+    "connection.connect_tcp.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+)
+
+
+async def _attach_trace(request: httpx.Request):
+    # queue_wait: time a request waits for a pool connection (bounded by LLM_HTTP_MAX_CONNECTIONS)
+    queued_at = time.perf_counter()
+    waiting = True
+
+    async def trace(event: str, info: dict):
+        nonlocal waiting
+        if waiting and event in _CONNECTION_ACQUIRED:
+            waiting = False
+            metrics.observe_stage("queue_wait", time.perf_counter() - queued_at)
+        await _trace(event, info)
+
+    request.extensions["trace"] = trace
+
+
+def create_http_client(**overrides) -> httpx.AsyncClient:
+    """Build an ``httpx.AsyncClient`` with the configured pool limits and reuse tracking."""
+    options = {
+        "limits": httpx.Limits(
+            max_connections=LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_HTTP_KEEPALIVE_SECONDS,
+        ),
+        "timeout": httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0),
+        "http2": _http2_available(),
+        "event_hooks": {"request": [_attach_trace]},
+        "follow_redirects": True,
+    }
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """The shared client for the running event loop, created on first use.
+
+    Pooled connections belong to the loop that opened them, so a client left
+    over from a previous loop (e.g. a benchmark's earlier ``asyncio.run``) is
+    closed and replaced rather than reused.
+    """
+    global _http_client, _http_handler, _http_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_loop is not loop:
+        if _http_client is not None and not _http_client.is_closed:
+            await _close_quietly(_http_client)
+        _http_client = create_http_client()
+        _http_handler = None
+        _http_loop = loop
+    return _http_client
+
+
+async def _close_quietly(client: httpx.AsyncClient):
+    try:
+        await client.aclose()
+    except Exception:
+        # Connections opened on a loop that has since closed cannot shut down cleanly
+        pass
+
+
+async def _handler():
+    """LiteLLM's HTTP handler wrapping the shared client, for httpx-based providers like Ollama."""
+    global _http_handler
+    client = await get_http_client()
+    if _http_handler is None:
+        from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+
+        handler = AsyncHTTPHandler(timeout=client.timeout)
+        # The handler always builds a client of its own; close it before swapping in the shared one
+        await handler.close()
+        handler.client = client
+        _http_handler = handler
+    return _http_handler
+
+
+async def aclose():
+    """Close the shared HTTP client; called from the app's lifespan on shutdown."""
+    global _http_client, _http_handler, _http_loop
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = _http_handler = _http_loop = None
+
+
+async def acompletion(**kwargs):
+    """Call ``litellm.acompletion`` over the shared connection pool."""
+    # The first call may still have to import LiteLLM; keep that off the event loop
+    litellm = _litellm or await asyncio.to_thread(get_litellm)
+    # OpenAI-compatible providers read the session from the module, httpx-based ones take a handler
+    litellm.aclient_session = await get_http_client()
+    if kwargs.get("model", "").split("/", 1)[0] in _HANDLER_PROVIDERS:
+        kwargs.setdefault("client", await _handler())
+    return await litellm.acompletion(**kwargs)
+
+
+async def warm_up(model: Optional[str] = None, api_base: Optional[str] = None) -> bool:
+    """Send a one-token completion so the server loads the model and a connection is open."""
+    try:
+        await acompletion(
+            model=model or default_model(),
+            api_base=api_base or default_api_base(),
+            messages=[{"role": "user", "content": "Hi"}],
+            max_tokens=1,
+        )
+        return True
+    except Exception as e:
+        print(f"LLM warm-up failed: {e}")
+        return False
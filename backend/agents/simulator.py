@@ -0,0 +1,161 @@
+"""Synthetic interviews: an LLM persona answers the real Explorer agent.
+
+Used to check an instance's prompt before it goes live and to find how many
+concurrent interviews an LLM server sustains. Interviews run on a pool of
+asyncio workers; every agent turn waits for one of ``llm_concurrency``
+slots, so the number of in-flight LLM calls stays bounded however many
+interviews are open. Nothing is written to the database.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from .llm_agent import LLMAgent
+from .prompts import PARTICIPANT_PERSONA_PROMPT
+
+# Persona backgrounds cycled across simulated participants
+DEFAULT_BACKGROUNDS = [
+    "Accounts payable clerk at a 200-person logistics company; lives in the ERP and Excel",
+    "Sales operations analyst who builds the weekly pipeline report by hand",
+    "Customer support team lead triaging tickets across email, Zendesk and Slack",
+    "HR coordinator onboarding 15 new hires a month with paper forms and a shared drive",
+    "Warehouse shift supervisor reconciling inventory counts against the WMS",
+    "Marketing coordinator assembling campaign performance decks from five dashboards",
+    "IT helpdesk technician resetting accounts and provisioning laptops",
+    "Finance manager closing the books at month end with a team of three",
+    "Procurement specialist chasing purchase order approvals over email",
+    "Clinic office manager scheduling patients and handling insurance paperwork",
+]
+
+
+class PersonaAgent(LLMAgent):
+    """Plays the participant: answers the interviewer's questions in character."""
+
+    # Canned answers used in mock mode or when the LLM fails
+    FALLBACK_RESPONSES = [
+        "Every Monday I export last week's numbers and paste them into a spreadsheet.",
+        "It usually takes a couple of hours, more if the export breaks.",
+        "I check each row by hand because the IDs never match between the two systems.",
+        "When something's wrong I email the other team and wait for them to fix it.",
+        "I built a macro that helps, but it breaks whenever someone changes the columns.",
+        "Honestly it depends on the week. Month end is the worst.",
+        "My manager needs the final version by Tuesday noon, so there's always a rush.",
+        "Last time it went wrong we sent the wrong totals to a customer.",
+    ]
+
+    turn_task = "persona"
+
+    def _build_system_prompt(self) -> str:
+        return PARTICIPANT_PERSONA_PROMPT.format(
+            participant_name=self.context.get("participant_name", "Participant"),
+            participant_background=self.context.get("participant_background", "Not provided"),
+            objective=self.context.get("objective", "General process discovery"),
+        )
+
+    def _follow_up_candidates(self) -> tuple:
+        # Canned answers only; the instance's questions are the interviewer's
+        return tuple(self.FALLBACK_RESPONSES)
+
+    def _check_guardrails(self, message: str) -> tuple[bool, Optional[str]]:
+        # The interviewer's turn limit ends the conversation, not the persona's
+        return True, None
+
+
+def persona_participants(count: int, backgrounds: Optional[list] = None) -> list:
+    """``count`` synthetic participant rows cycling through ``backgrounds``."""
+    backgrounds = backgrounds or DEFAULT_BACKGROUNDS
+    return [
+        {"id": i + 1, "name": f"Sim {i + 1}", "background": backgrounds[i % len(backgrounds)]}
+        for i in range(count)
+    ]
+
+
+async def _timed_turn(agent: LLMAgent, message: str, llm_slots: asyncio.Semaphore) -> tuple:
+    """Run one agent turn inside an LLM slot; returns (reply, wait_seconds, turn_seconds)."""
+    queued = time.perf_counter()
+    async with llm_slots:
+        started = time.perf_counter()
+        reply = await agent.chat(message)
+    return reply, started - queued, time.perf_counter() - started
+
+
+async def simulate_interview(
+    instance: dict,
+    participant: dict,
+    turns: int,
+    llm_slots: asyncio.Semaphore,
+    keep_transcript: bool = False,
+) -> dict:
+    """One synthetic interview of up to ``turns`` participant answers."""
+    context = LLMAgent.participant_context(participant, instance)
+    interviewer = LLMAgent(agent_type="explorer", context=context)
+    persona = PersonaAgent(agent_type="explorer", context=dict(context, max_turns=turns))
+
+    record = {
+        "participant_id": participant["id"],
+        "background": participant["background"],
+        "turns": 0,
+        "interviewer_seconds": [],
+        "persona_seconds": [],
+        "llm_wait_seconds": [],
+        "error": None,
+    }
+    started = time.perf_counter()
+    question = interviewer.get_opening_message()
+    transcript = [{"role": "assistant", "content": question}]
+    try:
+        while record["turns"] < turns and interviewer.turn_count < interviewer.max_turns:
+            answer, wait, seconds = await _timed_turn(persona, question, llm_slots)
+            record["persona_seconds"].append(seconds)
+            record["llm_wait_seconds"].append(wait)
+
+            question, wait, seconds = await _timed_turn(interviewer, answer, llm_slots)
+            record["interviewer_seconds"].append(seconds)
+            record["llm_wait_seconds"].append(wait)
+            record["turns"] += 1
+            transcript += [{"role": "user", "content": answer}, {"role": "assistant", "content": question}]
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    record.update({
+        "duration_seconds": time.perf_counter() - started,
+        "interviewer_fallbacks": interviewer.fallback_count,
+        "persona_fallbacks": persona.fallback_count,
+        "interviewer_tokens": {"in": interviewer.prompt_tokens, "out": interviewer.completion_tokens},
+        "persona_tokens": {"in": persona.prompt_tokens, "out": persona.completion_tokens},
+    })
+    if keep_transcript:
+        record["transcript"] = transcript
+    return record
+
+
+async def run_simulation(
+    instance: dict,
+    interviews: int,
+    workers: int = 20,
+    llm_concurrency: int = 4,
+    turns: int = 6,
+    backgrounds: Optional[list] = None,
+    keep_transcripts: bool = False,
+) -> list:
+    """Run ``interviews`` synthetic interviews on ``workers`` workers.
+
+    Returns one record per interview, in completion order.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for participant in persona_participants(interviews, backgrounds):
+        queue.put_nowait(participant)
+
+    llm_slots = asyncio.Semaphore(llm_concurrency)
+    records = []
+
+    async def worker():
+        while True:
+            try:
+                participant = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            records.append(await simulate_interview(instance, participant, turns, llm_slots, keep_transcripts))
+
+    await asyncio.gather(*(worker() for _ in range(min(workers, interviews))))
+    return records
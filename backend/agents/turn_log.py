@@ -0,0 +1,67 @@
+"""Compact conversation log for live agents.
+
+Every live session keeps its conversation in memory as LLM context. As a
+list of ``{"role": ..., "content": ...}`` dicts, each message costs a dict
+on top of its text, which dominates per-session memory at thousands of
+sessions. :class:`TurnLog` keeps one byte per message for the role and one
+list of texts, appends without copying, and builds message dicts only when a
+completion is requested.
+
+``AGENT_HISTORY_MAX_CHARS`` caps the text a session keeps: past it, the
+oldest turns are dropped from the LLM context (the database still has the
+full transcript). 0 keeps everything.
+"""
+import os
+from typing import Iterator, Optional
+
+AGENT_HISTORY_MAX_CHARS = int(os.getenv("AGENT_HISTORY_MAX_CHARS", "0"))
+
+ROLES = ("user", "assistant")
+_ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+_USER = _ROLE_CODES["user"]
+
+
+class TurnLog:
+    """Roles and texts of a conversation, oldest first."""
+
+    __slots__ = ("_roles", "_contents", "_chars", "max_chars", "dropped")
+
+    def __init__(self, max_chars: int = AGENT_HISTORY_MAX_CHARS):
+        self._roles = bytearray()
+        self._contents: list[str] = []
+        self._chars = 0
+        self.max_chars = max_chars
+        # Messages trimmed off the front by the budget
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def __iter__(self) -> Iterator[dict]:
+        for code, content in zip(self._roles, self._contents):
+            yield {"role": ROLES[code], "content": content}
+
+    def append(self, role: str, content: str):
+        self._roles.append(_ROLE_CODES[role])
+        self._contents.append(content)
+        self._chars += len(content)
+        if self.max_chars and self._chars > self.max_chars:
+            self._trim()
+
+    def _drop_oldest(self):
+        del self._roles[0]
+        self._chars -= len(self._contents.pop(0))
+        self.dropped += 1
+
+    def _trim(self):
+        while self._chars > self.max_chars and len(self._contents) > 1:
+            self._drop_oldest()
+        # The context should open with a participant message
+        while len(self._contents) > 1 and self._roles[0] != _USER:
+            self._drop_oldest()
+
+    def messages(self, system_prompt: Optional[str] = None) -> list:
+        """Messages for a completion, optionally after the system prompt."""
+        messages = [{"role": "system", "content": system_prompt}] if system_prompt is not None else []
+        messages.extend(self)
+        return messages
@@ -0,0 +1,240 @@
+"""Admission control for participant traffic: rate limits and load shedding.
+
+Every participant-facing request is charged against two token buckets, one
+for the participant (their link token, or their session for chat/end) and
+one for the client IP; an empty bucket answers 429 with ``Retry-After``.
+
+On top of that, the middleware watches the latency of chat turns served by
+the LLM over the last ``ADMISSION_WINDOW_SECONDS``. While their p95 is above
+``ADMISSION_CHAT_SLO_MS`` the server protects interviews already in
+progress: chat turns are answered by the local follow-up selector instead of
+the LLM, and new interviews (opening a link, starting) get 429. Ending a
+session is always admitted. Requests outside the interview routes are not
+controlled.
+"""
+import contextvars
+import math
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+
+from ..telemetry import metrics
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_CHAT_SLO_MS = float(os.getenv("ADMISSION_CHAT_SLO_MS", "8000"))
+ADMISSION_WINDOW_SECONDS = float(os.getenv("ADMISSION_WINDOW_SECONDS", "30"))
+ADMISSION_MIN_SAMPLES = int(os.getenv("ADMISSION_MIN_SAMPLES", "20"))
+ADMISSION_IP_RATE = float(os.getenv("ADMISSION_IP_RATE", "10"))
+ADMISSION_IP_BURST = float(os.getenv("ADMISSION_IP_BURST", "50"))
+ADMISSION_PARTICIPANT_RATE = float(os.getenv("ADMISSION_PARTICIPANT_RATE", "1"))
+ADMISSION_PARTICIPANT_BURST = float(os.getenv("ADMISSION_PARTICIPANT_BURST", "10"))
+ADMISSION_MAX_BUCKETS = int(os.getenv("ADMISSION_MAX_BUCKETS", "10000"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "5"))
+# Take the client IP from X-Forwarded-For (only behind a trusted proxy)
+ADMISSION_TRUST_FORWARDED = os.getenv("ADMISSION_TRUST_FORWARDED", "false").lower() == "true"
+
+# Request classes, highest priority first
+END = "end"
+CHAT = "chat"
+START = "start"
+OPEN = "open"
+
+# (method, path pattern, request class, participant key); the group is the session id or link token
+_ROUTES = [
+    ("POST", re.compile(r"^/api/sessions/(\d+)/end$"), END, "session"),
+    ("POST", re.compile(r"^/api/sessions/(\d+)/chat$"), CHAT, "session"),
+    ("POST", re.compile(r"^/api/interview/([^/]+)/start$"), START, "token"),
+    ("GET", re.compile(r"^/api/interview/([^/]+)$"), OPEN, "token"),
+]
+
+# Set for chat turns that should skip the LLM; read by the chat route
+_degraded: contextvars.ContextVar = contextvars.ContextVar("admission_degraded", default=False)
+
+
+def degraded() -> bool:
+    """Whether the current request should be answered without the LLM."""
+    return _degraded.get()
+
+
+class TokenBucket:
+    """``rate`` tokens per second up to ``burst``."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Spend one token; returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class RateLimiter:
+    """Token buckets by key, least recently used dropped beyond ``max_buckets``."""
+
+    def __init__(self, rate: float, burst: float, max_buckets: int = ADMISSION_MAX_BUCKETS):
+        self.rate = rate
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(now)
+
+
+class LatencyWindow:
+    """Chat latencies from the last ``window`` seconds, with a cached p95."""
+
+    def __init__(self, window: float = ADMISSION_WINDOW_SECONDS, min_samples: int = ADMISSION_MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: deque = deque()
+        self._p95: Optional[float] = None
+        self._computed_at = 0.0
+
+    def observe(self, seconds: float, now: float):
+        self._samples.append((now, seconds))
+
+    @property
+    def last_p95(self) -> Optional[float]:
+        return self._p95
+
+    def p95(self, now: float) -> Optional[float]:
+        """p95 in seconds, or None with too few recent samples; recomputed at most once a second."""
+        if now - self._computed_at < 1.0:
+            return self._p95
+        cutoff = now - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        if len(self._samples) < self.min_samples:
+            self._p95 = None
+        else:
+            ordered = sorted(seconds for _, seconds in self._samples)
+            self._p95 = ordered[math.ceil(0.95 * len(ordered)) - 1]
+        self._computed_at = now
+        return self._p95
+
+
+class AdmissionController:
+    """Decides, per participant request, whether to admit, degrade or reject it."""
+
+    def __init__(
+        self,
+        slo_seconds: float = ADMISSION_CHAT_SLO_MS / 1000,
+        ip_limiter: Optional[RateLimiter] = None,
+        participant_limiter: Optional[RateLimiter] = None,
+        latency: Optional[LatencyWindow] = None,
+    ):
+        self.slo_seconds = slo_seconds
+        self.ip_limiter = ip_limiter or RateLimiter(ADMISSION_IP_RATE, ADMISSION_IP_BURST)
+        self.participant_limiter = participant_limiter or RateLimiter(
+            ADMISSION_PARTICIPANT_RATE, ADMISSION_PARTICIPANT_BURST
+        )
+        self.latency = latency or LatencyWindow()
+
+    def overloaded(self, now: float) -> bool:
+        p95 = self.latency.p95(now)
+        return p95 is not None and p95 > self.slo_seconds
+
+    def decide(self, request_class: str, participant: tuple, ip: str, now: float) -> tuple:
+        """``(decision, retry_after_seconds)``; decision is admit, degrade, rate_limited or shed."""
+        if request_class == END:
+            return "admit", 0
+        wait = max(
+            self.participant_limiter.take(participant, now),
+            self.ip_limiter.take(ip, now),
+        )
+        if wait > 0:
+            return "rate_limited", max(1, math.ceil(min(wait, 3600)))
+        if self.overloaded(now):
+            if request_class == CHAT:
+                return "degrade", 0
+            return "shed", ADMISSION_RETRY_AFTER_SECONDS
+        return "admit", 0
+
+
+def _classify(scope) -> Optional[tuple]:
+    path = scope["path"]
+    for method, pattern, request_class, key in _ROUTES:
+        if scope["method"] == method:
+            match = pattern.match(path)
+            if match:
+                return request_class, (key, match.group(1))
+    return None
+
+
+def _client_ip(scope) -> str:
+    if ADMISSION_TRUST_FORWARDED:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+controller = AdmissionController()
+metrics.ADMISSION_CHAT_P95.set_function(lambda: controller.latency.last_p95 or 0)
+
+
+class AdmissionMiddleware:
+    """Applies ``controller`` to the interview routes and times LLM-served chat turns."""
+
+    def __init__(self, app, admission: AdmissionController = controller):
+        self.app = app
+        self.admission = admission
+
+    async def __call__(self, scope, receive, send):
+        classified = _classify(scope) if scope["type"] == "http" else None
+        if classified is None:
+            await self.app(scope, receive, send)
+            return
+
+        request_class, participant = classified
+        now = time.monotonic()
+        decision, retry_after = self.admission.decide(request_class, participant, _client_ip(scope), now)
+        metrics.ADMISSIONS.inc(request_class=request_class, decision=decision)
+        if decision in ("rate_limited", "shed"):
+            detail = "Too many requests" if decision == "rate_limited" else "Server busy, please retry shortly"
+            response = JSONResponse({"detail": detail}, status_code=429, headers={"Retry-After": str(retry_after)})
+            await response(scope, receive, send)
+            return
+
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _degraded.set(decision == "degrade")
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _degraded.reset(token)
+        # Only LLM-served turns measure the LLM path; degraded ones would hide the overload
+        if request_class == CHAT and decision == "admit" and status == 200:
+            finished = time.monotonic()
+            self.admission.latency.observe(finished - now, finished)
@@ -0,0 +1,126 @@
+"""In-process event bus feeding the live monitoring stream.
+
+Routes publish participant and session events for an instance; each
+dashboard connected to ``GET /api/instances/{id}/events`` holds a
+subscription that receives them as Server-Sent Events. Publishing never
+waits on subscribers: each subscription keeps only the latest pending event
+per participant/session (coalescing bursts of turns into one update) and is
+bounded, so a slow client loses intermediate updates rather than holding
+memory or slowing the chat path. A client that overflowed is told to
+``resync`` by re-fetching its lists once.
+
+The bus lives on the event loop thread; publish from async code only.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ..telemetry import metrics
+
+EVENTS_MAX_PENDING = int(os.getenv("EVENTS_MAX_PENDING", "500"))
+EVENTS_FLUSH_INTERVAL_MS = float(os.getenv("EVENTS_FLUSH_INTERVAL_MS", "250"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+PARTICIPANT_CREATED = "participant_created"
+SESSION_STARTED = "session_started"
+TURN_COMPLETED = "turn_completed"
+SESSION_ENDED = "session_ended"
+
+
+class Subscription:
+    """Pending events for one stream client, coalesced per participant/session."""
+
+    def __init__(self, instance_id: int, max_pending: int = EVENTS_MAX_PENDING):
+        self.instance_id = instance_id
+        self.max_pending = max_pending
+        self.overflowed = False
+        self._pending: OrderedDict = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def offer(self, event: dict):
+        # A newer event for the same subject supersedes the unsent one
+        key = (event["type"], event.get("session_id") or event.get("participant_id"))
+        if key in self._pending:
+            del self._pending[key]
+            metrics.EVENTS.inc(outcome="coalesced")
+        elif len(self._pending) >= self.max_pending:
+            self._pending.popitem(last=False)
+            self.overflowed = True
+            metrics.EVENTS.inc(outcome="dropped")
+        self._pending[key] = event
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> Optional[list]:
+        """Wait up to ``timeout`` for events; return them in publish order, or None."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        batch = list(self._pending.values())
+        if self.overflowed:
+            batch.append({"type": "resync", "instance_id": self.instance_id})
+            self.overflowed = False
+        self._pending.clear()
+        self._ready.clear()
+        return batch
+
+
+class EventBus:
+    """Fan-out of instance events to their subscriptions."""
+
+    def __init__(self):
+        self._subscribers: dict[int, set] = {}
+
+    def subscribe(self, instance_id: int) -> Subscription:
+        subscription = Subscription(instance_id)
+        self._subscribers.setdefault(instance_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.instance_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.instance_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, instance_id: Optional[int], event_type: str, **data):
+        """Queue an event for every subscriber of the instance; never blocks."""
+        subscribers = self._subscribers.get(instance_id)
+        if not subscribers:
+            return
+        event = {"type": event_type, "instance_id": instance_id, "ts": time.time(), **data}
+        metrics.EVENTS.inc(outcome="published")
+        for subscription in subscribers:
+            subscription.offer(event)
+
+
+bus = EventBus()
+
+metrics.EVENT_SUBSCRIBERS.set_function(bus.subscriber_count)
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream(subscription: Subscription, request, snapshot: Optional[dict] = None):
+    """Yield SSE frames for a subscription until the client disconnects."""
+    try:
+        if snapshot is not None:
+            yield format_sse({"type": "snapshot", "instance_id": subscription.instance_id, "stats": snapshot})
+        while not await request.is_disconnected():
+            batch = await subscription.next_batch(EVENTS_HEARTBEAT_SECONDS)
+            if batch is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield "".join(format_sse(event) for event in batch)
+            # Let bursts accumulate (and coalesce) before the next flush
+            await asyncio.sleep(EVENTS_FLUSH_INTERVAL_MS / 1000)
+    finally:
+        bus.unsubscribe(subscription)
@@ -0,0 +1,83 @@
+"""Idempotency keys for chat submissions.
+
+A participant's browser may resend a chat message after a dropped response.
+Requests that carry the same ``idempotency_key`` for a session share one
+execution: a duplicate that arrives while the turn is still generating waits
+for that generation, and one that arrives after it finished gets the stored
+response, so the message is stored, generated and counted once.
+
+Results are kept in process for ``IDEMPOTENCY_TTL_SECONDS`` (at most
+``IDEMPOTENCY_MAX_KEYS``), which is enough because a session's agent lives in
+one process anyway. A turn that fails is forgotten so that a retry runs it
+again. The turn runs as its own task, so a client that disconnects mid-turn
+does not cancel the generation its retry will attach to.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable
+
+from fastapi import HTTPException
+
+from ..telemetry import metrics
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+
+
+def fingerprint(*parts) -> str:
+    """Digest of a request's payload, to reject a key reused for a different one."""
+    return hashlib.sha256("\x00".join(map(str, parts)).encode()).hexdigest()
+
+
+class IdempotencyCache:
+    """Pending and completed results by key, oldest first."""
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        # key -> (expires_at, payload fingerprint, future)
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float):
+        while self._entries:
+            key, (expires_at, _, future) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_keys:
+                break
+            if not future.done() and expires_at > now:
+                # Over capacity, but never drop a turn that is still running
+                break
+            del self._entries[key]
+
+    def _forget_failed(self, key: Hashable, future: asyncio.Future):
+        if future.cancelled() or future.exception() is not None:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is future:
+                del self._entries[key]
+
+    async def run(self, key: Hashable, payload: str, operation: Callable[[], Awaitable]) -> tuple:
+        """``(result, replayed)``: run ``operation`` once per key, or share its result."""
+        now = time.monotonic()
+        self._evict(now)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            _, stored_payload, future = entry
+            if stored_payload != payload:
+                metrics.IDEMPOTENT_REQUESTS.inc(outcome="conflict")
+                raise HTTPException(status_code=422, detail="Idempotency key was already used for a different request")
+            metrics.IDEMPOTENT_REQUESTS.inc(outcome="replayed" if future.done() else "joined")
+            return await asyncio.shield(future), True
+
+        future = asyncio.ensure_future(operation())
+        self._entries[key] = (now + self.ttl, payload, future)
+        future.add_done_callback(lambda done: self._forget_failed(key, done))
+        metrics.IDEMPOTENT_REQUESTS.inc(outcome="new")
+        return await asyncio.shield(future), False
+
+
+chat_requests = IdempotencyCache()
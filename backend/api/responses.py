@@ -0,0 +1,23 @@
+"""JSON response class backed by orjson when it is installed."""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """Serializes with orjson, falling back to compact stdlib JSON.
+
+    Returning one directly from an endpoint also skips FastAPI's
+    ``jsonable_encoder`` pass, which walks every item of large row lists.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
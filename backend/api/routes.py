@@ -1,35 +1,95 @@
 """API routes for the interview platform."""
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timezone
 from typing import Optional
-from ..db import database as db
+from ..db import analytics
+from ..db.storage import StorageBackend, get_storage
 from ..db.models import (
-    UserCreate, InstanceCreate, InstanceUpdate, ParticipantCreate,
+    UserCreate, InstanceCreate, InstanceUpdate, InstanceClone, ParticipantCreate,
     ChatRequest, ChatResponse, ProjectCreate, ProjectUpdate, AnonymousLinkUpdate
 )
 from ..agents.llm_agent import LLMAgent
+from . import admission, events, idempotency
+from .scheduler import SessionScheduler
+from .responses import FastJSONResponse
+from ..telemetry import metrics, tracing
 
-router = APIRouter()
+router = APIRouter(route_class=tracing.TracedRoute)
 
 # In-memory session storage for active agents
 active_sessions: dict[int, LLMAgent] = {}
 
+# Agents warmed up when a participant opens their link, keyed by token
+prewarmed_agents: dict[str, LLMAgent] = {}
+MAX_PREWARMED_AGENTS = 1000
+
+
+async def close_expired_sessions(expired: list):
+    """Scheduler callback: complete timed-out sessions and drop their agents."""
+    for row in await get_storage().close_expired_sessions(expired):
+        active_sessions.pop(row["session_id"], None)
+        metrics.SESSIONS_EXPIRED.inc(reason=row["reason"])
+        events.bus.publish(
+            row["instance_id"], events.SESSION_ENDED,
+            participant_id=row["participant_id"], session_id=row["session_id"],
+            turn_count=row["turn_count"], duration_seconds=row["duration_seconds"],
+            status="completed" if row["reason"] == "timebox" else "abandoned", reason=row["reason"],
+        )
+
+
+# Closes sessions at their timebox or after the idle timeout
+session_scheduler = SessionScheduler(close_expired_sessions)
+
+
+async def schedule_open_sessions():
+    """Track sessions left open by a previous process so they still get closed."""
+    for row in await get_storage().get_open_sessions():
+        session_scheduler.track(
+            row["id"],
+            (row["timebox_minutes"] or 30) * 60,
+            started_at=_unix_time(row["started_at"]),
+            last_activity_at=_unix_time(row["last_activity_at"]) if row["last_activity_at"] else None,
+        )
+
+
+def _unix_time(timestamp: str) -> float:
+    # SQLite timestamps are UTC without an offset
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
+
+
+metrics.ACTIVE_SESSIONS.set_function(lambda: len(active_sessions))
+metrics.AGENT_CACHE_SIZE.set_function(lambda: len(active_sessions), cache="active")
+metrics.AGENT_CACHE_SIZE.set_function(lambda: len(prewarmed_agents), cache="prewarmed")
+
+
+def _build_agent(participant: dict, instance: dict) -> LLMAgent:
+    """Create the Explorer agent for a participant."""
+    return LLMAgent(
+        agent_type="explorer",  # Always Explorer
+        context=LLMAgent.participant_context(participant, instance)
+    )
+
 
 # Project endpoints
 @router.get("/projects")
-async def get_projects(user_email: str):
+async def get_projects(user_email: str, storage: StorageBackend = Depends(get_storage)):
     """Get all projects for a user."""
-    user = await db.get_user_by_email(user_email)
-    if not user:
+    projects = await storage.get_user_projects_by_email(user_email)
+    if projects is None:
         raise HTTPException(status_code=404, detail="User not found")
-    projects = await db.get_user_projects(user["id"])
     return projects
 
 
 @router.post("/projects")
-async def create_project(project: ProjectCreate, user_email: str):
+async def create_project(
+    project: ProjectCreate,
+    user_email: str,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Create a new project."""
-    user = await db.get_or_create_user(user_email)
-    result = await db.create_project(
+    user = await storage.get_or_create_user(user_email)
+    result = await storage.create_project(
         user_id=user["id"],
         name=project.name,
         description=project.description
@@ -38,51 +98,84 @@ async def create_project(project: ProjectCreate, user_email: str):
 
 
 @router.get("/projects/{project_id}")
-async def get_project(project_id: int):
+async def get_project(project_id: int, storage: StorageBackend = Depends(get_storage)):
     """Get project details."""
-    project = await db.get_project(project_id)
+    project = await storage.get_project(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
 
 
 @router.patch("/projects/{project_id}")
-async def update_project(project_id: int, project: ProjectUpdate):
+async def update_project(
+    project_id: int,
+    project: ProjectUpdate,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Update a project."""
-    existing = await db.get_project(project_id)
-    if not existing:
-        raise HTTPException(status_code=404, detail="Project not found")
-    result = await db.update_project(
+    result = await storage.update_project(
         project_id,
         name=project.name,
         description=project.description,
         status=project.status
     )
+    if not result:
+        raise HTTPException(status_code=404, detail="Project not found")
     return result
 
 
 @router.get("/projects/{project_id}/instances")
-async def get_project_instances(project_id: int):
+async def get_project_instances(project_id: int, storage: StorageBackend = Depends(get_storage)):
     """Get all instances for a project."""
-    project = await db.get_project(project_id)
-    if not project:
+    instances = await storage.get_project_instances(project_id)
+    if instances is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    instances = await db.get_project_instances(project_id)
     return instances
 
 
+@router.post("/projects/{project_id}/instances/close")
+async def close_project_instances(project_id: int, storage: StorageBackend = Depends(get_storage)):
+    """Close every instance of a project."""
+    closed = await storage.close_project_instances(project_id)
+    if closed is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return {"instances_closed": closed}
+
+
+@router.post("/projects/{project_id}/archive")
+async def archive_project(project_id: int, storage: StorageBackend = Depends(get_storage)):
+    """Archive a project: close its instances and end its sessions in progress."""
+    result = await storage.archive_project(project_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    for row in result["sessions_closed"]:
+        session_scheduler.untrack(row["session_id"])
+        active_sessions.pop(row["session_id"], None)
+        events.bus.publish(
+            row["instance_id"], events.SESSION_ENDED,
+            participant_id=row["participant_id"], session_id=row["session_id"],
+            turn_count=row["turn_count"], duration_seconds=row["duration_seconds"],
+            status="abandoned", reason=row["reason"],
+        )
+    return {
+        "project": result["project"],
+        "instances_closed": result["instances_closed"],
+        "sessions_closed": len(result["sessions_closed"]),
+    }
+
+
 # User endpoints
 @router.post("/users")
-async def create_user(user: UserCreate):
+async def create_user(user: UserCreate, storage: StorageBackend = Depends(get_storage)):
     """Create or get a user."""
-    result = await db.get_or_create_user(user.email, user.name)
+    result = await storage.get_or_create_user(user.email, user.name)
     return result
 
 
 @router.get("/users/{email}")
-async def get_user(email: str):
+async def get_user(email: str, storage: StorageBackend = Depends(get_storage)):
     """Get user by email."""
-    user = await db.get_user_by_email(email)
+    user = await storage.get_user_by_email(email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -90,15 +183,14 @@ async def get_user(email: str):
 
 # Instance endpoints
 @router.post("/instances")
-async def create_instance(instance: InstanceCreate, user_email: str):
+async def create_instance(
+    instance: InstanceCreate,
+    user_email: str,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Create a new interview instance."""
-    user = await db.get_or_create_user(user_email)
-    # Verify project exists if provided
-    if instance.project_id:
-        project = await db.get_project(instance.project_id)
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
-    result = await db.create_instance(
+    user = await storage.get_or_create_user(user_email)
+    result = await storage.create_instance(
         user_id=user["id"],
         project_id=instance.project_id,
         name=instance.name,
@@ -108,25 +200,28 @@ async def create_instance(instance: InstanceCreate, user_email: str):
         timebox_minutes=instance.timebox_minutes,
         max_turns=instance.max_turns
     )
+    if not result:
+        raise HTTPException(status_code=404, detail="Project not found")
     return result
 
 
 @router.get("/instances/{instance_id}")
-async def get_instance(instance_id: int):
+async def get_instance(instance_id: int, storage: StorageBackend = Depends(get_storage)):
     """Get instance details."""
-    instance = await db.get_instance(instance_id)
+    instance = await storage.get_instance(instance_id)
     if not instance:
         raise HTTPException(status_code=404, detail="Instance not found")
     return instance
 
 
 @router.patch("/instances/{instance_id}")
-async def update_instance(instance_id: int, instance: InstanceUpdate):
+async def update_instance(
+    instance_id: int,
+    instance: InstanceUpdate,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Update an interview instance."""
-    existing = await db.get_instance(instance_id)
-    if not existing:
-        raise HTTPException(status_code=404, detail="Instance not found")
-    result = await db.update_instance(
+    result = await storage.update_instance(
         instance_id,
         name=instance.name,
         agent_type=instance.agent_type,
@@ -135,39 +230,98 @@ async def update_instance(instance_id: int, instance: InstanceUpdate):
         timebox_minutes=instance.timebox_minutes,
         max_turns=instance.max_turns
     )
+    if not result:
+        raise HTTPException(status_code=404, detail="Instance not found")
     return result
 
 
 @router.get("/instances/{instance_id}/participants")
-async def get_instance_participants(instance_id: int):
+async def get_instance_participants(
+    instance_id: int,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Get all participants for an instance."""
-    instance = await db.get_instance(instance_id)
-    if not instance:
+    participants = await storage.get_instance_participants(instance_id)
+    if participants is None:
+        raise HTTPException(status_code=404, detail="Instance not found")
+    return FastJSONResponse(participants)
+
+
+@router.get("/instances/{instance_id}/stats")
+async def get_instance_stats(instance_id: int, storage: StorageBackend = Depends(get_storage)):
+    """Response counts and averages for the monitor dashboard."""
+    stats = await storage.get_instance_stats(instance_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Instance not found")
+    return stats
+
+
+@router.get("/instances/{instance_id}/report")
+async def get_instance_report(instance_id: int, storage: StorageBackend = Depends(get_storage)):
+    """Per-session report and summary, read from the analytics replica.
+
+    The ``snapshot`` field (and the ``X-Snapshot-Age`` header) give the
+    replica's age; sessions newer than the snapshot are not included.
+    """
+    if storage.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Reports need the sqlite storage backend")
+    report = await analytics.get_instance_report(instance_id)
+    if report is None:
+        raise HTTPException(status_code=503, detail="No analytics snapshot yet")
+    # No summary means no sessions at snapshot time, or no such instance
+    if report["summary"] is None and not await storage.get_instance(instance_id):
+        raise HTTPException(status_code=404, detail="Instance not found")
+    return FastJSONResponse(report, headers={"X-Snapshot-Age": str(report["snapshot"]["age_seconds"])})
+
+
+@router.get("/instances/{instance_id}/events")
+async def stream_instance_events(
+    instance_id: int,
+    request: Request,
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Live monitoring feed (Server-Sent Events) for an instance.
+
+    Starts with a ``snapshot`` of the instance stats, then pushes participant
+    and session events as they happen.
+    """
+    stats = await storage.get_instance_stats(instance_id)
+    if not stats:
         raise HTTPException(status_code=404, detail="Instance not found")
-    participants = await db.get_instance_participants(instance_id)
-    return participants
+    subscription = events.bus.subscribe(instance_id)
+    return StreamingResponse(
+        events.stream(subscription, request, snapshot=stats),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # Anonymous link endpoints
 @router.get("/instances/{instance_id}/anonymous-link")
-async def get_anonymous_link(instance_id: int, request: Request):
+async def get_anonymous_link(
+    instance_id: int,
+    request: Request,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Get anonymous link settings for an instance."""
-    instance = await db.get_instance(instance_id)
-    if not instance:
+    # A link only exists for an existing instance; check the instance only before creating one
+    link = await storage.get_anonymous_link(instance_id)
+    if link:
+        return link
+    if not await storage.get_instance(instance_id):
         raise HTTPException(status_code=404, detail="Instance not found")
-    # Get or create link with base URL from request
     base_url = str(request.base_url).rstrip("/")
-    link = await db.get_or_create_anonymous_link(instance_id, base_url)
-    return link
+    return await storage.create_anonymous_link(instance_id, base_url)
 
 
 @router.patch("/instances/{instance_id}/anonymous-link")
-async def update_anonymous_link(instance_id: int, link_update: AnonymousLinkUpdate):
+async def update_anonymous_link(
+    instance_id: int,
+    link_update: AnonymousLinkUpdate,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Update anonymous link settings."""
-    instance = await db.get_instance(instance_id)
-    if not instance:
-        raise HTTPException(status_code=404, detail="Instance not found")
-    result = await db.update_anonymous_link(
+    result = await storage.update_anonymous_link(
         instance_id,
         enabled=link_update.enabled,
         allow_multiple=link_update.allow_multiple,
@@ -175,55 +329,93 @@ async def update_anonymous_link(instance_id: int, link_update: AnonymousLinkUpda
         expires_at=link_update.expires_at
     )
     if not result:
+        # Only the error path pays for telling the two 404s apart
+        if not await storage.get_instance(instance_id):
+            raise HTTPException(status_code=404, detail="Instance not found")
         raise HTTPException(status_code=404, detail="Anonymous link not found")
     return result
 
 
 @router.get("/users/{email}/instances")
-async def get_user_instances(email: str):
+async def get_user_instances(email: str, storage: StorageBackend = Depends(get_storage)):
     """Get all instances for a user."""
-    user = await db.get_user_by_email(email)
-    if not user:
+    instances = await storage.get_user_instances_by_email(email)
+    if instances is None:
         raise HTTPException(status_code=404, detail="User not found")
-    instances = await db.get_user_instances(user["id"])
     return instances
 
 
+@router.post("/instances/{instance_id}/clone")
+async def clone_instance(
+    instance_id: int,
+    clone: InstanceClone,
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Copy an instance as a new draft, optionally re-inviting its participants under new links."""
+    result = await storage.clone_instance(instance_id, clone.name, clone.include_participants)
+    if not result:
+        raise HTTPException(status_code=404, detail="Instance not found")
+    return FastJSONResponse(result)
+
+
 @router.post("/instances/{instance_id}/activate")
-async def activate_instance(instance_id: int):
+async def activate_instance(instance_id: int, storage: StorageBackend = Depends(get_storage)):
     """Activate an instance for interviews."""
-    instance = await db.get_instance(instance_id)
-    if not instance:
+    if not await storage.update_instance_status(instance_id, "active"):
         raise HTTPException(status_code=404, detail="Instance not found")
-    await db.update_instance_status(instance_id, "active")
     return {"status": "active"}
 
 
 # Participant endpoints
 @router.post("/instances/{instance_id}/participants")
-async def add_participant(instance_id: int, participant: ParticipantCreate):
+async def add_participant(
+    instance_id: int,
+    participant: ParticipantCreate,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Add a participant to an instance."""
-    instance = await db.get_instance(instance_id)
-    if not instance:
-        raise HTTPException(status_code=404, detail="Instance not found")
-
-    result = await db.create_participant(
+    result = await storage.create_participant(
         instance_id=instance_id,
         email=participant.email,
         name=participant.name,
         background=participant.background
     )
+    if not result:
+        raise HTTPException(status_code=404, detail="Instance not found")
+    events.bus.publish(
+        instance_id, events.PARTICIPANT_CREATED,
+        participant_id=result["id"], email=result["email"], status=result["status"],
+    )
     return result
 
 
 @router.get("/interview/{token}")
-async def get_interview_by_token(token: str):
+async def get_interview_by_token(
+    token: str,
+    background_tasks: BackgroundTasks,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Get interview details by participant token."""
-    participant = await db.get_participant_by_token(token)
-    if not participant:
+    found = await storage.get_participant_with_instance(token)
+    if not found:
         raise HTTPException(status_code=404, detail="Invalid interview token")
 
-    instance = await db.get_instance(participant["instance_id"])
+    participant, instance = found
+    tracing.set_attribute("instance_id", instance["id"])
+
+    # Warm the model while the participant reads the landing page
+    if (
+        instance["status"] == "active"
+        and participant["status"] == "invited"
+        and token not in prewarmed_agents
+    ):
+        if len(prewarmed_agents) >= MAX_PREWARMED_AGENTS:
+            # Evict the oldest link that was opened but never started
+            prewarmed_agents.pop(next(iter(prewarmed_agents)))
+        agent = _build_agent(participant, instance)
+        prewarmed_agents[token] = agent
+        background_tasks.add_task(agent.prepare)
+
     return {
         "participant": participant,
         "instance": instance
@@ -232,40 +424,43 @@ async def get_interview_by_token(token: str):
 
 # Session/Chat endpoints
 @router.post("/interview/{token}/start")
-async def start_interview(token: str):
+async def start_interview(
+    token: str,
+    background_tasks: BackgroundTasks,
+    storage: StorageBackend = Depends(get_storage),
+):
     """Start an interview session."""
-    participant = await db.get_participant_by_token(token)
-    if not participant:
+    found = await storage.get_participant_with_instance(token)
+    if not found:
         raise HTTPException(status_code=404, detail="Invalid interview token")
 
-    instance = await db.get_instance(participant["instance_id"])
+    participant, instance = found
+    tracing.set_attribute("instance_id", instance["id"])
     if instance["status"] != "active":
         raise HTTPException(status_code=400, detail="Interview is not active")
 
     # Create session
-    session = await db.create_session(participant["id"])
-    await db.update_participant_status(participant["id"], "started")
-
-    # Create agent context for Explorer
-    context = {
-        "participant_name": participant.get("name", "Participant"),
-        "participant_background": participant.get("background", ""),
-        "objective": instance.get("objective", ""),
-        "timebox_minutes": instance.get("timebox_minutes", 10),
-        "max_turns": instance.get("max_turns", 20),
-    }
+    session = await storage.create_session(participant["id"])
+    tracing.set_attribute("session_id", session["id"])
+    await storage.update_participant_status(participant["id"], "started")
 
-    agent = LLMAgent(
-        agent_type="explorer",  # Always Explorer
-        context=context
-    )
+    # Reuse the agent warmed by get_interview_by_token, otherwise warm one now
+    agent = prewarmed_agents.pop(token, None)
+    if agent is None:
+        agent = _build_agent(participant, instance)
+        background_tasks.add_task(agent.warm_up)
 
     # Store agent in memory
     active_sessions[session["id"]] = agent
+    session_scheduler.track(session["id"], (instance.get("timebox_minutes") or 30) * 60)
 
     # Get opening message
     opening = agent.get_opening_message()
-    await db.add_message(session["id"], "assistant", opening)
+    await storage.add_message(session["id"], "assistant", opening)
+    events.bus.publish(
+        instance["id"], events.SESSION_STARTED,
+        participant_id=participant["id"], session_id=session["id"], status="started",
+    )
 
     return {
         "session_id": session["id"],
@@ -275,9 +470,35 @@ async def start_interview(token: str):
 
 
 @router.post("/sessions/{session_id}/chat")
-async def chat(session_id: int, request: ChatRequest) -> ChatResponse:
-    """Send a message in an interview session."""
-    session = await db.get_session(session_id)
+async def chat(
+    session_id: int,
+    request: ChatRequest,
+    response: Response,
+    storage: StorageBackend = Depends(get_storage),
+) -> ChatResponse:
+    """Send a message in an interview session.
+
+    Submissions with an ``idempotency_key`` run once: a retry with the same
+    key joins the turn in progress or gets its stored response.
+    """
+    local_only = admission.degraded()
+    if not request.idempotency_key:
+        return await _chat_turn(session_id, request, storage, local_only)
+
+    result, replayed = await idempotency.chat_requests.run(
+        (session_id, request.idempotency_key),
+        idempotency.fingerprint(request.message, request.audio_input),
+        lambda: _chat_turn(session_id, request, storage, local_only),
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+async def _chat_turn(
+    session_id: int, request: ChatRequest, storage: StorageBackend, local_only: bool,
+) -> ChatResponse:
+    session = await storage.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -285,17 +506,23 @@ async def chat(session_id: int, request: ChatRequest) -> ChatResponse:
     if not agent:
         raise HTTPException(status_code=400, detail="Session expired. Please start a new interview.")
 
+    session_scheduler.touch(session_id)
+
     # Store user message
-    await db.add_message(session_id, "user", request.message, request.audio_input)
+    await storage.add_message(session_id, "user", request.message, request.audio_input)
 
     # Get agent response
-    response = await agent.chat(request.message)
+    response = await agent.chat(request.message, local_only=local_only)
 
     # Store agent response
-    await db.add_message(session_id, "assistant", response)
+    await storage.add_message(session_id, "assistant", response)
 
     # Update turn count
-    turn_count = await db.increment_turn_count(session_id)
+    turn_count = await storage.increment_turn_count(session_id)
+    events.bus.publish(
+        agent.context.get("instance_id"), events.TURN_COMPLETED,
+        participant_id=session["participant_id"], session_id=session_id, turn_count=turn_count,
+    )
 
     return ChatResponse(
         response=response,
@@ -305,42 +532,47 @@ async def chat(session_id: int, request: ChatRequest) -> ChatResponse:
 
 
 @router.post("/sessions/{session_id}/end")
-async def end_session(session_id: int):
+async def end_session(session_id: int, storage: StorageBackend = Depends(get_storage)):
     """End an interview session."""
-    session = await db.get_session(session_id)
+    session = await storage.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Calculate duration
-    messages = await db.get_session_messages(session_id)
-    duration = 0
-    if len(messages) >= 2:
-        # Rough duration estimate based on message count
-        duration = len(messages) * 30  # ~30 seconds per exchange
-
-    await db.complete_session(session_id, duration)
-
-    # Get participant and update status
-    participant = await db.get_participant_by_token(session.get("participant_id", ""))
-    if participant:
-        await db.update_participant_status(participant["id"], "completed")
-
-    # Clean up agent
-    if session_id in active_sessions:
-        del active_sessions[session_id]
+    session_scheduler.untrack(session_id)
+    active_sessions.pop(session_id, None)
+    # Ending twice (or after the scheduler closed it) changes nothing and reports the stored timing
+    if session["completed_at"] is not None:
+        return {
+            "status": "completed",
+            "turn_count": session["turn_count"],
+            "duration_seconds": session["duration_seconds"],
+        }
+
+    timing = await storage.complete_session(session_id)
+    await storage.update_participant_status(session["participant_id"], "completed")
+    # Also when the agent is gone (e.g. after a restart)
+    events.bus.publish(
+        session["instance_id"], events.SESSION_ENDED,
+        participant_id=session["participant_id"], session_id=session_id,
+        turn_count=session["turn_count"], duration_seconds=timing["duration_seconds"], status="completed",
+    )
 
-    return {"status": "completed", "turn_count": session["turn_count"]}
+    return {
+        "status": "completed",
+        "turn_count": session["turn_count"],
+        "duration_seconds": timing["duration_seconds"],
+    }
 
 
 @router.get("/sessions/{session_id}/messages")
-async def get_messages(session_id: int):
+async def get_messages(session_id: int, storage: StorageBackend = Depends(get_storage)):
     """Get all messages for a session."""
-    messages = await db.get_session_messages(session_id)
-    return messages
+    messages = await storage.get_session_messages(session_id)
+    return FastJSONResponse(messages)
 
 
 @router.get("/sessions/{session_id}/insights")
-async def get_insights(session_id: int):
+async def get_insights(session_id: int, storage: StorageBackend = Depends(get_storage)):
     """Get extracted insights for a session."""
-    insights = await db.get_session_insights(session_id)
+    insights = await storage.get_session_insights(session_id)
     return insights
@@ -0,0 +1,185 @@
+"""Deadline scheduler that closes sessions at their timebox or when idle.
+
+All live sessions share one min-heap of deadlines and one task on the event
+loop, so tracking a session costs a heap entry rather than a task or timer
+handle. Each session's deadline is the earlier of its timebox
+(``started_at + timebox_minutes``) and its idle timeout (last activity +
+``SESSION_IDLE_TIMEOUT_MINUTES``). Activity pushes a new heap entry and
+bumps the session's version; entries with an old version are skipped when
+they surface (lazy deletion), and the heap is rebuilt if stale entries pile
+up. Sessions due at the same time are handed to the close callback in
+batches so they are completed in one DB transaction. A session stays
+tracked until its batch was closed; a batch whose callback failed (e.g. the
+database was locked) is retried after ``SESSION_EXPIRE_RETRY_SECONDS``.
+"""
+import asyncio
+import heapq
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+SESSION_SCHEDULER_ENABLED = os.getenv("SESSION_SCHEDULER_ENABLED", "true").lower() == "true"
+SESSION_IDLE_TIMEOUT_MINUTES = float(os.getenv("SESSION_IDLE_TIMEOUT_MINUTES", "30"))
+SESSION_EXPIRE_BATCH_SIZE = int(os.getenv("SESSION_EXPIRE_BATCH_SIZE", "500"))
+SESSION_EXPIRE_RETRY_SECONDS = float(os.getenv("SESSION_EXPIRE_RETRY_SECONDS", "5"))
+
+TIMEBOX = "timebox"
+IDLE = "idle"
+
+
+class _Tracked:
+    __slots__ = ("timebox_at", "idle_at", "version")
+
+    def __init__(self, timebox_at: float, idle_at: float):
+        self.timebox_at = timebox_at
+        self.idle_at = idle_at
+        self.version = 0
+
+    @property
+    def deadline(self) -> float:
+        return min(self.timebox_at, self.idle_at)
+
+    @property
+    def reason(self) -> str:
+        return TIMEBOX if self.timebox_at <= self.idle_at else IDLE
+
+
+class SessionScheduler:
+    """Tracks session deadlines and closes expired sessions in batches.
+
+    ``on_expire`` receives a list of ``(session_id, reason)`` pairs, where
+    reason is ``"timebox"`` or ``"idle"``. Times are Unix timestamps so
+    sessions restored from the database keep their original deadlines.
+    """
+
+    def __init__(
+        self,
+        on_expire: Callable[[list], Awaitable[None]],
+        idle_timeout: float = SESSION_IDLE_TIMEOUT_MINUTES * 60,
+        batch_size: int = SESSION_EXPIRE_BATCH_SIZE,
+        max_sleep: float = 5.0,
+        retry_delay: float = SESSION_EXPIRE_RETRY_SECONDS,
+        enabled: bool = SESSION_SCHEDULER_ENABLED,
+    ):
+        self.on_expire = on_expire
+        self.enabled = enabled
+        self.idle_timeout = idle_timeout
+        self.batch_size = batch_size
+        self.max_sleep = max_sleep
+        self.retry_delay = retry_delay
+        self._tracked: dict[int, _Tracked] = {}
+        # Sessions handed to on_expire and not yet confirmed closed
+        self._closing: dict[int, _Tracked] = {}
+        self._heap: list = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._tracked)
+
+    def _push(self, session_id: int, tracked: _Tracked):
+        tracked.version += 1
+        deadline = tracked.deadline
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (deadline, session_id, tracked.version))
+        if self._wakeup is not None and (earliest is None or deadline < earliest):
+            self._wakeup.set()
+        # Rebuild once superseded entries dominate the heap
+        if len(self._heap) > 2 * len(self._tracked) + 1024:
+            self._heap = [(t.deadline, sid, t.version) for sid, t in self._tracked.items()]
+            heapq.heapify(self._heap)
+
+    def track(
+        self,
+        session_id: int,
+        timebox_seconds: float,
+        started_at: Optional[float] = None,
+        last_activity_at: Optional[float] = None,
+    ):
+        """Start tracking a session; ``started_at`` defaults to now."""
+        if not self.enabled:
+            return
+        started_at = started_at or time.time()
+        tracked = _Tracked(started_at + timebox_seconds, (last_activity_at or started_at) + self.idle_timeout)
+        self._tracked[session_id] = tracked
+        self._push(session_id, tracked)
+
+    def touch(self, session_id: int):
+        """Record activity, pushing the idle deadline out."""
+        tracked = self._tracked.get(session_id)
+        if tracked is not None:
+            tracked.idle_at = time.time() + self.idle_timeout
+            self._push(session_id, tracked)
+
+    def untrack(self, session_id: int):
+        """Stop tracking a session that ended normally; its heap entries go stale."""
+        self._tracked.pop(session_id, None)
+
+    def pop_expired(self, now: float) -> list:
+        """Return up to ``batch_size`` sessions whose deadline has passed.
+
+        They stay tracked until :meth:`closed` confirms them or :meth:`retry`
+        schedules another attempt.
+        """
+        expired = []
+        while self._heap and self._heap[0][0] <= now and len(expired) < self.batch_size:
+            _, session_id, version = heapq.heappop(self._heap)
+            tracked = self._tracked.get(session_id)
+            if tracked is None or tracked.version != version or session_id in self._closing:
+                continue
+            self._closing[session_id] = tracked
+            expired.append((session_id, tracked.reason))
+        return expired
+
+    def closed(self, expired: list):
+        """Stop tracking sessions of a batch that ``on_expire`` closed."""
+        for session_id, _ in expired:
+            tracked = self._closing.pop(session_id, None)
+            if tracked is not None and self._tracked.get(session_id) is tracked:
+                del self._tracked[session_id]
+
+    def retry(self, expired: list, now: float):
+        """Put the sessions of a failed batch back, due again after ``retry_delay``."""
+        for session_id, _ in expired:
+            tracked = self._closing.pop(session_id, None)
+            # Unless the session ended normally in the meantime
+            if tracked is not None and self._tracked.get(session_id) is tracked:
+                heapq.heappush(self._heap, (now + self.retry_delay, session_id, tracked.version))
+
+    def next_deadline(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    async def run(self):
+        self._wakeup = asyncio.Event()
+        while True:
+            expired = self.pop_expired(time.time())
+            if expired:
+                try:
+                    await self.on_expire(expired)
+                except Exception as e:
+                    print(f"Closing expired sessions failed, retrying in {self.retry_delay:g}s: {e}")
+                    self.retry(expired, time.time())
+                else:
+                    self.closed(expired)
+                continue
+
+            deadline = self.next_deadline()
+            delay = self.max_sleep if deadline is None else min(self.max_sleep, max(0.0, deadline - time.time()))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,4 @@
+"""Benchmarks and load tests for the interview backend.
+
+Run from the repository root, e.g. ``python -m backend.benchmarks.load_test``.
+"""
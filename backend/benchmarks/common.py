@@ -0,0 +1,64 @@
+"""Shared helpers for benchmark scripts: percentiles and result files."""
+import json
+import math
+import platform
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(values: list, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(values: list) -> dict:
+    """Summarize latencies in seconds as count, mean and p50/p95/p99 in ms."""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Current git commit, so runs can be compared across commits."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(name: str, config: dict, results: dict, output_dir: Optional[Path] = None) -> Path:
+    """Write a machine-readable result file and return its path."""
+    output_dir = Path(output_dir or RESULTS_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    revision = git_revision()
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = output_dir / f"{name}-{stamp}-{revision or 'nogit'}.json"
+    payload = {
+        "benchmark": name,
+        "git_revision": revision,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2))
+    return path
@@ -0,0 +1,164 @@
+"""Database round trips per admin request.
+
+Seeds a scratch database through the API, then calls each admin endpoint
+in process and counts the SQLite connections opened and statements run
+while it is handled. A final burst sends ``--concurrency`` identical
+requests at once to show how many of their reads were coalesced.
+
+    python -m backend.benchmarks.db_round_trips --requests 20 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from .common import summarize, write_results
+
+
+class RoundTripCounter:
+    """Wraps ``database.get_db`` to count connections and executed statements."""
+
+    def __init__(self, database):
+        self.database = database
+        self.connections = 0
+        self.statements = 0
+        self._get_db = database.get_db
+
+    async def _counting_get_db(self):
+        conn = await self._get_db()
+        self.connections += 1
+        await conn.set_trace_callback(self._count_statement)
+        return conn
+
+    def _count_statement(self, statement: str):
+        self.statements += 1
+
+    def install(self):
+        self.database.get_db = self._counting_get_db
+
+    def uninstall(self):
+        self.database.get_db = self._get_db
+
+    def snapshot(self) -> tuple:
+        return self.connections, self.statements
+
+
+async def _seed(client: httpx.AsyncClient) -> dict:
+    email = "admin@example.com"
+    project = (await client.post(f"/api/projects?user_email={email}", json={"name": "bench"})).json()
+    instance = (await client.post(
+        f"/api/instances?user_email={email}",
+        json={"project_id": project["id"], "name": "bench", "objective": "invoicing", "questions": ["Q1", "Q2"]},
+    )).json()
+    await client.post(f"/api/instances/{instance['id']}/activate")
+    tokens = []
+    for i in range(20):
+        participant = (await client.post(
+            f"/api/instances/{instance['id']}/participants", json={"email": f"p{i}@example.com", "name": f"P{i}"}
+        )).json()
+        tokens.append(participant["unique_token"])
+    await client.get(f"/api/instances/{instance['id']}/anonymous-link")
+    return {"email": email, "project_id": project["id"], "instance_id": instance["id"], "token": tokens[0]}
+
+
+def _requests(ids: dict) -> list:
+    """(label, method, path, json body) for the admin endpoints."""
+    project, instance = ids["project_id"], ids["instance_id"]
+    return [
+        ("GET /projects", "GET", f"/api/projects?user_email={ids['email']}", None),
+        ("PATCH /projects/{id}", "PATCH", f"/api/projects/{project}", {"description": "updated"}),
+        ("GET /projects/{id}/instances", "GET", f"/api/projects/{project}/instances", None),
+        ("PATCH /instances/{id}", "PATCH", f"/api/instances/{instance}", {"objective": "billing"}),
+        ("GET /instances/{id}/participants", "GET", f"/api/instances/{instance}/participants", None),
+        ("GET /instances/{id}/anonymous-link", "GET", f"/api/instances/{instance}/anonymous-link", None),
+        ("PATCH /instances/{id}/anonymous-link", "PATCH", f"/api/instances/{instance}/anonymous-link",
+         {"allow_multiple": True}),
+        ("POST /instances/{id}/activate", "POST", f"/api/instances/{instance}/activate", None),
+        ("GET /users/{email}/instances", "GET", f"/api/users/{ids['email']}/instances", None),
+        ("GET /interview/{token}", "GET", f"/api/interview/{ids['token']}", None),
+    ]
+
+
+async def _run(app, database, requests: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    counter = RoundTripCounter(database)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        ids = await _seed(client)
+        counter.install()
+        try:
+            for label, method, path, body in _requests(ids):
+                latencies = []
+                before = counter.snapshot()
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    response = await client.request(method, path, json=body)
+                    latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+                after = counter.snapshot()
+                results[label] = {
+                    "connections_per_request": (after[0] - before[0]) / requests,
+                    "statements_per_request": (after[1] - before[1]) / requests,
+                    "latency": summarize(latencies),
+                }
+
+            path = f"/api/instances/{ids['instance_id']}/participants"
+            before = counter.snapshot()
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(client.get(path) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+            after = counter.snapshot()
+            for response in responses:
+                response.raise_for_status()
+            results["concurrent GET /instances/{id}/participants"] = {
+                "requests": concurrency,
+                "connections": after[0] - before[0],
+                "statements": after[1] - before[1],
+                "elapsed_ms": round(elapsed * 1000, 3),
+            }
+        finally:
+            counter.uninstall()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count database round trips per admin request.")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=50, help="Identical requests in the concurrent burst")
+    parser.add_argument("--output", type=Path, default=None, help="Directory for the JSON result file")
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp(prefix="roundtrips-")) / "interviews.db"
+    os.environ["DATABASE_PATH"] = str(db_path)
+    os.environ["USE_MOCK_LLM"] = "true"
+    os.environ["STORAGE_BACKEND"] = "sqlite"
+    # Every request comes from one client IP; rate limits would reject most of them
+    os.environ["ADMISSION_ENABLED"] = "false"
+
+    # Import after configuring the environment, which is read at import time
+    from ..db import database
+    from ..main import app
+    from ..scripts.init_db import init_database
+
+    init_database(db_path)
+    results = asyncio.run(_run(app, database, args.requests, args.concurrency))
+
+    for label, result in results.items():
+        if "latency" in result:
+            print(f"{label:<40} {result['connections_per_request']:>5.1f} connections "
+                  f"{result['statements_per_request']:>5.1f} statements  p50 {result['latency']['p50_ms']} ms")
+        else:
+            print(f"{label:<40} {result['requests']} requests, {result['connections']} connections, "
+                  f"{result['statements']} statements in {result['elapsed_ms']} ms")
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    path = write_results("db_round_trips", config, results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
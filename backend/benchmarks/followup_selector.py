@@ -0,0 +1,68 @@
+"""Cost and choices of the local follow-up selector.
+
+Times ``LLMAgent._get_fallback_response`` over a conversation of
+``--turns`` turns (library built from the generic fallbacks plus
+``--questions`` instance questions) and prints the follow-up picked for
+each sample participant message.
+
+    python -m backend.benchmarks.followup_selector --turns 40 --repeat 2000
+"""
+import argparse
+import time
+from pathlib import Path
+
+from .common import summarize, write_results
+from .load_test import PARTICIPANT_MESSAGES
+
+INSTANCE_QUESTIONS = [
+    "Which systems do you export invoices from, and where do they end up?",
+    "How do you check that customer IDs match between billing and the CRM?",
+    "What happens when finance has to correct an invoice?",
+    "How long does the month-end close take you, start to finish?",
+    "Which spreadsheet macros or scripts have you built for this?",
+    "Who approves the numbers before they go out?",
+]
+
+
+def _conversation_latencies(agent_class, questions: list, turns: int, repeat: int) -> list:
+    latencies = []
+    for _ in range(repeat):
+        agent = agent_class(agent_type="explorer", context={"questions": questions, "max_turns": turns})
+        for turn in range(turns):
+            message = PARTICIPANT_MESSAGES[turn % len(PARTICIPANT_MESSAGES)]
+            start = time.perf_counter()
+            reply = agent._get_fallback_response(message)
+            latencies.append(time.perf_counter() - start)
+            agent.history.append("user", message)
+            agent.history.append("assistant", reply)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure local follow-up selection.")
+    parser.add_argument("--turns", type=int, default=20, help="Turns per simulated conversation")
+    parser.add_argument("--repeat", type=int, default=500, help="Conversations to time")
+    parser.add_argument("--questions", type=int, default=len(INSTANCE_QUESTIONS))
+    parser.add_argument("--output", type=Path, default=None, help="Directory for the JSON result file")
+    args = parser.parse_args()
+
+    from ..agents.llm_agent import LLMAgent
+
+    questions = INSTANCE_QUESTIONS[:args.questions]
+    agent = LLMAgent(agent_type="explorer", context={"questions": questions})
+    choices = {message: agent._get_fallback_response(message) for message in PARTICIPANT_MESSAGES}
+    for message, reply in choices.items():
+        print(f"{message}\n    -> {reply}")
+
+    latencies = _conversation_latencies(LLMAgent, questions, args.turns, args.repeat)
+    results = {"select": summarize(latencies), "library_size": len(agent._follow_ups), "choices": choices}
+    print(f"select over {results['library_size']} follow-ups: p50 {results['select']['p50_ms'] * 1000:.1f} us, "
+          f"p99 {results['select']['p99_ms'] * 1000:.1f} us")
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    path = write_results("followup_selector", config, results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
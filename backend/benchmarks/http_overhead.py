@@ -0,0 +1,107 @@
+"""Per-turn HTTP overhead of LLM calls: a new connection per call vs the shared pool.
+
+Runs the same streamed completions through ``llm_client.acompletion`` twice
+against the stub LLM server: once with a fresh ``httpx.AsyncClient`` per
+call (every turn opens a connection, as before the shared pool), once over
+the process-wide keep-alive pool. The stub answers instantly, so the latency
+is the client-side cost of a turn; ``--handshake-ms`` adds a delay to each
+new connection to stand in for TCP/TLS round trips to a remote endpoint.
+
+    python -m backend.benchmarks.http_overhead --turns 200 --concurrency 4
+    python -m backend.benchmarks.http_overhead --handshake-ms 30
+"""
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from .common import summarize, write_results
+from .stub_llm import StubLLMServer
+
+MESSAGES = [
+    {"role": "system", "content": "You are a friendly interviewer."},
+    {"role": "user", "content": "I export invoices every Monday and paste them into a spreadsheet."},
+]
+
+
+async def _turn(llm_client, model: str, api_base: str, client=None):
+    kwargs = {}
+    if client is not None:
+        from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+
+        kwargs["client"] = AsyncHTTPHandler()
+        kwargs["client"].client = client
+    response = await llm_client.acompletion(
+        model=model, api_base=api_base, messages=MESSAGES, max_tokens=16,
+        stream=True, stream_options={"include_usage": True}, **kwargs,
+    )
+    async for _ in response:
+        pass
+
+
+async def run_mode(mode: str, args, stub: StubLLMServer) -> dict:
+    from ..agents import llm_client
+
+    limit = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one():
+        async with limit:
+            # Per-call timing includes building and closing the client, which is part of its cost
+            start = time.perf_counter()
+            if mode == "pooled":
+                await _turn(llm_client, args.model, stub.url)
+            else:
+                async with llm_client.create_http_client() as client:
+                    await _turn(llm_client, args.model, stub.url, client)
+            latencies.append(time.perf_counter() - start)
+
+    # Warm LiteLLM's lazy imports so they don't land in the first measured turn
+    await _turn(llm_client, args.model, stub.url)
+    connections_before = stub.connection_count
+    started_at = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.turns)))
+    wall = time.perf_counter() - started_at
+    await llm_client.aclose()
+
+    connections = stub.connection_count - connections_before
+    return {
+        "turns": summarize(latencies),
+        "turns_per_second": round(args.turns / wall, 2),
+        "connections_opened": connections,
+        "connection_reuse_ratio": round(1 - connections / args.turns, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-call and pooled HTTP clients for LLM calls.")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--model", default="ollama/stub")
+    parser.add_argument("--handshake-ms", type=float, default=0.0, help="Stub delay on each new connection")
+    parser.add_argument("--output", type=Path, default=None, help="Directory for the JSON result file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    stub = StubLLMServer(latency_ms=0, tokens_per_second=0, handshake_ms=args.handshake_ms).start()
+    try:
+        results = {mode: asyncio.run(run_mode(mode, args, stub)) for mode in ("per_call", "pooled")}
+    finally:
+        stub.stop()
+
+    print(f"{'mode':<10} {'p50 ms':>9} {'p95 ms':>9} {'turns/s':>9} {'connections':>12}")
+    for mode, result in results.items():
+        turns = result["turns"]
+        print(f"{mode:<10} {turns['p50_ms']:>9} {turns['p95_ms']:>9} {result['turns_per_second']:>9} "
+              f"{result['connections_opened']:>12}")
+    saved = results["per_call"]["turns"]["p50_ms"] - results["pooled"]["turns"]["p50_ms"]
+    print(f"pooled client saves {round(saved, 3)} ms per turn at p50")
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    path = write_results("http_overhead", config, results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
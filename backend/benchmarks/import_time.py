@@ -0,0 +1,91 @@
+"""Import-time report for the app and its heavy dependencies.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter
+for each module and reports total import time, the slowest modules by
+self time and cumulative time per top-level package.
+
+    python -m backend.benchmarks.import_time
+    python -m backend.benchmarks.import_time --module backend.main --module litellm
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from .common import write_results
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_MODULES = ["backend.main", "litellm"]
+
+
+def parse_importtime(stderr: str) -> list:
+    """Parse ``-X importtime`` lines into (module, self_us, cumulative_us, depth)."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def measure(module: str, top: int) -> dict:
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT), "LITELLM_LOCAL_MODEL_COST_MAP": "True"}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=REPO_ROOT,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"}
+
+    entries = parse_importtime(proc.stderr)
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in entries:
+        by_package[name.split(".")[0]] += self_us
+    total_us = sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+
+    return {
+        "wall_seconds": round(wall, 3),
+        "import_seconds": round(total_us / 1e6, 3),
+        "modules_imported": len(entries),
+        "slowest_modules": [
+            {"module": name, "self_ms": round(self_us / 1000, 2), "cumulative_ms": round(cumulative_us / 1000, 2)}
+            for name, self_us, cumulative_us, _ in sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+        ],
+        "packages_ms": {
+            package: round(us / 1000, 2)
+            for package, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time of the app and its dependencies.")
+    parser.add_argument("--module", action="append", dest="modules", help="Module to import (repeatable)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules/packages to report")
+    parser.add_argument("--output", type=Path, default=None, help="Directory for the JSON result file")
+    args = parser.parse_args()
+    modules = args.modules or DEFAULT_MODULES
+
+    results = {module: measure(module, args.top) for module in modules}
+    for module, result in results.items():
+        if "error" in result:
+            print(f"{module}: {result['error']}")
+            continue
+        print(f"{module}: {result['import_seconds']}s import, {result['modules_imported']} modules, "
+              f"{result['wall_seconds']}s interpreter wall time")
+        for package, ms in list(result["packages_ms"].items())[:5]:
+            print(f"    {package:<24} {ms:>9} ms")
+
+    path = write_results("import_time", {"modules": modules, "top": args.top}, results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""JSON serialization cost of large list endpoints and the instance JSON column.
+
+Seeds a scratch database with one session holding ``--messages`` messages
+(10k by default) and times ``GET /api/sessions/{id}/messages`` in process,
+then breaks the response down into its serialization step: FastAPI's
+default path (``jsonable_encoder`` + stdlib ``JSONResponse``) versus
+``FastJSONResponse``. Decoding the ``questions`` column with ``json.loads``
+on every read is compared with the cached decoder used by ``db.database``.
+
+    python -m backend.benchmarks.json_serialization --messages 10000 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from .common import summarize, write_results
+from .load_test import PARTICIPANT_MESSAGES
+
+
+def _seed(db_path: Path, messages: int) -> int:
+    """Insert a user, instance, participant and one session with ``messages`` rows."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO users (email) VALUES ('bench@example.com')")
+    conn.execute(
+        "INSERT INTO instances (user_id, name, questions, status) VALUES (1, 'bench', ?, 'active')",
+        (json.dumps([f"Question {i}: how do you handle step {i}?" for i in range(20)]),),
+    )
+    conn.execute(
+        "INSERT INTO participants (instance_id, email, unique_token, status) VALUES (1, 'p@example.com', 'bench', 'started')"
+    )
+    session_id = conn.execute("INSERT INTO sessions (participant_id) VALUES (1)").lastrowid
+    conn.executemany(
+        "INSERT INTO messages (session_id, role, content) VALUES (?, ?, ?)",
+        (
+            (session_id, "user" if i % 2 else "assistant", PARTICIPANT_MESSAGES[i % len(PARTICIPANT_MESSAGES)])
+            for i in range(messages)
+        ),
+    )
+    conn.commit()
+    conn.close()
+    return session_id
+
+
+def _time(fn, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def _endpoint_latencies(app, session_id: int, requests: int) -> tuple:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        size = 0
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(f"/api/sessions/{session_id}/messages")
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+            size = len(response.content)
+    return latencies, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure JSON serialization on large list endpoints.")
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--output", type=Path, default=None, help="Directory for the JSON result file")
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp(prefix="jsonbench-")) / "interviews.db"
+    os.environ["DATABASE_PATH"] = str(db_path)
+    os.environ["USE_MOCK_LLM"] = "true"
+    # Every request comes from one client IP; rate limits would reject most of them
+    os.environ["ADMISSION_ENABLED"] = "false"
+
+    # Import after configuring the environment, which is read at import time
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from ..api.responses import FastJSONResponse
+    from ..db import database as db
+    from ..main import app
+    from ..scripts.init_db import init_database
+
+    init_database(db_path)
+    session_id = _seed(db_path, args.messages)
+
+    latencies, size = asyncio.run(_endpoint_latencies(app, session_id, args.requests))
+    rows = asyncio.run(db.get_session_messages(session_id))
+    raw_questions = sqlite3.connect(db_path).execute("SELECT questions FROM instances WHERE id = 1").fetchone()[0]
+
+    results = {
+        "response_bytes": size,
+        "endpoint": summarize(latencies),
+        "serialize_default": summarize(_time(lambda: JSONResponse(jsonable_encoder(rows)), args.requests)),
+        "serialize_fast": summarize(_time(lambda: FastJSONResponse(rows), args.requests)),
+        "questions_json_loads": summarize(_time(lambda: json.loads(raw_questions), 1000)),
+        "questions_cached": summarize(_time(lambda: db._load_questions({"questions": raw_questions}), 1000)),
+    }
+
+    print(f"GET /api/sessions/{{id}}/messages with {args.messages} messages ({size} bytes): "
+          f"p50 {results['endpoint']['p50_ms']} ms, p95 {results['endpoint']['p95_ms']} ms")
+    print(f"serialization p50: default {results['serialize_default']['p50_ms']} ms, "
+          f"fast {results['serialize_fast']['p50_ms']} ms")
+    print(f"questions decode p50: json.loads {results['questions_json_loads']['p50_ms']} ms, "
+          f"cached {results['questions_cached']['p50_ms']} ms")
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    path = write_results("json_serialization", config, results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
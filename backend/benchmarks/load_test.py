@@ -0,0 +1,439 @@
+"""Load test: simulated participants running full interviews.
+
+Each participant opens their link, starts the interview, sends K chat
+messages and ends the session. By default the FastAPI app runs in-process
+against a scratch database and a stub LLM server; pass ``--url`` to load a
+running server instead (point its OLLAMA_BASE_URL at ``stub_llm``).
+``--storage memory`` swaps SQLite for the in-memory backend to separate
+API/agent overhead from disk I/O; ``--storage sharded`` with ``--projects``
+spreads participants over per-project database files. ``--llm-cache`` records the stub's
+responses; ``--llm replay`` serves them back (with the stub's latency
+settings) so runs are reproducible without an LLM server.
+
+In process, a request's latency runs until its response was sent, not until
+the app's background tasks (such as the agent warm-up started when a link
+is opened) finished, which is when ``httpx.ASGITransport`` returns. The
+scratch database is removed afterwards.
+
+    python -m backend.benchmarks.load_test --participants 50 --turns 5
+    python -m backend.benchmarks.load_test --storage memory
+    python -m backend.benchmarks.load_test --storage sharded --projects 4
+    python -m backend.benchmarks.load_test --llm-cache llm.jsonl             # record once
+    python -m backend.benchmarks.load_test --llm replay --llm-cache llm.jsonl  # replay, no LLM server
+    python -m backend.benchmarks.load_test --url http://localhost:8000 --participants 20
+"""
+import argparse
+import asyncio
+import os
+import itertools
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from .common import summarize, write_results
+from .stub_llm import StubLLMServer
+
+PARTICIPANT_MESSAGES = [
+    "Every Monday I export the invoices from our billing tool and paste them into a spreadsheet.",
+    "It usually takes me about two hours, sometimes more if the export breaks.",
+    "I have to check each row against the CRM because the customer IDs don't match.",
+    "When something is wrong I email finance and wait for them to fix it.",
+    "I built a macro that helps a bit but it breaks whenever the columns change.",
+]
+
+START = "POST /interview/{token}/start"
+OPEN = "GET /interview/{token}"
+CHAT = "POST /sessions/{id}/chat"
+END = "POST /sessions/{id}/end"
+
+# Matches an in-process request to the time its response was sent
+REQUEST_ID_HEADER = "x-loadtest-request"
+
+
+class ResponseTimer:
+    """ASGI wrapper noting when each tagged response was fully sent."""
+
+    def __init__(self, app):
+        self.app = app
+        self.sent_at: dict[str, float] = {}
+
+    async def __call__(self, scope, receive, send):
+        request_id = None
+        if scope["type"] == "http":
+            request_id = dict(scope["headers"]).get(REQUEST_ID_HEADER.encode(), b"").decode() or None
+        if request_id is None:
+            return await self.app(scope, receive, send)
+
+        async def timed_send(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                self.sent_at[request_id] = time.perf_counter()
+
+        await self.app(scope, receive, timed_send)
+
+
+class Recorder:
+    """Collects per-endpoint latencies and errors."""
+
+    def __init__(self, sent_at: Optional[dict] = None):
+        self.latencies: dict[str, list] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        # A ResponseTimer's send times, when the app runs in process
+        self.sent_at = sent_at
+        self._ids = itertools.count()
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs):
+        request_id = None
+        if self.sent_at is not None:
+            request_id = str(next(self._ids))
+            kwargs["headers"] = {**kwargs.get("headers", {}), REQUEST_ID_HEADER: request_id}
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return None
+        finally:
+            sent_at = self.sent_at.pop(request_id, None) if request_id is not None else None
+        self.latencies[label].append((sent_at or time.perf_counter()) - start)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+            return None
+        return response
+
+
+class DBWaitProbe:
+    """Times SQLite write statements and commits, which is where lock waits show up."""
+
+    def __init__(self):
+        self.write_seconds: list = []
+        self.commit_seconds: list = []
+        self.lock_errors = 0
+        self.leaked_connections = 0
+        self._open: set = set()
+        self._originals = None
+
+    def install(self):
+        import aiosqlite
+
+        execute = aiosqlite.Connection.execute
+        commit = aiosqlite.Connection.commit
+        close = aiosqlite.Connection.close
+        self._originals = (execute, commit, close)
+        probe = self
+
+        async def timed_execute(conn, sql, parameters=None):
+            probe._open.add(conn)
+            is_write = sql.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE")
+            start = time.perf_counter()
+            try:
+                return await execute(conn, sql, parameters)
+            except sqlite3.OperationalError as e:
+                if "locked" in str(e):
+                    probe.lock_errors += 1
+                raise
+            finally:
+                if is_write:
+                    probe.write_seconds.append(time.perf_counter() - start)
+
+        async def timed_commit(conn):
+            start = time.perf_counter()
+            try:
+                return await commit(conn)
+            finally:
+                probe.commit_seconds.append(time.perf_counter() - start)
+
+        async def tracked_close(conn):
+            probe._open.discard(conn)
+            return await close(conn)
+
+        aiosqlite.Connection.execute = timed_execute
+        aiosqlite.Connection.commit = timed_commit
+        aiosqlite.Connection.close = tracked_close
+
+    async def close_leaked(self):
+        """Close connections a failed request never closed, so they stop holding locks."""
+        self.leaked_connections += len(self._open)
+        for conn in list(self._open):
+            await conn.close()
+
+    def uninstall(self):
+        if self._originals:
+            import aiosqlite
+
+            aiosqlite.Connection.execute, aiosqlite.Connection.commit, aiosqlite.Connection.close = self._originals
+            self._originals = None
+
+    def results(self) -> dict:
+        return {
+            "write_statements": summarize(self.write_seconds),
+            "commits": summarize(self.commit_seconds),
+            "lock_errors": self.lock_errors,
+            "leaked_connections": self.leaked_connections,
+        }
+
+
+def _memory_bytes(trace: bool) -> Optional[int]:
+    """Traced Python heap if tracemalloc is on, otherwise process RSS (Linux only)."""
+    if trace:
+        return tracemalloc.get_traced_memory()[0]
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+async def _setup(client: httpx.AsyncClient, participants: int, turns: int, projects: int = 1) -> list:
+    """Create projects with an active instance each and spread participants over them; return tokens."""
+    email = f"loadtest-{int(time.time())}@example.com"
+    instance_ids = []
+    for _ in range(projects):
+        response = await client.post(f"/api/projects?user_email={email}", json={"name": "Load test"})
+        response.raise_for_status()
+        project_id = response.json()["id"]
+        response = await client.post(f"/api/instances?user_email={email}", json={
+            "project_id": project_id,
+            "name": "Load test instance",
+            "objective": "month-end invoicing",
+            "max_turns": turns + 5,
+        })
+        response.raise_for_status()
+        instance_id = response.json()["id"]
+        (await client.post(f"/api/instances/{instance_id}/activate")).raise_for_status()
+        instance_ids.append(instance_id)
+
+    tokens = []
+    for i in range(participants):
+        instance_id = instance_ids[i % projects]
+        response = await client.post(f"/api/instances/{instance_id}/participants", json={
+            "email": f"participant{i}@example.com",
+            "name": f"Participant {i}",
+            "background": "Finance operations",
+        })
+        response.raise_for_status()
+        tokens.append(response.json()["unique_token"])
+    return tokens
+
+
+async def _wait_until_ready(client: httpx.AsyncClient, timeout: float = 300.0):
+    """Wait for /ready, so the LLM client import and model warm-up fall outside the measurements."""
+    deadline = time.monotonic() + timeout
+    while (await client.get("/ready")).status_code != 200:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server not ready after {timeout:g}s")
+        await asyncio.sleep(0.2)
+
+
+async def run_load(
+    client: httpx.AsyncClient, args, probe: Optional[DBWaitProbe] = None, sent_at: Optional[dict] = None
+) -> dict:
+    """Drive all participants through start, chat and end phases."""
+    await _wait_until_ready(client)
+    tokens = await _setup(client, args.participants, args.turns, args.projects)
+    recorder = Recorder(sent_at)
+    limit = asyncio.Semaphore(args.concurrency or args.participants)
+    sessions: dict[str, int] = {}
+    in_process = args.url is None
+
+    async def start(token: str):
+        async with limit:
+            await recorder.request(client, OPEN, "GET", f"/api/interview/{token}")
+            response = await recorder.request(client, START, "POST", f"/api/interview/{token}/start")
+            if response is not None:
+                sessions[token] = response.json()["session_id"]
+
+    async def converse(index: int, session_id: int):
+        async with limit:
+            for turn in range(args.turns):
+                if args.think_time:
+                    await asyncio.sleep(random.uniform(0, args.think_time))
+                # Same messages on every run, so a recorded LLM cache replays without misses
+                await recorder.request(
+                    client, CHAT, "POST", f"/api/sessions/{session_id}/chat",
+                    json={"message": PARTICIPANT_MESSAGES[(index + turn) % len(PARTICIPANT_MESSAGES)]},
+                )
+
+    async def end(session_id: int):
+        async with limit:
+            await recorder.request(client, END, "POST", f"/api/sessions/{session_id}/end")
+
+    baseline = _memory_bytes(args.trace_memory) if in_process else None
+    started_at = time.perf_counter()
+
+    await asyncio.gather(*(start(token) for token in tokens))
+    after_start = _memory_bytes(args.trace_memory) if in_process else None
+    await asyncio.gather(*(converse(tokens.index(token), sid) for token, sid in sessions.items()))
+    after_chat = _memory_bytes(args.trace_memory) if in_process else None
+    await asyncio.gather(*(end(sid) for sid in sessions.values()))
+
+    wall = time.perf_counter() - started_at
+    if probe:
+        await probe.close_leaked()
+    total_requests = sum(len(v) for v in recorder.latencies.values())
+    live = len(sessions) or 1
+
+    def per_session(value):
+        if value is None or baseline is None:
+            return None
+        return round((value - baseline) / live)
+
+    return {
+        "endpoints": {label: summarize(values) for label, values in recorder.latencies.items()},
+        "errors": dict(recorder.errors),
+        "throughput": {
+            "wall_seconds": round(wall, 3),
+            "requests_per_second": round(total_requests / wall, 2),
+            "chat_turns_per_second": round(len(recorder.latencies[CHAT]) / wall, 2),
+            "sessions_completed": len(recorder.latencies[END]),
+        },
+        "db": probe.results() if probe else None,
+        "memory": {
+            "method": "tracemalloc" if args.trace_memory else "rss",
+            "per_session_bytes_after_start": per_session(after_start),
+            "per_session_bytes_after_chat": per_session(after_chat),
+        } if in_process else None,
+    }
+
+
+async def _run_in_process(args, stub: Optional[StubLLMServer]) -> dict:
+    scratch = Path(tempfile.mkdtemp(prefix="loadtest-"))
+    db_path = scratch / "interviews.db"
+    os.environ["DATABASE_PATH"] = str(db_path)
+    os.environ["STORAGE_BACKEND"] = args.storage
+    os.environ["SHARD_DIR"] = str(db_path.parent / "shards")
+    # The app would snapshot the scratch database at startup
+    os.environ["ANALYTICS_REFRESH_SECONDS"] = "0"
+    # Every simulated participant shares one client IP; rate limits would dominate the results
+    os.environ["ADMISSION_ENABLED"] = "true" if args.admission else "false"
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    if stub or args.llm == "replay":
+        os.environ["USE_MOCK_LLM"] = "false"
+        os.environ["LLM_MODEL"] = args.model
+    else:
+        os.environ["USE_MOCK_LLM"] = "true"
+    if stub:
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+    if args.llm_cache:
+        os.environ["LLM_CACHE_MODE"] = "replay" if args.llm == "replay" else "record"
+        os.environ["LLM_CACHE_FILE"] = str(args.llm_cache)
+        os.environ["LLM_CACHE_REPLAY_LATENCY_MS"] = str(args.llm_latency_ms)
+        os.environ["LLM_CACHE_REPLAY_TOKENS_PER_SECOND"] = str(args.llm_tokens_per_second)
+
+    # Import after configuring the environment, which is read at import time
+    from ..main import app
+    from ..scripts.init_db import init_database
+
+    probe = None
+    if args.storage in ("sqlite", "sharded"):
+        if args.storage == "sqlite":
+            init_database(db_path)
+        probe = DBWaitProbe()
+        probe.install()
+    if args.trace_memory:
+        tracemalloc.start()
+    try:
+        timer = ResponseTimer(app)
+        transport = httpx.ASGITransport(app=timer, raise_app_exceptions=False)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+                results = await run_load(client, args, probe, timer.sent_at)
+        if args.llm_cache:
+            from ..telemetry import metrics
+
+            results["llm_cache"] = {result: count for _, (result,), _, count in metrics.LLM_CACHE.samples()}
+        return results
+    finally:
+        if probe:
+            probe.uninstall()
+        if args.trace_memory:
+            tracemalloc.stop()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+async def _run_remote(args) -> dict:
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        return await run_load(client, args)
+
+
+def _print_summary(results: dict):
+    print(f"{'endpoint':<32} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, stats in results["endpoints"].items():
+        print(f"{label:<32} {stats['count']:>6} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+    throughput = results["throughput"]
+    print(f"throughput: {throughput['requests_per_second']} req/s, "
+          f"{throughput['chat_turns_per_second']} chat turns/s over {throughput['wall_seconds']}s")
+    if results["errors"]:
+        print(f"errors: {results['errors']}")
+    if results["db"]:
+        writes = results["db"]["write_statements"]
+        print(f"db writes: p95 {writes.get('p95_ms')} ms, lock errors: {results['db']['lock_errors']}, "
+              f"leaked connections: {results['db']['leaked_connections']}")
+    if results.get("llm_cache"):
+        print(f"llm cache: {results['llm_cache']}")
+    if results["memory"]:
+        memory = results["memory"]
+        print(f"memory/session ({memory['method']}): {memory['per_session_bytes_after_start']} B after start, "
+              f"{memory['per_session_bytes_after_chat']} B after chat")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent interview participants.")
+    parser.add_argument("--participants", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5, help="Chat messages per participant")
+    parser.add_argument("--concurrency", type=int, default=0, help="Max participants in flight (default: all)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max random pause before each message (s)")
+    parser.add_argument("--url", default=None, help="Load a running server instead of the in-process app")
+    parser.add_argument("--llm", choices=["stub", "mock", "replay"], default="stub",
+                        help="In-process only: stub LLM server, the built-in fallback responses, "
+                             "or responses replayed from --llm-cache")
+    parser.add_argument("--llm-cache", type=Path, default=None,
+                        help="In-process only: record stub responses to this file, or replay them with --llm replay")
+    parser.add_argument("--projects", type=int, default=1, help="Projects to spread participants over")
+    parser.add_argument("--storage", choices=["sqlite", "memory", "sharded"], default="sqlite",
+                        help="In-process only: storage backend for the app")
+    parser.add_argument("--model", default="ollama/stub")
+    parser.add_argument("--admission", action="store_true",
+                        help="In-process only: keep admission control (rate limits, load shedding) on")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--llm-questions", type=int, default=1,
+                        help="Questions per stub reply, one per line (exercises the stop after the first)")
+    parser.add_argument("--trace-memory", action="store_true", help="Measure memory with tracemalloc instead of RSS")
+    parser.add_argument("--output", type=Path, default=None, help="Directory for the JSON result file")
+    args = parser.parse_args()
+    if args.llm == "replay" and not args.llm_cache:
+        parser.error("--llm replay needs --llm-cache")
+
+    stub = None
+    if args.url is None and args.llm == "stub":
+        stub = StubLLMServer(
+            latency_ms=args.llm_latency_ms, tokens_per_second=args.llm_tokens_per_second, questions=args.llm_questions,
+        ).start()
+    try:
+        if args.url:
+            results = asyncio.run(_run_remote(args))
+        else:
+            results = asyncio.run(_run_in_process(args, stub))
+        if stub:
+            results["llm_stub_requests"] = stub.request_count
+    finally:
+        if stub:
+            stub.stop()
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    path = write_results("load_test", config, results, args.output)
+    _print_summary(results)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
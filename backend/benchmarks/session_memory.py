@@ -0,0 +1,91 @@
+"""Memory held per live session by the agent's conversation.
+
+For each history length in ``--turns``, builds ``--sessions`` conversations
+and measures with tracemalloc the bytes per session of:
+
+- the conversation as a list of message dicts (the previous layout)
+- the same conversation in a ``TurnLog``
+- a whole ``LLMAgent`` holding that conversation, with the system prompt
+  shared across sessions of the same instance
+
+Message texts are distinct per session, like real participant and model
+replies, and counted in every figure.
+
+    python -m backend.benchmarks.session_memory --sessions 500 --turns 10 50 200
+"""
+import argparse
+import gc
+import tracemalloc
+from pathlib import Path
+
+from .common import write_results
+from .followup_selector import INSTANCE_QUESTIONS
+from .load_test import PARTICIPANT_MESSAGES
+
+REPLIES = INSTANCE_QUESTIONS
+
+
+def _conversation(session: int, turns: int) -> list:
+    """``(role, content)`` pairs with texts unique to the session."""
+    messages = []
+    for turn in range(turns):
+        messages.append(("user", f"{PARTICIPANT_MESSAGES[turn % len(PARTICIPANT_MESSAGES)]} [{session}.{turn}]"))
+        messages.append(("assistant", f"{REPLIES[turn % len(REPLIES)]} [{session}.{turn}]"))
+    return messages
+
+
+def _bytes_per_session(build, sessions: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(session) for session in range(sessions)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-session conversation memory.")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--output", type=Path, default=None, help="Directory for the JSON result file")
+    args = parser.parse_args()
+
+    from ..agents.llm_agent import LLMAgent
+    from ..agents.turn_log import TurnLog
+
+    context = {"objective": "Invoice reconciliation", "questions": INSTANCE_QUESTIONS, "instance_id": 1}
+
+    def dict_list(session, turns):
+        return [{"role": role, "content": content} for role, content in _conversation(session, turns)]
+
+    def turn_log(session, turns):
+        log = TurnLog(max_chars=0)
+        for role, content in _conversation(session, turns):
+            log.append(role, content)
+        return log
+
+    def agent(session, turns):
+        llm_agent = LLMAgent(agent_type="explorer", context=context)
+        llm_agent.history = turn_log(session, turns)
+        return llm_agent
+
+    results = {}
+    print(f"{'turns':>6} {'dict list B':>12} {'TurnLog B':>12} {'saved':>7} {'agent B':>10}")
+    for turns in args.turns:
+        row = {
+            name: round(_bytes_per_session(lambda session: build(session, turns), args.sessions))
+            for name, build in (("dict_list", dict_list), ("turn_log", turn_log), ("agent", agent))
+        }
+        row["saved_pct"] = round(100 * (1 - row["turn_log"] / row["dict_list"]), 1)
+        results[str(turns)] = row
+        print(f"{turns:>6} {row['dict_list']:>12} {row['turn_log']:>12} {row['saved_pct']:>6}% {row['agent']:>10}")
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    path = write_results("session_memory", config, results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Cost of tracking many live sessions in the deadline scheduler.
+
+Tracks ``--sessions`` sessions, records ``--touches`` activity updates per
+session, then expires them all, reporting per-operation time, heap size and
+the traced memory held per session.
+
+    python -m backend.benchmarks.session_scheduler --sessions 100000 --touches 10
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from ..api.scheduler import SessionScheduler
+from .common import write_results
+
+
+async def _noop(expired):
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the session deadline scheduler.")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--touches", type=int, default=10, help="Activity updates per session")
+    parser.add_argument("--output", type=Path, default=None, help="Directory for the JSON result file")
+    args = parser.parse_args()
+
+    scheduler = SessionScheduler(_noop, idle_timeout=1800, batch_size=args.sessions, enabled=True)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    now = time.time()
+    for session_id in range(args.sessions):
+        scheduler.track(session_id, random.choice((600, 1200, 1800)), started_at=now)
+    track_seconds = time.perf_counter() - start
+    tracked_bytes = tracemalloc.get_traced_memory()[0] - baseline
+
+    start = time.perf_counter()
+    for _ in range(args.touches):
+        for session_id in range(args.sessions):
+            scheduler.touch(session_id)
+    touch_seconds = time.perf_counter() - start
+    heap_entries = len(scheduler._heap)
+    touched_bytes = tracemalloc.get_traced_memory()[0] - baseline
+
+    start = time.perf_counter()
+    expired = scheduler.pop_expired(now + 10_000)
+    expire_seconds = time.perf_counter() - start
+    tracemalloc.stop()
+
+    touches = args.sessions * args.touches
+    results = {
+        "track_us_per_session": round(track_seconds / args.sessions * 1e6, 3),
+        "touch_us": round(touch_seconds / touches * 1e6, 3) if touches else None,
+        "expire_us_per_session": round(expire_seconds / max(len(expired), 1) * 1e6, 3),
+        "expired": len(expired),
+        "heap_entries_after_touches": heap_entries,
+        "bytes_per_session_tracked": round(tracked_bytes / args.sessions),
+        "bytes_per_session_after_touches": round(touched_bytes / args.sessions),
+    }
+    for key, value in results.items():
+        print(f"{key:<34} {value}")
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    path = write_results("session_scheduler", config, results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
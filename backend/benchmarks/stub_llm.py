@@ -0,0 +1,263 @@
+"""Stub LLM server with configurable latency and token rate.
+
+Speaks enough of the Ollama (``/api/generate``, ``/api/chat``) and
+OpenAI (``/v1/chat/completions``) HTTP APIs for LiteLLM to talk to it, so
+load tests exercise the real agent code path without a model. Replies honour
+``max_tokens`` and stop sequences; ``--questions`` makes each reply ask
+several questions, one per line, like a model that runs past its first one.
+
+    python -m backend.benchmarks.stub_llm --port 11500 --latency-ms 300 --tokens-per-second 40
+"""
+import argparse
+import json
+import random
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+STUB_REPLIES = [
+    "Walk me through the last time you did that, step by step.",
+    "What tools or systems are you jumping between for that?",
+    "How long does that usually take, and how often do you do it?",
+    "What happens when that step goes wrong?",
+    "Who else gets involved before the work is done?",
+]
+
+
+class StubLLMServer:
+    """Threaded HTTP server that fakes LLM completions."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 200.0,
+        tokens_per_second: float = 50.0,
+        reply_tokens: Optional[int] = None,
+        handshake_ms: float = 0.0,
+        questions: int = 1,
+    ):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.handshake_ms = handshake_ms
+        self.questions = questions
+        self.connection_count = 0
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def _reply_tokens(self, max_tokens: Optional[int], stop: list) -> tuple:
+        """``(tokens, finish_reason)`` of one reply."""
+        text = "\n".join(random.choice(STUB_REPLIES) for _ in range(self.questions))
+        if self.reply_tokens:
+            words = text.split(" ")
+            text = " ".join((words * (self.reply_tokens // len(words) + 1))[:self.reply_tokens])
+        for sequence in stop:
+            index = text.find(sequence)
+            if index >= 0:
+                text = text[:index]
+        tokens = re.findall(r"\s*\S+", text)
+        if max_tokens and len(tokens) > max_tokens:
+            return tokens[:max_tokens], "length"
+        return tokens, "stop"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                # Like real model servers; otherwise Nagle + delayed ACK stall small chunks on reused connections
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with server._lock:
+                    server.connection_count += 1
+                # Stand-in for the TCP/TLS round trips of a remote endpoint, paid once per connection
+                if server.handshake_ms:
+                    time.sleep(server.handshake_ms / 1000)
+
+            def _send_json(self, payload: dict, status: int = 200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path.startswith("/api/tags"):
+                    self._send_json({"models": [{"name": "stub"}]})
+                else:
+                    self._send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.startswith("/api/show"):
+                    self._send_json({"template": "", "model_info": {}})
+                    return
+                if self.path not in ("/api/generate", "/api/chat", "/v1/chat/completions", "/chat/completions"):
+                    self._send_json({"error": "not found"}, 404)
+                    return
+
+                with server._lock:
+                    server.request_count += 1
+
+                options = request.get("options") or {}
+                max_tokens = request.get("max_tokens") or options.get("num_predict")
+                prompt = request.get("prompt") or json.dumps(request.get("messages", []))
+                prompt_tokens = max(1, len(prompt) // 4)
+                stop = request.get("stop") or options.get("stop") or []
+                tokens, finish_reason = server._reply_tokens(max_tokens, [stop] if isinstance(stop, str) else stop)
+                per_token = 1 / server.tokens_per_second if server.tokens_per_second else 0
+
+                time.sleep(server.latency_ms / 1000)
+                if request.get("stream"):
+                    try:
+                        self._stream(request, tokens, finish_reason, per_token, prompt_tokens)
+                    except (BrokenPipeError, ConnectionResetError):
+                        # The client hung up mid-reply, as it does at a stop it applies itself
+                        self.close_connection = True
+                    return
+
+                time.sleep(per_token * len(tokens))
+                self._send_json(self._completion(request, "".join(tokens), finish_reason, prompt_tokens, len(tokens)))
+
+            def _completion(
+                self, request: dict, text: str, finish_reason: str, prompt_tokens: int, completion_tokens: int,
+            ) -> dict:
+                model = request.get("model", "stub")
+                if self.path == "/api/generate":
+                    return {
+                        "model": model, "response": text, "done": True, "done_reason": finish_reason,
+                        "prompt_eval_count": prompt_tokens, "eval_count": completion_tokens,
+                    }
+                if self.path == "/api/chat":
+                    return {
+                        "model": model, "message": {"role": "assistant", "content": text},
+                        "done": True, "done_reason": finish_reason,
+                        "prompt_eval_count": prompt_tokens, "eval_count": completion_tokens,
+                    }
+                return {
+                    "id": f"stub-{time.time_ns()}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": finish_reason,
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                }
+
+            def _stream(self, request: dict, tokens: list, finish_reason: str, per_token: float, prompt_tokens: int):
+                openai = self.path not in ("/api/generate", "/api/chat")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream" if openai else "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                model = request.get("model", "stub")
+                for token in tokens:
+                    if openai:
+                        chunk = {
+                            "id": "stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                            "model": model,
+                            "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                        }
+                        self._send_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                    elif self.path == "/api/generate":
+                        self._send_chunk(json.dumps({"model": model, "response": token, "done": False}).encode() + b"\n")
+                    else:
+                        chunk = {"model": model, "message": {"role": "assistant", "content": token}, "done": False}
+                        self._send_chunk(json.dumps(chunk).encode() + b"\n")
+                    time.sleep(per_token)
+
+                if openai:
+                    final = {
+                        "id": "stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": len(tokens),
+                            "total_tokens": prompt_tokens + len(tokens),
+                        },
+                    }
+                    self._send_chunk(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+                else:
+                    final = {
+                        "model": model, "done": True, "done_reason": finish_reason, "response": "",
+                        "prompt_eval_count": prompt_tokens, "eval_count": len(tokens),
+                    }
+                    if self.path == "/api/chat":
+                        final["message"] = {"role": "assistant", "content": ""}
+                    self._send_chunk(json.dumps(final).encode() + b"\n")
+                self._send_chunk(b"")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Delay before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--reply-tokens", type=int, default=None, help="Fixed reply length in tokens")
+    parser.add_argument("--handshake-ms", type=float, default=0.0, help="Delay on each new connection")
+    parser.add_argument("--questions", type=int, default=1, help="Questions per reply, one per line")
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        args.host, args.port, args.latency_ms, args.tokens_per_second, args.reply_tokens, args.handshake_ms,
+        args.questions,
+    )
+    print(f"Stub LLM listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
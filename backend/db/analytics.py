@@ -0,0 +1,254 @@
+"""Read-only analytics replica of the interview database.
+
+Reporting scans (per-session reports, per-instance summaries) run against a
+snapshot of ``interviews.db`` rather than the live file, so they never hold
+locks that chat-turn writes would wait on.
+
+A refresh copies the live database with SQLite's online backup API into a
+temporary file, builds the denormalized reporting tables there, and renames
+it over ``ANALYTICS_DB_PATH``. Only the copy reads the live file; it holds a
+read lock for about as long as copying the file takes, which writers wait
+out within their busy timeout. Readers open the replica read-only and see
+either the previous snapshot or the new one, never a partial build.
+
+The app refreshes every ``ANALYTICS_REFRESH_SECONDS`` (0 disables the
+background refresh); reporting endpoints report the snapshot's age. Run a
+refresh by hand with:
+
+    python -m backend.scripts.refresh_analytics
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+
+from . import database
+from ..telemetry import metrics
+
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "300"))
+# Build a snapshot on the first report request when there is none yet
+ANALYTICS_BUILD_ON_DEMAND = os.getenv("ANALYTICS_BUILD_ON_DEMAND", "true").lower() == "true"
+
+# One row per session, joined with its participant and instance
+REPORT_SESSIONS = """
+CREATE TABLE report_sessions AS
+WITH message_counts AS (
+    SELECT session_id,
+           COUNT(*) AS messages,
+           SUM(role = 'user') AS participant_messages
+    FROM messages
+    GROUP BY session_id
+), insight_counts AS (
+    SELECT session_id, COUNT(*) AS insights
+    FROM insights
+    GROUP BY session_id
+)
+SELECT s.id AS session_id,
+       i.project_id,
+       i.id AS instance_id,
+       i.name AS instance_name,
+       i.status AS instance_status,
+       p.id AS participant_id,
+       p.email AS participant_email,
+       p.name AS participant_name,
+       p.status AS participant_status,
+       s.started_at,
+       s.completed_at,
+       s.duration_seconds,
+       s.turn_count,
+       IFNULL(mc.messages, IFNULL(a.message_count, 0)) AS messages,
+       -- Unknown for archived transcripts
+       CASE WHEN a.session_id IS NULL THEN IFNULL(mc.participant_messages, 0) END AS participant_messages,
+       IFNULL(ic.insights, 0) AS insights,
+       a.session_id IS NOT NULL AS archived
+FROM sessions s
+JOIN participants p ON p.id = s.participant_id
+JOIN instances i ON i.id = p.instance_id
+LEFT JOIN message_counts mc ON mc.session_id = s.id
+LEFT JOIN insight_counts ic ON ic.session_id = s.id
+LEFT JOIN archived_sessions a ON a.session_id = s.id
+"""
+
+# One row per instance with at least one session
+REPORT_INSTANCES = """
+CREATE TABLE report_instances AS
+SELECT instance_id,
+       project_id,
+       instance_name,
+       COUNT(*) AS sessions,
+       SUM(completed_at IS NOT NULL) AS closed_sessions,
+       SUM(participant_status = 'completed') AS completed,
+       SUM(participant_status = 'abandoned') AS abandoned,
+       AVG(CASE WHEN completed_at IS NOT NULL THEN turn_count END) AS avg_turns,
+       AVG(duration_seconds) AS avg_duration_seconds,
+       SUM(messages) AS messages,
+       SUM(insights) AS insights,
+       MIN(started_at) AS first_started_at,
+       MAX(started_at) AS last_started_at
+FROM report_sessions
+GROUP BY instance_id
+"""
+
+REPORT_INDEXES = """
+CREATE INDEX idx_report_sessions_instance ON report_sessions(instance_id, started_at);
+CREATE UNIQUE INDEX idx_report_instances_instance ON report_instances(instance_id);
+CREATE TABLE snapshot_info (taken_at REAL NOT NULL, build_seconds REAL NOT NULL);
+"""
+
+
+def replica_path() -> Path:
+    return Path(os.getenv("ANALYTICS_DB_PATH", database.DB_PATH.with_name("analytics.db")))
+
+
+def refresh(source: Optional[Path] = None, target: Optional[Path] = None) -> dict:
+    """Take a snapshot of ``source`` and publish it as the replica ``target``.
+
+    Blocking; the app runs it in a worker thread.
+    """
+    source = Path(source or database.DB_PATH)
+    target = Path(target or replica_path())
+    building = target.with_name(target.name + ".tmp")
+    building.unlink(missing_ok=True)
+
+    start = time.perf_counter()
+    live = sqlite3.connect(source)
+    snapshot = sqlite3.connect(building)
+    try:
+        live.backup(snapshot)
+        taken_at = time.time()
+        copy_seconds = time.perf_counter() - start
+        snapshot.execute(REPORT_SESSIONS)
+        snapshot.execute(REPORT_INSTANCES)
+        snapshot.executescript(REPORT_INDEXES)
+        build_seconds = time.perf_counter() - start
+        snapshot.execute("INSERT INTO snapshot_info VALUES (?, ?)", (taken_at, build_seconds))
+        snapshot.commit()
+    finally:
+        snapshot.close()
+        live.close()
+    os.replace(building, target)
+    metrics.observe_stage("analytics_copy", copy_seconds)
+    metrics.observe_stage("analytics_refresh", build_seconds)
+    return {"taken_at": taken_at, "copy_seconds": copy_seconds, "build_seconds": build_seconds}
+
+
+_refresh_lock: Optional[asyncio.Lock] = None
+
+
+async def refresh_async() -> dict:
+    """``refresh`` off the event loop; concurrent callers share one run."""
+    global _refresh_lock
+    if _refresh_lock is None:
+        _refresh_lock = asyncio.Lock()
+    if _refresh_lock.locked():
+        async with _refresh_lock:
+            return {"taken_at": _snapshot_taken_at()}
+    async with _refresh_lock:
+        return await asyncio.to_thread(refresh)
+
+
+def _snapshot_taken_at() -> Optional[float]:
+    path = replica_path()
+    if not path.exists():
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT taken_at FROM snapshot_info").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def snapshot_age_seconds() -> Optional[float]:
+    taken_at = _snapshot_taken_at()
+    return None if taken_at is None else max(0.0, time.time() - taken_at)
+
+
+def _snapshot_info(taken_at: float) -> dict:
+    return {
+        "taken_at": datetime.fromtimestamp(taken_at, timezone.utc).isoformat(),
+        "age_seconds": round(max(0.0, time.time() - taken_at), 3),
+    }
+
+
+async def _connect_replica() -> Optional[aiosqlite.Connection]:
+    path = replica_path()
+    if not path.exists():
+        if not ANALYTICS_BUILD_ON_DEMAND:
+            return None
+        await refresh_async()
+    db = await aiosqlite.connect(f"file:{path}?mode=ro", uri=True)
+    db.row_factory = aiosqlite.Row
+    return db
+
+
+async def get_instance_report(instance_id: int) -> Optional[dict]:
+    """Summary and per-session rows of an instance from the replica.
+
+    None when there is no snapshot; ``summary`` is None when the instance had
+    no sessions at snapshot time. ``snapshot`` carries the snapshot's age.
+    """
+    db = await _connect_replica()
+    if db is None:
+        return None
+    try:
+        cursor = await db.execute("SELECT taken_at FROM snapshot_info")
+        taken_at = (await cursor.fetchone())["taken_at"]
+        cursor = await db.execute("SELECT * FROM report_instances WHERE instance_id = ?", (instance_id,))
+        summary = await cursor.fetchone()
+        cursor = await db.execute(
+            "SELECT * FROM report_sessions WHERE instance_id = ? ORDER BY started_at", (instance_id,)
+        )
+        sessions = [dict(row) for row in await cursor.fetchall()]
+    finally:
+        await db.close()
+    return {
+        "snapshot": _snapshot_info(taken_at),
+        "summary": dict(summary) if summary else None,
+        "sessions": sessions,
+    }
+
+
+class SnapshotRefresher:
+    """Refreshes the replica every ``interval`` seconds on the event loop."""
+
+    def __init__(self, interval: float = ANALYTICS_REFRESH_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    async def run(self):
+        while True:
+            try:
+                await refresh_async()
+            except Exception as e:
+                print(f"Analytics snapshot failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+refresher = SnapshotRefresher()
+metrics.ANALYTICS_SNAPSHOT_AGE.set_function(lambda: snapshot_age_seconds() or 0)
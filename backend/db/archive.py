@@ -0,0 +1,240 @@
+"""Cold storage for transcripts of completed sessions.
+
+Messages of sessions completed more than ``ARCHIVE_AFTER_DAYS`` ago are
+moved out of the SQLite file into one append-only segment file per
+instance under ``ARCHIVE_DIR``. Each session is written as its own
+compressed member (gzip, or zstd with the ``zstandard`` package and
+``ARCHIVE_COMPRESSION=zstd``) holding the message rows as JSON lines, and
+the ``archived_sessions`` table records its segment, byte offset and
+length, so reading one transcript is a seek plus one decompress.
+
+Segments are appended before the index rows are committed and the hot rows
+deleted, so a crash leaves at most unreferenced bytes in a segment, never a
+lost transcript. ``purge`` drops archived transcripts past
+``ARCHIVE_RETENTION_DAYS`` by copying the rest of each affected segment to a
+new file. Archive and purge runs must not overlap (the CLI runs one at a
+time). Both work on the database ``database.use_database`` selects; the CLI
+runs them once per shard with ``STORAGE_BACKEND=sharded``, all writing to
+the one ``ARCHIVE_DIR`` (instance ids are unique across shards).
+
+Run from the repo root:
+
+    python -m backend.scripts.archive_sessions archive --older-than-days 30
+    python -m backend.scripts.archive_sessions purge --retention-days 365
+"""
+import asyncio
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+
+from . import database
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", database.DB_PATH.parent / "archive"))
+ARCHIVE_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "gzip").lower()
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_RETENTION_DAYS = float(os.getenv("ARCHIVE_RETENTION_DAYS", "0"))  # 0 keeps archives forever
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "200"))
+
+
+def _codec() -> str:
+    if ARCHIVE_COMPRESSION == "zstd":
+        if zstandard is not None:
+            return "zst"
+        print("ARCHIVE_COMPRESSION=zstd but zstandard is not installed; using gzip")
+    return "gz"
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("Reading a zstd archive segment requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def encode_transcript(messages: list) -> bytes:
+    return b"".join(json.dumps(message, separators=(",", ":")).encode() + b"\n" for message in messages)
+
+
+def decode_transcript(data: bytes) -> list:
+    return [json.loads(line) for line in data.splitlines() if line]
+
+
+def _append_members(segment: Path, members: list) -> list:
+    """Append compressed members to a segment; return their (offset, length)."""
+    segment.parent.mkdir(parents=True, exist_ok=True)
+    positions = []
+    with open(segment, "ab") as f:
+        offset = f.seek(0, os.SEEK_END)
+        for member in members:
+            f.write(member)
+            positions.append((offset, len(member)))
+            offset += len(member)
+        f.flush()
+        os.fsync(f.fileno())
+    return positions
+
+
+def _read_member(segment: Path, offset: int, length: int) -> list:
+    with open(segment, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    return decode_transcript(decompress(data, segment.suffix.lstrip(".")))
+
+
+async def read_archived_member(segment: str, offset: int, length: int) -> list:
+    """Messages stored at ``offset`` in ``segment``, as indexed in ``archived_sessions``."""
+    return await asyncio.to_thread(_read_member, ARCHIVE_DIR / segment, offset, length)
+
+
+async def archive_sessions(older_than_days: float = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE) -> dict:
+    """Move transcripts of sessions completed before the cutoff into segments.
+
+    Works in batches of ``batch_size`` sessions, each committed on its own.
+    """
+    codec = _codec()
+    archived = messages_moved = bytes_written = 0
+    while True:
+        db = await database.get_db()
+        cursor = await db.execute(
+            """SELECT s.id AS session_id, p.instance_id
+               FROM sessions s
+               JOIN participants p ON p.id = s.participant_id
+               WHERE s.completed_at IS NOT NULL
+                 AND julianday(s.completed_at) < julianday('now') - ?
+                 AND s.id NOT IN (SELECT session_id FROM archived_sessions)
+                 AND EXISTS (SELECT 1 FROM messages m WHERE m.session_id = s.id)
+               ORDER BY p.instance_id, s.id
+               LIMIT ?""",
+            (older_than_days, batch_size)
+        )
+        batch = [dict(row) for row in await cursor.fetchall()]
+        if not batch:
+            await db.close()
+            break
+
+        session_ids = [row["session_id"] for row in batch]
+        placeholders = ", ".join("?" for _ in session_ids)
+        cursor = await db.execute(
+            f"SELECT {', '.join(database.MESSAGE_COLUMNS)} FROM messages WHERE session_id IN ({placeholders}) "
+            "ORDER BY session_id, timestamp, id",
+            session_ids
+        )
+        transcripts: dict[int, list] = {session_id: [] for session_id in session_ids}
+        for row in await cursor.fetchall():
+            transcripts[row["session_id"]].append(dict(row))
+
+        by_instance: dict[int, list] = {}
+        for row in batch:
+            by_instance.setdefault(row["instance_id"], []).append(row["session_id"])
+
+        index_rows = []
+        for instance_id, ids in by_instance.items():
+            segment = f"instance-{instance_id}.jsonl.{codec}"
+            members = [compress(encode_transcript(transcripts[session_id]), codec) for session_id in ids]
+            positions = await asyncio.to_thread(_append_members, ARCHIVE_DIR / segment, members)
+            for session_id, (offset, length) in zip(ids, positions):
+                index_rows.append((session_id, instance_id, segment, offset, length, len(transcripts[session_id])))
+                bytes_written += length
+
+        await db.executemany(
+            """INSERT INTO archived_sessions (session_id, instance_id, segment, offset, length, message_count)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            index_rows
+        )
+        await db.execute(f"DELETE FROM messages WHERE session_id IN ({placeholders})", session_ids)
+        await db.commit()
+        await db.close()
+        archived += len(batch)
+        messages_moved += sum(len(messages) for messages in transcripts.values())
+
+    return {"sessions": archived, "messages": messages_moved, "bytes_written": bytes_written}
+
+
+def _copy_members(source: Path, target: Path, keep: list) -> list:
+    """Copy the kept members into a new segment; return their new (offset, length)."""
+    positions = []
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        for offset, length in keep:
+            src.seek(offset)
+            positions.append((dst.tell(), length))
+            dst.write(src.read(length))
+        dst.flush()
+        os.fsync(dst.fileno())
+    return positions
+
+
+async def purge(retention_days: float = ARCHIVE_RETENTION_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE) -> dict:
+    """Delete archived transcripts older than the retention period.
+
+    Each affected segment is rewritten once, keeping the remaining members,
+    and its index rows are updated in the same transaction.
+    """
+    if retention_days <= 0:
+        return {"sessions": 0, "segments": 0}
+    purged = segments = 0
+    db = await database.get_db()
+    cursor = await db.execute(
+        """SELECT DISTINCT segment FROM archived_sessions
+           WHERE julianday(archived_at) < julianday('now') - ?""",
+        (retention_days,)
+    )
+    affected = [row["segment"] for row in await cursor.fetchall()]
+    await db.close()
+
+    for segment in affected:
+        db = await database.get_db()
+        cursor = await db.execute(
+            """SELECT session_id, instance_id, offset, length,
+                      julianday(archived_at) < julianday('now') - ? AS expired
+               FROM archived_sessions WHERE segment = ? ORDER BY offset""",
+            (retention_days, segment)
+        )
+        rows = [dict(row) for row in await cursor.fetchall()]
+        expired = [row["session_id"] for row in rows if row["expired"]]
+        kept = [row for row in rows if not row["expired"]]
+        path = ARCHIVE_DIR / segment
+
+        if kept:
+            # Write survivors to a new segment and repoint the index before the old file goes,
+            # so a crash at any point leaves every indexed offset valid
+            new_segment = f"instance-{kept[0]['instance_id']}-{time.time_ns()}.jsonl.{path.suffix.lstrip('.')}"
+            positions = await asyncio.to_thread(
+                _copy_members, path, ARCHIVE_DIR / new_segment, [(r["offset"], r["length"]) for r in kept]
+            )
+            await db.executemany(
+                "UPDATE archived_sessions SET segment = ?, offset = ? WHERE session_id = ?",
+                [(new_segment, offset, row["session_id"]) for row, (offset, _) in zip(kept, positions)]
+            )
+        for start in range(0, len(expired), batch_size):
+            chunk = expired[start:start + batch_size]
+            await db.execute(
+                f"DELETE FROM archived_sessions WHERE session_id IN ({', '.join('?' for _ in chunk)})", chunk
+            )
+        await db.commit()
+        await db.close()
+        path.unlink(missing_ok=True)
+        purged += len(expired)
+        segments += 1
+
+    return {"sessions": purged, "segments": segments}
+
+
+async def vacuum():
+    """Return the space freed by archiving to the filesystem."""
+    db = await database.get_db()
+    await db.execute("VACUUM")
+    await db.close()
@@ -1,21 +1,153 @@
 """Database connection and utilities."""
 import aiosqlite
+import asyncio
+import contextlib
+import contextvars
+import functools
 import json
+import os
 from pathlib import Path
 from typing import Optional
 import secrets
 
-DB_PATH = Path(__file__).parent.parent.parent / "interviews.db"
+from ..telemetry import metrics
+from ..telemetry.metrics import METRICS_ENABLED, timed
+from ..telemetry.tracing import traced
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DB_PATH = Path(os.getenv("DATABASE_PATH", Path(__file__).parent.parent.parent / "interviews.db"))
+
+# Millisecond-resolution UTC timestamp; CURRENT_TIMESTAMP only has whole seconds
+NOW_MS = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+COALESCE_READS = os.getenv("DB_COALESCE_READS", "true").lower() == "true"
+
+
+# Set by the shard router (db.sharding) to run operations against a shard file
+_database_path: contextvars.ContextVar = contextvars.ContextVar("database_path", default=None)
+
+
+@contextlib.contextmanager
+def use_database(path: Path):
+    """Run the operations awaited inside the block against the database at ``path``."""
+    token = _database_path.set(path)
+    try:
+        yield
+    finally:
+        _database_path.reset(token)
 
 
 async def get_db():
     """Get database connection."""
-    db = await aiosqlite.connect(DB_PATH)
+    db = await aiosqlite.connect(_database_path.get() or DB_PATH)
     db.row_factory = aiosqlite.Row
     return db
 
 
+# Identical reads in flight at the same time share one query. Every finished
+# write bumps the generation, so a read issued after a write never joins a
+# read that started before it (callers still see their own writes).
+_write_generation = 0
+_reads_in_flight: dict = {}
+
+
+def _coalesced(fn):
+    """Let concurrent calls with the same arguments await a single query.
+
+    Results are shared between the coalesced callers and must be treated as
+    read-only.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        key = (fn.__name__, args, tuple(sorted(kwargs.items())), _database_path.get(), _write_generation)
+        task = _reads_in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            _reads_in_flight[key] = task
+            task.add_done_callback(lambda done: _forget_read(key, done))
+        else:
+            metrics.DB_COALESCED_READS.inc(operation=fn.__name__)
+        # A cancelled caller must not cancel the query the others are waiting on
+        return await asyncio.shield(task)
+    return wrapper
+
+
+def _forget_read(key, task):
+    _reads_in_flight.pop(key, None)
+    if not task.cancelled():
+        # Mark the exception retrieved when every waiter was cancelled
+        task.exception()
+
+
+def _bumps_generation(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        global _write_generation
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _write_generation += 1
+    return wrapper
+
+
+def _instrumented(kind: str):
+    """Trace an operation and record its duration as a db_read/db_write stage.
+
+    Reads are coalesced (see ``_coalesced``) unless ``DB_COALESCE_READS=false``.
+    """
+    def decorator(fn):
+        fn = traced(f"db.{fn.__name__}")(fn)
+        if kind == "read" and COALESCE_READS:
+            fn = _coalesced(fn)
+        elif kind == "write":
+            fn = _bumps_generation(fn)
+        if not METRICS_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with timed(f"db_{kind}", fn.__name__):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_json_column(raw: str) -> tuple:
+    return tuple(orjson.loads(raw) if orjson else json.loads(raw))
+
+
+def _load_questions(data: dict) -> dict:
+    """Decode the ``questions`` JSON column in place.
+
+    Instances are read far more often than they change, so decoded values are
+    cached by their stored text; each caller gets its own list.
+    """
+    if data.get("questions"):
+        data["questions"] = list(_parse_json_column(data["questions"]))
+    return data
+
+
+def _dump_json(value) -> str:
+    return orjson.dumps(value).decode() if orjson else json.dumps(value)
+
+
+def _children(rows) -> Optional[list]:
+    """Child rows of a ``parent LEFT JOIN child`` query, or None without a parent.
+
+    A parent with no children yields one row whose child columns are all NULL.
+    """
+    if not rows:
+        return None
+    return [dict(row) for row in rows if row["id"] is not None]
+
+
 # User operations
+@_instrumented("write")
 async def create_user(email: str, name: Optional[str] = None) -> dict:
     db = await get_db()
     cursor = await db.execute(
@@ -28,6 +160,7 @@ async def create_user(email: str, name: Optional[str] = None) -> dict:
     return {"id": user_id, "email": email, "name": name}
 
 
+@_instrumented("read")
 async def get_user_by_email(email: str) -> Optional[dict]:
     db = await get_db()
     cursor = await db.execute("SELECT * FROM users WHERE email = ?", (email,))
@@ -44,6 +177,7 @@ async def get_or_create_user(email: str, name: Optional[str] = None) -> dict:
 
 
 # Project operations
+@_instrumented("write")
 async def create_project(user_id: int, name: str, description: Optional[str] = None) -> dict:
     db = await get_db()
     cursor = await db.execute(
@@ -59,6 +193,7 @@ async def create_project(user_id: int, name: str, description: Optional[str] = N
     return dict(row)
 
 
+@_instrumented("read")
 async def get_project(project_id: int) -> Optional[dict]:
     db = await get_db()
     cursor = await db.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
@@ -67,6 +202,7 @@ async def get_project(project_id: int) -> Optional[dict]:
     return dict(row) if row else None
 
 
+@_instrumented("read")
 async def get_user_projects(user_id: int) -> list:
     db = await get_db()
     cursor = await db.execute(
@@ -78,6 +214,23 @@ async def get_user_projects(user_id: int) -> list:
     return [dict(row) for row in rows]
 
 
+@_instrumented("read")
+async def get_user_projects_by_email(email: str) -> Optional[list]:
+    """Projects of the user with ``email``, or None if there is no such user."""
+    db = await get_db()
+    cursor = await db.execute(
+        """SELECT p.* FROM users u
+           LEFT JOIN projects p ON p.user_id = u.id
+           WHERE u.email = ?
+           ORDER BY p.created_at DESC""",
+        (email,)
+    )
+    rows = await cursor.fetchall()
+    await db.close()
+    return _children(rows)
+
+
+@_instrumented("write")
 async def update_project(project_id: int, **kwargs) -> Optional[dict]:
     db = await get_db()
     # Build SET clause dynamically
@@ -101,24 +254,103 @@ async def update_project(project_id: int, **kwargs) -> Optional[dict]:
     return dict(row) if row else None
 
 
-async def get_project_instances(project_id: int) -> list:
+@_instrumented("read")
+async def get_project_instances(project_id: int) -> Optional[list]:
+    """Instances of a project, or None if the project does not exist."""
     db = await get_db()
     cursor = await db.execute(
-        "SELECT * FROM instances WHERE project_id = ? ORDER BY created_at DESC",
+        """SELECT i.* FROM projects p
+           LEFT JOIN instances i ON i.project_id = p.id
+           WHERE p.id = ?
+           ORDER BY i.created_at DESC""",
         (project_id,)
     )
     rows = await cursor.fetchall()
     await db.close()
-    result = []
-    for row in rows:
-        data = dict(row)
-        if data.get("questions"):
-            data["questions"] = json.loads(data["questions"])
-        result.append(data)
-    return result
+    instances = _children(rows)
+    return [_load_questions(row) for row in instances] if instances is not None else None
+
+
+# Every open session of a project, with what its SESSION_ENDED event reports
+OPEN_PROJECT_SESSIONS = """
+SELECT s.id AS session_id, s.participant_id, p.instance_id, s.turn_count,
+       CAST(ROUND((julianday(?1) - julianday(s.started_at)) * 86400) AS INTEGER) AS duration_seconds
+FROM sessions s
+JOIN participants p ON p.id = s.participant_id
+JOIN instances i ON i.id = p.instance_id
+WHERE i.project_id = ?2 AND s.completed_at IS NULL
+"""
+
+
+async def _close_project_instances(db, project_id: int) -> int:
+    cursor = await db.execute(
+        "UPDATE instances SET status = 'closed' WHERE project_id = ? AND status IS NOT 'closed'", (project_id,)
+    )
+    return cursor.rowcount
+
+
+@_instrumented("write")
+async def close_project_instances(project_id: int) -> Optional[int]:
+    """Close every instance of a project; the number closed, or None if the project does not exist."""
+    db = await get_db()
+    try:
+        cursor = await db.execute("SELECT 1 FROM projects WHERE id = ?", (project_id,))
+        if not await cursor.fetchone():
+            return None
+        closed = await _close_project_instances(db, project_id)
+        await db.commit()
+    finally:
+        await db.close()
+    return closed
+
+
+@_instrumented("write")
+async def archive_project(project_id: int) -> Optional[dict]:
+    """Archive a project with everything under it, in one transaction.
+
+    Its instances are closed, its open sessions end now, and participants
+    still in an interview are marked abandoned. Returns the project, the
+    number of ``instances_closed`` and the ``sessions_closed`` (rows shaped
+    like those of ``close_expired_sessions``, reason ``archived``), or None
+    if the project does not exist.
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "UPDATE projects SET status = 'archived', updated_at = CURRENT_TIMESTAMP WHERE id = ?", (project_id,)
+        )
+        if cursor.rowcount == 0:
+            return None
+        instances_closed = await _close_project_instances(db, project_id)
+        # One end time for every session, read inside the write transaction
+        cursor = await db.execute(f"SELECT {NOW_MS}")
+        ended_at = (await cursor.fetchone())[0]
+        cursor = await db.execute(OPEN_PROJECT_SESSIONS, (ended_at, project_id))
+        sessions_closed = [{**dict(row), "reason": "archived"} for row in await cursor.fetchall()]
+        await db.execute(
+            """UPDATE sessions SET
+                   completed_at = ?1,
+                   duration_seconds = CAST(ROUND((julianday(?1) - julianday(started_at)) * 86400) AS INTEGER)
+               WHERE completed_at IS NULL AND participant_id IN (
+                   SELECT p.id FROM participants p JOIN instances i ON i.id = p.instance_id WHERE i.project_id = ?2
+               )""",
+            (ended_at, project_id)
+        )
+        await db.execute(
+            """UPDATE participants SET status = 'abandoned'
+               WHERE status = 'started' AND instance_id IN (SELECT id FROM instances WHERE project_id = ?)""",
+            (project_id,)
+        )
+        await db.commit()
+        cursor = await db.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
+        project = dict(await cursor.fetchone())
+    finally:
+        await db.close()
+    return {"project": project, "instances_closed": instances_closed, "sessions_closed": sessions_closed}
 
 
 # Instance operations
+@_instrumented("write")
 async def create_instance(
     user_id: int,
     name: str,
@@ -128,38 +360,37 @@ async def create_instance(
     questions: Optional[list] = None,
     timebox_minutes: int = 30,
     max_turns: int = 20
-) -> dict:
+) -> Optional[dict]:
+    """Create an instance; returns None if ``project_id`` names a missing project."""
     db = await get_db()
     cursor = await db.execute(
         """INSERT INTO instances
            (project_id, user_id, name, agent_type, objective, questions, timebox_minutes, max_turns, status)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'draft')""",
-        (project_id, user_id, name, agent_type, objective, json.dumps(questions) if questions else None, timebox_minutes, max_turns)
+           SELECT ?, ?, ?, ?, ?, ?, ?, ?, 'draft'
+           WHERE ?1 IS NULL OR EXISTS (SELECT 1 FROM projects WHERE id = ?1)""",
+        (project_id, user_id, name, agent_type, objective, _dump_json(questions) if questions else None, timebox_minutes, max_turns)
     )
     await db.commit()
+    if cursor.rowcount == 0:
+        await db.close()
+        return None
     instance_id = cursor.lastrowid
     cursor = await db.execute("SELECT * FROM instances WHERE id = ?", (instance_id,))
     row = await cursor.fetchone()
     await db.close()
-    data = dict(row)
-    if data.get("questions"):
-        data["questions"] = json.loads(data["questions"])
-    return data
+    return _load_questions(dict(row))
 
 
+@_instrumented("read")
 async def get_instance(instance_id: int) -> Optional[dict]:
     db = await get_db()
     cursor = await db.execute("SELECT * FROM instances WHERE id = ?", (instance_id,))
     row = await cursor.fetchone()
     await db.close()
-    if row:
-        data = dict(row)
-        if data.get("questions"):
-            data["questions"] = json.loads(data["questions"])
-        return data
-    return None
+    return _load_questions(dict(row)) if row else None
 
 
+@_instrumented("read")
 async def get_user_instances(user_id: int) -> list:
     db = await get_db()
     cursor = await db.execute("SELECT * FROM instances WHERE user_id = ? ORDER BY created_at DESC", (user_id,))
@@ -168,33 +399,136 @@ async def get_user_instances(user_id: int) -> list:
     return [dict(row) for row in rows]
 
 
-async def update_instance_status(instance_id: int, status: str):
+@_instrumented("read")
+async def get_user_instances_by_email(email: str) -> Optional[list]:
+    """Instances of the user with ``email``, or None if there is no such user."""
     db = await get_db()
-    await db.execute("UPDATE instances SET status = ? WHERE id = ?", (status, instance_id))
+    cursor = await db.execute(
+        """SELECT i.* FROM users u
+           LEFT JOIN instances i ON i.user_id = u.id
+           WHERE u.email = ?
+           ORDER BY i.created_at DESC""",
+        (email,)
+    )
+    rows = await cursor.fetchall()
+    await db.close()
+    return _children(rows)
+
+
+@_instrumented("read")
+async def get_instance_stats(instance_id: int) -> Optional[dict]:
+    """Response counts and averages for an instance, from the trigger-maintained instance_stats row."""
+    db = await get_db()
+    cursor = await db.execute("SELECT * FROM instance_stats WHERE instance_id = ?", (instance_id,))
+    row = await cursor.fetchone()
+    await db.close()
+    if not row:
+        return None
+    data = dict(row)
+    completed = data["completed_sessions"]
+    data["avg_turns"] = data["completed_turns"] / completed if completed else None
+    data["avg_duration_seconds"] = data["completed_duration_seconds"] / completed if completed else None
+    return data
+
+
+@_instrumented("write")
+async def update_instance_status(instance_id: int, status: str) -> bool:
+    """Set an instance's status; False if the instance does not exist."""
+    db = await get_db()
+    cursor = await db.execute("UPDATE instances SET status = ? WHERE id = ?", (status, instance_id))
     await db.commit()
     await db.close()
+    return cursor.rowcount > 0
+
+
+# Copies an instance's participants into instance ?1 under the tokens of the
+# JSON array ?2, which holds one token per participant of instance ?3
+CLONE_PARTICIPANTS = """
+INSERT INTO participants (instance_id, email, name, background, unique_token, status)
+SELECT ?1, p.email, p.name, p.background, t.value, 'invited'
+FROM (SELECT *, ROW_NUMBER() OVER (ORDER BY id) - 1 AS n FROM participants WHERE instance_id = ?3) p
+JOIN json_each(?2) t ON t.key = p.n
+ORDER BY p.id
+"""
+
+
+@_instrumented("write")
+async def clone_instance(
+    instance_id: int,
+    name: Optional[str] = None,
+    include_participants: bool = False,
+    token_prefix: str = ""
+) -> Optional[dict]:
+    """Copy an instance as a new draft in the same project, in one transaction.
+
+    ``name`` defaults to the original's followed by " (copy)". With
+    ``include_participants`` its participants are invited again under fresh
+    tokens (``token_prefix`` followed by a random part). Sessions, transcripts
+    and the anonymous link are not copied. Returns the new instance with its
+    ``participants``, or None if the instance does not exist.
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """INSERT INTO instances
+               (project_id, user_id, name, agent_type, objective, questions, timebox_minutes, max_turns, status)
+               SELECT project_id, user_id, IFNULL(?, name || ' (copy)'), agent_type, objective, questions,
+                      timebox_minutes, max_turns, 'draft'
+               FROM instances WHERE id = ?""",
+            (name, instance_id)
+        )
+        if cursor.rowcount == 0:
+            return None
+        clone_id = cursor.lastrowid
+        participants = []
+        if include_participants:
+            # The insert above holds the write lock, so no participant can be added in between
+            cursor = await db.execute("SELECT COUNT(*) FROM participants WHERE instance_id = ?", (instance_id,))
+            tokens = [token_prefix + secrets.token_urlsafe(32) for _ in range((await cursor.fetchone())[0])]
+            await db.execute(CLONE_PARTICIPANTS, (clone_id, _dump_json(tokens), instance_id))
+            cursor = await db.execute(
+                "SELECT id, email, name, unique_token, status FROM participants WHERE instance_id = ? ORDER BY id",
+                (clone_id,)
+            )
+            participants = [dict(row) for row in await cursor.fetchall()]
+        await db.commit()
+        cursor = await db.execute("SELECT * FROM instances WHERE id = ?", (clone_id,))
+        instance = _load_questions(dict(await cursor.fetchone()))
+    finally:
+        await db.close()
+    return {**instance, "participants": participants}
 
 
 # Participant operations
+@_instrumented("write")
 async def create_participant(
     instance_id: int,
     email: str,
     name: Optional[str] = None,
-    background: Optional[str] = None
-) -> dict:
-    token = secrets.token_urlsafe(32)
+    background: Optional[str] = None,
+    token: Optional[str] = None
+) -> Optional[dict]:
+    """Invite a participant; returns None if the instance does not exist.
+
+    ``token`` defaults to a random link token.
+    """
+    token = token or secrets.token_urlsafe(32)
     db = await get_db()
     cursor = await db.execute(
         """INSERT INTO participants (instance_id, email, name, background, unique_token, status)
-           VALUES (?, ?, ?, ?, ?, 'invited')""",
+           SELECT ?1, ?, ?, ?, ?, 'invited'
+           WHERE EXISTS (SELECT 1 FROM instances WHERE id = ?1)""",
         (instance_id, email, name, background, token)
     )
     await db.commit()
-    participant_id = cursor.lastrowid
+    participant_id = cursor.lastrowid if cursor.rowcount else None
     await db.close()
+    if participant_id is None:
+        return None
     return {"id": participant_id, "email": email, "unique_token": token, "status": "invited"}
 
 
+@_instrumented("read")
 async def get_participant_by_token(token: str) -> Optional[dict]:
     db = await get_db()
     cursor = await db.execute("SELECT * FROM participants WHERE unique_token = ?", (token,))
@@ -203,6 +537,29 @@ async def get_participant_by_token(token: str) -> Optional[dict]:
     return dict(row) if row else None
 
 
+@_instrumented("read")
+async def get_participant_with_instance(token: str) -> Optional[tuple]:
+    """The participant with ``token`` and their instance, as ``(participant, instance)``."""
+    db = await get_db()
+    # Both tables have an id column; the marker column splits the joined row
+    cursor = await db.execute(
+        """SELECT p.*, NULL AS instance_columns, i.* FROM participants p
+           JOIN instances i ON i.id = p.instance_id
+           WHERE p.unique_token = ?""",
+        (token,)
+    )
+    row = await cursor.fetchone()
+    names = [column[0] for column in cursor.description]
+    await db.close()
+    if not row:
+        return None
+    split = names.index("instance_columns")
+    participant = dict(zip(names[:split], row[:split]))
+    instance = dict(zip(names[split + 1:], row[split + 1:]))
+    return participant, _load_questions(instance)
+
+
+@_instrumented("write")
 async def update_participant_status(participant_id: int, status: str):
     db = await get_db()
     await db.execute("UPDATE participants SET status = ? WHERE id = ?", (status, participant_id))
@@ -211,10 +568,11 @@ async def update_participant_status(participant_id: int, status: str):
 
 
 # Session operations
+@_instrumented("write")
 async def create_session(participant_id: int) -> dict:
     db = await get_db()
     cursor = await db.execute(
-        "INSERT INTO sessions (participant_id) VALUES (?)",
+        f"INSERT INTO sessions (participant_id, started_at, last_activity_at) VALUES (?, {NOW_MS}, {NOW_MS})",
         (participant_id,)
     )
     await db.commit()
@@ -223,17 +581,28 @@ async def create_session(participant_id: int) -> dict:
     return {"id": session_id, "participant_id": participant_id, "turn_count": 0}
 
 
+@_instrumented("read")
 async def get_session(session_id: int) -> Optional[dict]:
+    """A session with the ``instance_id`` of its participant."""
     db = await get_db()
-    cursor = await db.execute("SELECT * FROM sessions WHERE id = ?", (session_id,))
+    cursor = await db.execute(
+        """SELECT s.*, p.instance_id FROM sessions s
+           LEFT JOIN participants p ON p.id = s.participant_id
+           WHERE s.id = ?""",
+        (session_id,)
+    )
     row = await cursor.fetchone()
     await db.close()
     return dict(row) if row else None
 
 
+@_instrumented("write")
 async def increment_turn_count(session_id: int) -> int:
     db = await get_db()
-    await db.execute("UPDATE sessions SET turn_count = turn_count + 1 WHERE id = ?", (session_id,))
+    await db.execute(
+        f"UPDATE sessions SET turn_count = turn_count + 1, last_activity_at = {NOW_MS} WHERE id = ?",
+        (session_id,)
+    )
     await db.commit()
     cursor = await db.execute("SELECT turn_count FROM sessions WHERE id = ?", (session_id,))
     row = await cursor.fetchone()
@@ -241,21 +610,135 @@ async def increment_turn_count(session_id: int) -> int:
     return row["turn_count"]
 
 
-async def complete_session(session_id: int, duration_seconds: int):
-    db = await get_db()
+# Per-turn latencies from consecutive messages: a user message answering the
+# agent is the participant's response time, an assistant message answering the
+# participant is the agent's. One pass over the session's messages.
+SESSION_TIMING_QUERY = """
+WITH ordered AS (
+    SELECT role,
+           julianday(timestamp) AS t,
+           LAG(role) OVER w AS prev_role,
+           LAG(julianday(timestamp)) OVER w AS prev_t
+    FROM messages
+    WHERE session_id = ?
+    WINDOW w AS (ORDER BY timestamp, id)
+),
+gaps AS (
+    SELECT CASE WHEN role = 'user' AND prev_role = 'assistant' THEN (t - prev_t) * 86400.0 END AS participant,
+           CASE WHEN role = 'assistant' AND prev_role = 'user' THEN (t - prev_t) * 86400.0 END AS agent
+    FROM ordered
+)
+SELECT COUNT(participant) AS participant_turns,
+       AVG(participant) AS participant_avg_seconds,
+       MAX(participant) AS participant_max_seconds,
+       COUNT(agent) AS agent_turns,
+       AVG(agent) AS agent_avg_seconds,
+       MAX(agent) AS agent_max_seconds
+FROM gaps
+"""
+
+
+async def _finish_session(db, session_id: int, ended_at_sql: str):
+    """Set completion time, duration and timing metadata; the caller commits."""
+    cursor = await db.execute(SESSION_TIMING_QUERY, (session_id,))
+    timing = {
+        key: round(value, 3) if isinstance(value, float) else value
+        for key, value in dict(await cursor.fetchone()).items()
+    }
     await db.execute(
-        "UPDATE sessions SET completed_at = CURRENT_TIMESTAMP, duration_seconds = ? WHERE id = ?",
-        (duration_seconds, session_id)
+        f"""UPDATE sessions SET
+               completed_at = {ended_at_sql},
+               duration_seconds = CAST(ROUND((julianday({ended_at_sql}) - julianday(started_at)) * 86400) AS INTEGER),
+               metadata = json_set(IFNULL(metadata, '{{}}'), '$.timing', json(?))
+           WHERE id = ? AND completed_at IS NULL""",
+        (_dump_json(timing), session_id)
+    )
+
+
+@_instrumented("write")
+async def complete_session(session_id: int) -> Optional[dict]:
+    """Mark a session completed and store its timing.
+
+    Duration runs from ``started_at`` to now. Per-turn participant and agent
+    response times are aggregated from message timestamps and stored under
+    ``timing`` in the session's ``metadata``. Completing an already
+    completed session leaves it unchanged. Returns the timing, or None if the
+    session does not exist.
+    """
+    db = await get_db()
+    await _finish_session(db, session_id, NOW_MS)
+    await db.commit()
+    cursor = await db.execute(
+        "SELECT started_at, last_activity_at, completed_at, duration_seconds, metadata FROM sessions WHERE id = ?",
+        (session_id,)
+    )
+    row = await cursor.fetchone()
+    await db.close()
+    if not row:
+        return None
+    data = dict(row)
+    raw_metadata = data.pop("metadata")
+    metadata = (orjson.loads(raw_metadata) if orjson else json.loads(raw_metadata)) if raw_metadata else {}
+    return {**data, **metadata.get("timing", {})}
+
+
+@_instrumented("write")
+async def close_expired_sessions(expired: list) -> list:
+    """Complete sessions closed by the scheduler in one transaction.
+
+    ``expired`` holds ``(session_id, reason)`` pairs. Timeboxed sessions end
+    now and their participants are marked completed; idle sessions end at
+    their last activity and their participants are marked abandoned.
+    Returns the closed sessions with their participant and instance ids.
+    """
+    if not expired:
+        return []
+    db = await get_db()
+    for session_id, reason in expired:
+        ended_at = NOW_MS if reason == "timebox" else "IFNULL(last_activity_at, started_at)"
+        await _finish_session(db, session_id, ended_at)
+    placeholders = ", ".join("?" for _ in expired)
+    cursor = await db.execute(
+        f"""SELECT s.id AS session_id, s.participant_id, p.instance_id, s.turn_count, s.duration_seconds
+            FROM sessions s JOIN participants p ON p.id = s.participant_id
+            WHERE s.id IN ({placeholders})""",
+        [session_id for session_id, _ in expired]
+    )
+    closed = [dict(row) for row in await cursor.fetchall()]
+    reasons = dict(expired)
+    for row in closed:
+        row["reason"] = reasons[row["session_id"]]
+    await db.executemany(
+        "UPDATE participants SET status = ? WHERE id = ? AND status = 'started'",
+        [("completed" if row["reason"] == "timebox" else "abandoned", row["participant_id"]) for row in closed]
     )
     await db.commit()
     await db.close()
+    return closed
+
+
+@_instrumented("read")
+async def get_open_sessions() -> list:
+    """Sessions not yet completed, with the timebox of their instance."""
+    db = await get_db()
+    cursor = await db.execute(
+        """SELECT s.id, s.started_at, s.last_activity_at, i.timebox_minutes
+           FROM sessions s
+           JOIN participants p ON p.id = s.participant_id
+           JOIN instances i ON i.id = p.instance_id
+           WHERE s.completed_at IS NULL"""
+    )
+    rows = await cursor.fetchall()
+    await db.close()
+    return [dict(row) for row in rows]
 
 
 # Message operations
+@_instrumented("write")
 async def add_message(session_id: int, role: str, content: str, audio_input: bool = False) -> dict:
     db = await get_db()
     cursor = await db.execute(
-        "INSERT INTO messages (session_id, role, content, audio_input) VALUES (?, ?, ?, ?)",
+        f"INSERT INTO messages (session_id, role, content, audio_input, timestamp) VALUES (?, ?, ?, ?, {NOW_MS})",
         (session_id, role, content, audio_input)
     )
     await db.commit()
@@ -264,18 +747,35 @@ async def add_message(session_id: int, role: str, content: str, audio_input: boo
     return {"id": message_id, "role": role, "content": content}
 
 
+MESSAGE_COLUMNS = ("id", "session_id", "role", "content", "audio_input", "timestamp")
+
+# A session's messages, or, once archived, its one archived_sessions row (NULL timestamp, so first)
+SESSION_MESSAGES = f"""
+SELECT {", ".join(MESSAGE_COLUMNS)}, NULL AS segment, NULL AS offset, NULL AS length
+FROM messages WHERE session_id = ?1
+UNION ALL
+SELECT {", ".join("NULL" for _ in MESSAGE_COLUMNS)}, segment, offset, length
+FROM archived_sessions WHERE session_id = ?1
+ORDER BY timestamp
+"""
+
+
+@_instrumented("read")
 async def get_session_messages(session_id: int) -> list:
     db = await get_db()
-    cursor = await db.execute(
-        "SELECT * FROM messages WHERE session_id = ? ORDER BY timestamp",
-        (session_id,)
-    )
+    cursor = await db.execute(SESSION_MESSAGES, (session_id,))
     rows = await cursor.fetchall()
     await db.close()
-    return [dict(row) for row in rows]
+    if rows and rows[0]["segment"] is not None:
+        # Completed sessions past the archive cutoff live in cold storage
+        from .archive import read_archived_member
+
+        return await read_archived_member(rows[0]["segment"], rows[0]["offset"], rows[0]["length"])
+    return [{column: row[column] for column in MESSAGE_COLUMNS} for row in rows]
 
 
 # Insight operations
+@_instrumented("write")
 async def add_insight(session_id: int, insight_type: str, content: str, confidence: float = 1.0):
     db = await get_db()
     await db.execute(
@@ -286,6 +786,7 @@ async def add_insight(session_id: int, insight_type: str, content: str, confiden
     await db.close()
 
 
+@_instrumented("read")
 async def get_session_insights(session_id: int) -> list:
     db = await get_db()
     cursor = await db.execute(
@@ -298,6 +799,7 @@ async def get_session_insights(session_id: int) -> list:
 
 
 # Anonymous link operations
+@_instrumented("read")
 async def get_anonymous_link(instance_id: int) -> Optional[dict]:
     db = await get_db()
     cursor = await db.execute(
@@ -315,6 +817,7 @@ async def get_anonymous_link(instance_id: int) -> Optional[dict]:
     return None
 
 
+@_instrumented("write")
 async def create_anonymous_link(instance_id: int, base_url: str) -> dict:
     """Create anonymous link settings for an instance."""
     # Generate a unique URL using the instance ID
@@ -336,6 +839,7 @@ async def create_anonymous_link(instance_id: int, base_url: str) -> dict:
     return data
 
 
+@_instrumented("write")
 async def update_anonymous_link(instance_id: int, **kwargs) -> Optional[dict]:
     """Update anonymous link settings."""
     db = await get_db()
@@ -374,6 +878,7 @@ async def get_or_create_anonymous_link(instance_id: int, base_url: str) -> dict:
     return await create_anonymous_link(instance_id, base_url)
 
 
+@_instrumented("write")
 async def update_instance(instance_id: int, **kwargs) -> Optional[dict]:
     """Update an instance."""
     db = await get_db()
@@ -382,7 +887,7 @@ async def update_instance(instance_id: int, **kwargs) -> Optional[dict]:
     for key, value in kwargs.items():
         if value is not None:
             if key == "questions":
-                value = json.dumps(value)
+                value = _dump_json(value)
             set_parts.append(f"{key} = ?")
             values.append(value)
 
@@ -395,21 +900,20 @@ async def update_instance(instance_id: int, **kwargs) -> Optional[dict]:
     cursor = await db.execute("SELECT * FROM instances WHERE id = ?", (instance_id,))
     row = await cursor.fetchone()
     await db.close()
-    if row:
-        data = dict(row)
-        if data.get("questions"):
-            data["questions"] = json.loads(data["questions"])
-        return data
-    return None
+    return _load_questions(dict(row)) if row else None
 
 
-async def get_instance_participants(instance_id: int) -> list:
-    """Get all participants for an instance."""
+@_instrumented("read")
+async def get_instance_participants(instance_id: int) -> Optional[list]:
+    """Get all participants for an instance, or None if the instance does not exist."""
     db = await get_db()
     cursor = await db.execute(
-        "SELECT * FROM participants WHERE instance_id = ? ORDER BY created_at DESC",
+        """SELECT p.* FROM instances i
+           LEFT JOIN participants p ON p.instance_id = i.id
+           WHERE i.id = ?
+           ORDER BY p.created_at DESC""",
         (instance_id,)
     )
     rows = await cursor.fetchall()
     await db.close()
-    return [dict(row) for row in rows]
+    return _children(rows)
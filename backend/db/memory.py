@@ -0,0 +1,407 @@
+"""In-memory storage backend for tests and benchmarks.
+
+Keeps every table in process-local dicts and mirrors the row shapes and
+ordering of the SQLite backend, so the API behaves the same on either.
+Nothing is persisted; data is lost when the process exits.
+"""
+import copy
+import secrets
+from datetime import datetime, timezone
+from typing import Optional
+
+from .storage import StorageBackend
+
+
+def _now() -> str:
+    # Same text format as the SQLite millisecond timestamps
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def _seconds_between(start: str, end: str) -> float:
+    return (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds()
+
+
+def session_timing(messages: list) -> dict:
+    """Per-turn participant and agent response times, as computed by SESSION_TIMING_QUERY."""
+    gaps = {"participant": [], "agent": []}
+    for previous, message in zip(messages, messages[1:]):
+        if message["role"] == "user" and previous["role"] == "assistant":
+            gaps["participant"].append(_seconds_between(previous["timestamp"], message["timestamp"]))
+        elif message["role"] == "assistant" and previous["role"] == "user":
+            gaps["agent"].append(_seconds_between(previous["timestamp"], message["timestamp"]))
+    timing = {}
+    for who, values in gaps.items():
+        timing[f"{who}_turns"] = len(values)
+        timing[f"{who}_avg_seconds"] = round(sum(values) / len(values), 3) if values else None
+        timing[f"{who}_max_seconds"] = round(max(values), 3) if values else None
+    return timing
+
+
+class _Table:
+    """Rows by id with an autoincrementing key."""
+
+    def __init__(self):
+        self.rows: dict[int, dict] = {}
+        self._next_id = 1
+
+    def insert(self, row: dict) -> dict:
+        row = {"id": self._next_id, **row}
+        self.rows[self._next_id] = row
+        self._next_id += 1
+        return row
+
+    def get(self, row_id) -> Optional[dict]:
+        return self.rows.get(row_id)
+
+    def where(self, **conditions) -> list:
+        return [row for row in self.rows.values() if all(row.get(k) == v for k, v in conditions.items())]
+
+
+def _copy(row: Optional[dict]) -> Optional[dict]:
+    return copy.deepcopy(row) if row is not None else None
+
+
+def _newest_first(rows: list) -> list:
+    return [_copy(row) for row in sorted(rows, key=lambda r: (r["created_at"], r["id"]), reverse=True)]
+
+
+def _apply_updates(row: dict, kwargs: dict):
+    for key, value in kwargs.items():
+        if value is not None:
+            row[key] = value.isoformat(" ") if isinstance(value, datetime) else value
+
+
+class MemoryStorage(StorageBackend):
+    """Process-local storage with the same behaviour as :class:`SQLiteStorage`."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.users = _Table()
+        self.projects = _Table()
+        self.instances = _Table()
+        self.participants = _Table()
+        self.sessions = _Table()
+        self.messages = _Table()
+        self.insights = _Table()
+        self.anonymous_links = _Table()
+        self._messages_by_session: dict[int, list] = {}
+        self._participants_by_token: dict[str, dict] = {}
+
+    # Users
+    async def create_user(self, email, name=None):
+        row = self.users.insert({"email": email, "name": name, "created_at": _now()})
+        return {"id": row["id"], "email": email, "name": name}
+
+    async def get_user_by_email(self, email):
+        rows = self.users.where(email=email)
+        return _copy(rows[0]) if rows else None
+
+    # Projects
+    async def create_project(self, user_id, name, description=None):
+        now = _now()
+        return _copy(self.projects.insert({
+            "user_id": user_id, "name": name, "description": description,
+            "status": "draft", "created_at": now, "updated_at": now,
+        }))
+
+    async def get_project(self, project_id):
+        return _copy(self.projects.get(project_id))
+
+    async def get_user_projects(self, user_id):
+        return _newest_first(self.projects.where(user_id=user_id))
+
+    async def get_user_projects_by_email(self, email):
+        users = self.users.where(email=email)
+        return await self.get_user_projects(users[0]["id"]) if users else None
+
+    async def update_project(self, project_id, **kwargs):
+        row = self.projects.get(project_id)
+        if row is None:
+            return None
+        if any(value is not None for value in kwargs.values()):
+            _apply_updates(row, kwargs)
+            row["updated_at"] = _now()
+        return _copy(row)
+
+    async def get_project_instances(self, project_id):
+        if self.projects.get(project_id) is None:
+            return None
+        return _newest_first(self.instances.where(project_id=project_id))
+
+    def _close_project_instances(self, project_id: int) -> int:
+        instances = [row for row in self.instances.where(project_id=project_id) if row["status"] != "closed"]
+        for row in instances:
+            row["status"] = "closed"
+        return len(instances)
+
+    async def close_project_instances(self, project_id):
+        if self.projects.get(project_id) is None:
+            return None
+        return self._close_project_instances(project_id)
+
+    async def archive_project(self, project_id):
+        project = self.projects.get(project_id)
+        if project is None:
+            return None
+        project["status"] = "archived"
+        project["updated_at"] = _now()
+        instances_closed = self._close_project_instances(project_id)
+        ended_at = _now()
+        instance_ids = {row["id"] for row in self.instances.where(project_id=project_id)}
+        participants = {row["id"]: row for row in self.participants.rows.values() if row["instance_id"] in instance_ids}
+        sessions_closed = []
+        for row in self.sessions.rows.values():
+            participant = participants.get(row["participant_id"])
+            if participant is None or row["completed_at"] is not None:
+                continue
+            row["completed_at"] = ended_at
+            row["duration_seconds"] = round(_seconds_between(row["started_at"], ended_at))
+            sessions_closed.append({
+                "session_id": row["id"],
+                "participant_id": row["participant_id"],
+                "instance_id": participant["instance_id"],
+                "turn_count": row["turn_count"],
+                "duration_seconds": row["duration_seconds"],
+                "reason": "archived",
+            })
+        for participant in participants.values():
+            if participant["status"] == "started":
+                participant["status"] = "abandoned"
+        return {"project": _copy(project), "instances_closed": instances_closed, "sessions_closed": sessions_closed}
+
+    # Instances
+    async def create_instance(self, user_id, name, agent_type, project_id=None, objective=None,
+                              questions=None, timebox_minutes=30, max_turns=20):
+        if project_id is not None and self.projects.get(project_id) is None:
+            return None
+        return _copy(self.instances.insert({
+            "project_id": project_id, "user_id": user_id, "name": name, "agent_type": agent_type,
+            "objective": objective, "questions": list(questions) if questions else None,
+            "timebox_minutes": timebox_minutes, "max_turns": max_turns,
+            "status": "draft", "created_at": _now(),
+        }))
+
+    async def get_instance(self, instance_id):
+        return _copy(self.instances.get(instance_id))
+
+    async def get_user_instances(self, user_id):
+        return _newest_first(self.instances.where(user_id=user_id))
+
+    async def get_user_instances_by_email(self, email):
+        users = self.users.where(email=email)
+        return await self.get_user_instances(users[0]["id"]) if users else None
+
+    async def update_instance(self, instance_id, **kwargs):
+        row = self.instances.get(instance_id)
+        if row is None:
+            return None
+        _apply_updates(row, kwargs)
+        return _copy(row)
+
+    async def update_instance_status(self, instance_id, status):
+        row = self.instances.get(instance_id)
+        if row is None:
+            return False
+        row["status"] = status
+        return True
+
+    async def clone_instance(self, instance_id, name=None, include_participants=False):
+        source = self.instances.get(instance_id)
+        if source is None:
+            return None
+        clone = self.instances.insert({
+            **{key: copy.deepcopy(value) for key, value in source.items() if key != "id"},
+            "name": name if name is not None else f"{source['name']} (copy)",
+            "status": "draft", "created_at": _now(),
+        })
+        participants = []
+        if include_participants:
+            for row in sorted(self.participants.where(instance_id=instance_id), key=lambda r: r["id"]):
+                token = secrets.token_urlsafe(32)
+                copied = self.participants.insert({
+                    "instance_id": clone["id"], "email": row["email"], "name": row["name"],
+                    "background": row["background"], "unique_token": token, "status": "invited",
+                    "created_at": _now(),
+                })
+                self._participants_by_token[token] = copied
+                participants.append({
+                    "id": copied["id"], "email": row["email"], "name": row["name"],
+                    "unique_token": token, "status": "invited",
+                })
+        return {**_copy(clone), "participants": participants}
+
+    async def get_instance_stats(self, instance_id):
+        if self.instances.get(instance_id) is None:
+            return None
+        participants = self.participants.where(instance_id=instance_id)
+        stats = {"instance_id": instance_id}
+        for status in ("invited", "started", "completed", "abandoned"):
+            stats[status] = sum(1 for p in participants if p["status"] == status)
+        participant_ids = {p["id"] for p in participants}
+        sessions = [s for s in self.sessions.rows.values() if s["participant_id"] in participant_ids]
+        completed = [s for s in sessions if s["completed_at"] is not None]
+        stats.update({
+            "sessions": len(sessions),
+            "completed_sessions": len(completed),
+            "total_turns": sum(s["turn_count"] for s in sessions),
+            "completed_turns": sum(s["turn_count"] for s in completed),
+            "completed_duration_seconds": sum(s["duration_seconds"] or 0 for s in completed),
+        })
+        stats["avg_turns"] = stats["completed_turns"] / len(completed) if completed else None
+        stats["avg_duration_seconds"] = stats["completed_duration_seconds"] / len(completed) if completed else None
+        return stats
+
+    # Participants
+    async def create_participant(self, instance_id, email, name=None, background=None):
+        if self.instances.get(instance_id) is None:
+            return None
+        token = secrets.token_urlsafe(32)
+        row = self.participants.insert({
+            "instance_id": instance_id, "email": email, "name": name, "background": background,
+            "unique_token": token, "status": "invited", "created_at": _now(),
+        })
+        self._participants_by_token[token] = row
+        return {"id": row["id"], "email": email, "unique_token": token, "status": "invited"}
+
+    async def get_participant_by_token(self, token):
+        return _copy(self._participants_by_token.get(token))
+
+    async def get_participant_with_instance(self, token):
+        participant = self._participants_by_token.get(token)
+        instance = self.instances.get(participant["instance_id"]) if participant else None
+        if instance is None:
+            return None
+        return _copy(participant), _copy(instance)
+
+    async def update_participant_status(self, participant_id, status):
+        row = self.participants.get(participant_id)
+        if row is not None:
+            row["status"] = status
+
+    async def get_instance_participants(self, instance_id):
+        if self.instances.get(instance_id) is None:
+            return None
+        return _newest_first(self.participants.where(instance_id=instance_id))
+
+    # Sessions
+    async def create_session(self, participant_id):
+        now = _now()
+        row = self.sessions.insert({
+            "participant_id": participant_id, "started_at": now, "last_activity_at": now,
+            "completed_at": None, "duration_seconds": None, "turn_count": 0, "metadata": None,
+        })
+        self._messages_by_session[row["id"]] = []
+        return {"id": row["id"], "participant_id": participant_id, "turn_count": 0}
+
+    async def get_session(self, session_id):
+        row = self.sessions.get(session_id)
+        if row is None:
+            return None
+        participant = self.participants.get(row["participant_id"])
+        return {**_copy(row), "instance_id": participant["instance_id"] if participant else None}
+
+    async def increment_turn_count(self, session_id):
+        row = self.sessions.get(session_id)
+        if row is None:
+            raise KeyError(session_id)
+        row["turn_count"] += 1
+        row["last_activity_at"] = _now()
+        return row["turn_count"]
+
+    def _finish(self, row: dict, ended_at: str):
+        if row["completed_at"] is not None:
+            return
+        row["completed_at"] = ended_at
+        row["duration_seconds"] = round(_seconds_between(row["started_at"], ended_at))
+        row["metadata"] = {**(row["metadata"] or {}), "timing": session_timing(self._messages_by_session[row["id"]])}
+
+    async def complete_session(self, session_id):
+        row = self.sessions.get(session_id)
+        if row is None:
+            return None
+        self._finish(row, _now())
+        return {
+            "started_at": row["started_at"],
+            "last_activity_at": row["last_activity_at"],
+            "completed_at": row["completed_at"],
+            "duration_seconds": row["duration_seconds"],
+            **row["metadata"]["timing"],
+        }
+
+    async def close_expired_sessions(self, expired):
+        closed = []
+        for session_id, reason in expired:
+            row = self.sessions.get(session_id)
+            if row is None:
+                continue
+            self._finish(row, _now() if reason == "timebox" else row["last_activity_at"] or row["started_at"])
+            participant = self.participants.get(row["participant_id"])
+            if participant is not None and participant["status"] == "started":
+                participant["status"] = "completed" if reason == "timebox" else "abandoned"
+            closed.append({
+                "session_id": session_id,
+                "participant_id": row["participant_id"],
+                "instance_id": participant["instance_id"] if participant else None,
+                "turn_count": row["turn_count"],
+                "duration_seconds": row["duration_seconds"],
+                "reason": reason,
+            })
+        return closed
+
+    async def get_open_sessions(self):
+        open_sessions = []
+        for row in self.sessions.rows.values():
+            if row["completed_at"] is not None:
+                continue
+            participant = self.participants.get(row["participant_id"])
+            instance = self.instances.get(participant["instance_id"]) if participant else None
+            if instance is not None:
+                open_sessions.append({
+                    "id": row["id"],
+                    "started_at": row["started_at"],
+                    "last_activity_at": row["last_activity_at"],
+                    "timebox_minutes": instance["timebox_minutes"],
+                })
+        return open_sessions
+
+    # Messages and insights
+    async def add_message(self, session_id, role, content, audio_input=False):
+        row = self.messages.insert({
+            "session_id": session_id, "role": role, "content": content,
+            "audio_input": int(bool(audio_input)), "timestamp": _now(),
+        })
+        self._messages_by_session.setdefault(session_id, []).append(row)
+        return {"id": row["id"], "role": role, "content": content}
+
+    async def get_session_messages(self, session_id):
+        return [dict(row) for row in self._messages_by_session.get(session_id, [])]
+
+    async def add_insight(self, session_id, insight_type, content, confidence=1.0):
+        self.insights.insert({
+            "session_id": session_id, "insight_type": insight_type, "content": content,
+            "confidence": confidence, "extracted_at": _now(),
+        })
+
+    async def get_session_insights(self, session_id):
+        return [_copy(row) for row in self.insights.where(session_id=session_id)]
+
+    # Anonymous links
+    async def get_anonymous_link(self, instance_id):
+        rows = self.anonymous_links.where(instance_id=instance_id)
+        return _copy(rows[0]) if rows else None
+
+    async def create_anonymous_link(self, instance_id, base_url):
+        return _copy(self.anonymous_links.insert({
+            "instance_id": instance_id, "enabled": True,
+            "url": f"{base_url}/interview/anon-{secrets.token_urlsafe(16)}",
+            "allow_multiple": False, "max_responses": None, "current_responses": 0,
+            "expires_at": None, "created_at": _now(),
+        }))
+
+    async def update_anonymous_link(self, instance_id, **kwargs):
+        rows = self.anonymous_links.where(instance_id=instance_id)
+        if not rows:
+            return None
+        _apply_updates(rows[0], kwargs)
+        return _copy(rows[0])
@@ -1,7 +1,7 @@
 """Pydantic models for the API."""
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 # User models
@@ -59,6 +59,11 @@ class InstanceUpdate(BaseModel):
     max_turns: Optional[int] = None
 
 
+class InstanceClone(BaseModel):
+    name: Optional[str] = None
+    include_participants: bool = False
+
+
 class Instance(BaseModel):
     id: int
     project_id: Optional[int]
@@ -140,6 +145,8 @@ class Message(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     audio_input: bool = False
+    # Chosen by the client once per message; retries reuse it
+    idempotency_key: Optional[str] = Field(None, max_length=128)
 
 
 class ChatResponse(BaseModel):
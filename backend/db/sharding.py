@@ -0,0 +1,526 @@
+"""Per-project sharding of the SQLite database.
+
+With ``STORAGE_BACKEND=sharded`` each project gets its own SQLite file
+(``SHARD_DIR/project_<id>.db``) holding its instances, participants,
+sessions, messages, insights and anonymous links, and a catalog database
+(``SHARD_DIR/catalog.db``) holds users and projects. A busy project then
+only waits on its own writer lock.
+
+Every file uses the regular schema (``scripts/init_db.py``), so the
+``db.database`` operations run unchanged against whichever file
+``database.use_database`` selects. A shard also keeps a copy of its
+project's row, which the instance queries join on.
+
+Routing needs no lookup for rows created in a shard:
+
+- ids: a project's shard allocates row ids from ``project_id << 32``
+  upwards, so ``row_id >> 32`` is the project
+- participant tokens: prefixed with ``<project_id>.``
+
+Rows carried over by :func:`split_database` keep their original ids and
+tokens; the catalog indexes them (``shard_index``, ``participant_tokens``).
+Instances without a project go to shard 0, which continues the source's id
+sequences; new rows there are indexed too.
+
+Split an existing database with:
+
+    python -m backend.scripts.shard_database --source interviews.db --target-dir shards
+"""
+import asyncio
+import os
+import secrets
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+
+from . import database
+from .storage import StorageBackend
+from ..scripts.init_db import SCHEMA, rebuild_instance_stats
+
+SHARD_DIR = Path(os.getenv("SHARD_DIR", database.DB_PATH.parent / "shards"))
+SHARD_ID_BITS = 32
+
+# Tables whose row ids a shard allocates from its project's range
+SHARDED_TABLES = ("instances", "participants", "sessions", "messages", "insights", "anonymous_links")
+
+CATALOG_SCHEMA = """
+-- Shard of rows whose id does not encode their project
+CREATE TABLE IF NOT EXISTS shard_index (
+    kind TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, row_id)
+) WITHOUT ROWID;
+
+-- Shard of participant tokens without a project prefix
+CREATE TABLE IF NOT EXISTS participant_tokens (
+    token TEXT PRIMARY KEY,
+    project_id INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+TOKEN_SEPARATOR = "."
+
+
+def id_base(project_id: int) -> int:
+    """First row id a project's shard allocates."""
+    return project_id << SHARD_ID_BITS
+
+
+def encoded_project(row_id: int) -> int:
+    return row_id >> SHARD_ID_BITS
+
+
+def shard_token(project_id: int) -> str:
+    """A random participant token that names its project's shard."""
+    return f"{project_id}{TOKEN_SEPARATOR}{secrets.token_urlsafe(32)}"
+
+
+def token_project(token: str) -> Optional[int]:
+    """The project a token names, or None for an unprefixed token."""
+    prefix, separator, _ = token.partition(TOKEN_SEPARATOR)
+    return int(prefix) if separator and prefix.isdigit() else None
+
+
+def init_catalog(path: Path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA + CATALOG_SCHEMA)
+    conn.commit()
+    conn.close()
+
+
+def init_shard(path: Path, project_id: int, project: Optional[dict] = None):
+    """Create a shard file with its id range and a copy of its project's row."""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    base = id_base(project_id)
+    for table in SHARDED_TABLES:
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, base))
+        elif row[0] < base:
+            conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (base, table))
+    if project:
+        columns = ", ".join(project)
+        placeholders = ", ".join("?" for _ in project)
+        conn.execute(f"INSERT OR REPLACE INTO projects ({columns}) VALUES ({placeholders})", tuple(project.values()))
+    conn.commit()
+    conn.close()
+
+
+class ShardRouter:
+    """Maps projects, row ids and participant tokens to database files."""
+
+    def __init__(self, directory: Path = SHARD_DIR):
+        self.directory = Path(directory)
+        self.catalog = self.directory / "catalog.db"
+        self._shards: set[int] = set()
+        # Catalog index lookups; migrated rows never move
+        self._indexed: dict[tuple, int] = {}
+
+    def ensure_catalog(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        init_catalog(self.catalog)
+
+    def shard_path(self, project_id: int) -> Path:
+        return self.directory / f"project_{project_id}.db"
+
+    def has_shard(self, project_id: int) -> bool:
+        if project_id in self._shards:
+            return True
+        if self.shard_path(project_id).exists():
+            self._shards.add(project_id)
+            return True
+        return False
+
+    async def create_shard(self, project_id: int, project: Optional[dict] = None) -> Path:
+        path = self.shard_path(project_id)
+        await asyncio.to_thread(init_shard, path, project_id, project)
+        self._shards.add(project_id)
+        return path
+
+    def shards(self) -> list:
+        """Paths of every project shard."""
+        return sorted(self.directory.glob("project_*.db"))
+
+    async def _catalog_lookup(self, query: str, params: tuple) -> Optional[int]:
+        db = await aiosqlite.connect(self.catalog)
+        try:
+            cursor = await db.execute(query, params)
+            row = await cursor.fetchone()
+        finally:
+            await db.close()
+        return row[0] if row else None
+
+    async def project_of(self, kind: str, row_id: int) -> Optional[int]:
+        """Project holding the ``kind`` row ``row_id``, or None if unknown."""
+        if encoded_project(row_id):
+            return encoded_project(row_id)
+        key = (kind, row_id)
+        if key not in self._indexed:
+            project_id = await self._catalog_lookup(
+                "SELECT project_id FROM shard_index WHERE kind = ? AND row_id = ?", key
+            )
+            if project_id is None:
+                return None
+            self._indexed[key] = project_id
+        return self._indexed[key]
+
+    async def project_of_token(self, token: str) -> Optional[int]:
+        project_id = token_project(token)
+        if project_id is not None:
+            return project_id
+        return await self._catalog_lookup("SELECT project_id FROM participant_tokens WHERE token = ?", (token,))
+
+    async def shard_of(self, kind: str, row_id: int) -> Optional[Path]:
+        project_id = await self.project_of(kind, row_id)
+        if project_id is None or not self.has_shard(project_id):
+            return None
+        return self.shard_path(project_id)
+
+    async def index(self, kind: str, row_id: int, project_id: int):
+        """Record the shard of a row whose id does not encode it."""
+        await self.index_many(kind, [row_id], project_id)
+
+    async def index_many(self, kind: str, row_ids: list, project_id: int):
+        db = await aiosqlite.connect(self.catalog)
+        try:
+            await db.executemany(
+                "INSERT OR REPLACE INTO shard_index (kind, row_id, project_id) VALUES (?, ?, ?)",
+                [(kind, row_id, project_id) for row_id in row_ids]
+            )
+            await db.commit()
+        finally:
+            await db.close()
+        for row_id in row_ids:
+            self._indexed[(kind, row_id)] = project_id
+
+
+class ShardedStorage(StorageBackend):
+    """Users and projects in a catalog database, everything else in per-project shards."""
+
+    name = "sharded"
+
+    def __init__(self, router: Optional[ShardRouter] = None):
+        self.router = router or ShardRouter()
+        self.router.ensure_catalog()
+
+    def _catalog(self):
+        return database.use_database(self.router.catalog)
+
+    async def _routed(self, kind: str, row_id: int, operation, *args, missing=None, **kwargs):
+        path = await self.router.shard_of(kind, row_id)
+        if path is None:
+            return missing
+        with database.use_database(path):
+            return await operation(*args, **kwargs)
+
+    async def _on_every_shard(self, operation, *args) -> list:
+        async def run(path):
+            with database.use_database(path):
+                return await operation(*args)
+        return await asyncio.gather(*(run(path) for path in self.router.shards()))
+
+    async def _index_if_needed(self, kind: str, row_id: int, project_id: int):
+        # Only shard 0 (instances without a project) allocates ids below 1 << 32
+        if not encoded_project(row_id):
+            await self.router.index(kind, row_id, project_id)
+
+    # Users and projects: catalog
+    async def create_user(self, email, name=None):
+        with self._catalog():
+            return await database.create_user(email, name)
+
+    async def get_user_by_email(self, email):
+        with self._catalog():
+            return await database.get_user_by_email(email)
+
+    async def create_project(self, user_id, name, description=None):
+        with self._catalog():
+            project = await database.create_project(user_id, name, description)
+        await self.router.create_shard(project["id"], project)
+        return project
+
+    async def get_project(self, project_id):
+        with self._catalog():
+            return await database.get_project(project_id)
+
+    async def get_user_projects(self, user_id):
+        with self._catalog():
+            return await database.get_user_projects(user_id)
+
+    async def get_user_projects_by_email(self, email):
+        with self._catalog():
+            return await database.get_user_projects_by_email(email)
+
+    async def update_project(self, project_id, **kwargs):
+        with self._catalog():
+            return await database.update_project(project_id, **kwargs)
+
+    async def _project_shard(self, project_id: Optional[int]) -> Optional[Path]:
+        """The project's shard, created if the catalog has the project but no file exists."""
+        if project_id is None:
+            return None
+        if self.router.has_shard(project_id):
+            return self.router.shard_path(project_id)
+        project = await self.get_project(project_id)
+        if project is None:
+            return None
+        return await self.router.create_shard(project_id, project)
+
+    async def get_project_instances(self, project_id):
+        path = await self._project_shard(project_id)
+        if path is None:
+            return None
+        with database.use_database(path):
+            return await database.get_project_instances(project_id)
+
+    async def close_project_instances(self, project_id):
+        path = await self._project_shard(project_id)
+        if path is None:
+            return None
+        with database.use_database(path):
+            return await database.close_project_instances(project_id)
+
+    async def archive_project(self, project_id):
+        """Archive the shard's copy of the project with its children, then the catalog row.
+
+        The cascade is one transaction in the shard; the catalog update is a
+        second one, so a failure between the two leaves the project listed
+        with its old status until the archive is repeated.
+        """
+        path = await self._project_shard(project_id)
+        if path is None:
+            return None
+        with database.use_database(path):
+            archived = await database.archive_project(project_id)
+        if archived is None:
+            return None
+        archived["project"] = await self.update_project(project_id, status="archived")
+        return archived
+
+    # Instances
+    async def create_instance(self, user_id, name, agent_type, project_id=None, objective=None,
+                              questions=None, timebox_minutes=30, max_turns=20):
+        # Every instance lives in its project's shard
+        path = await self._project_shard(project_id)
+        if path is None:
+            return None
+        with database.use_database(path):
+            return await database.create_instance(
+                user_id, name, agent_type, project_id, objective, questions, timebox_minutes, max_turns
+            )
+
+    async def get_instance(self, instance_id):
+        return await self._routed("instance", instance_id, database.get_instance, instance_id)
+
+    async def get_user_instances(self, user_id):
+        """Instances created by the user, from every shard."""
+        instances = [row for rows in await self._on_every_shard(database.get_user_instances, user_id) for row in rows]
+        return sorted(instances, key=lambda row: row["created_at"] or "", reverse=True)
+
+    async def get_user_instances_by_email(self, email):
+        user = await self.get_user_by_email(email)
+        if user is None:
+            return None
+        return await self.get_user_instances(user["id"])
+
+    async def update_instance(self, instance_id, **kwargs):
+        return await self._routed("instance", instance_id, database.update_instance, instance_id, **kwargs)
+
+    async def update_instance_status(self, instance_id, status):
+        return await self._routed(
+            "instance", instance_id, database.update_instance_status, instance_id, status, missing=False
+        )
+
+    async def clone_instance(self, instance_id, name=None, include_participants=False):
+        """Clone within the instance's shard; the copies' tokens name that shard."""
+        project_id = await self.router.project_of("instance", instance_id)
+        if project_id is None or not self.router.has_shard(project_id):
+            return None
+        with database.use_database(self.router.shard_path(project_id)):
+            clone = await database.clone_instance(
+                instance_id, name, include_participants, token_prefix=f"{project_id}{TOKEN_SEPARATOR}"
+            )
+        if clone is not None and not encoded_project(clone["id"]):
+            await self.router.index("instance", clone["id"], project_id)
+            await self.router.index_many("participant", [p["id"] for p in clone["participants"]], project_id)
+        return clone
+
+    async def get_instance_stats(self, instance_id):
+        return await self._routed("instance", instance_id, database.get_instance_stats, instance_id)
+
+    # Participants
+    async def create_participant(self, instance_id, email, name=None, background=None):
+        project_id = await self.router.project_of("instance", instance_id)
+        if project_id is None or not self.router.has_shard(project_id):
+            return None
+        with database.use_database(self.router.shard_path(project_id)):
+            participant = await database.create_participant(
+                instance_id, email, name, background, token=shard_token(project_id)
+            )
+        if participant is not None:
+            await self._index_if_needed("participant", participant["id"], project_id)
+        return participant
+
+    async def _by_token(self, token: str, operation):
+        project_id = await self.router.project_of_token(token)
+        if project_id is None or not self.router.has_shard(project_id):
+            return None
+        with database.use_database(self.router.shard_path(project_id)):
+            return await operation(token)
+
+    async def get_participant_by_token(self, token):
+        return await self._by_token(token, database.get_participant_by_token)
+
+    async def get_participant_with_instance(self, token):
+        return await self._by_token(token, database.get_participant_with_instance)
+
+    async def update_participant_status(self, participant_id, status):
+        return await self._routed(
+            "participant", participant_id, database.update_participant_status, participant_id, status
+        )
+
+    async def get_instance_participants(self, instance_id):
+        return await self._routed("instance", instance_id, database.get_instance_participants, instance_id)
+
+    # Sessions
+    async def create_session(self, participant_id):
+        project_id = await self.router.project_of("participant", participant_id)
+        if project_id is None or not self.router.has_shard(project_id):
+            return None
+        with database.use_database(self.router.shard_path(project_id)):
+            session = await database.create_session(participant_id)
+        await self._index_if_needed("session", session["id"], project_id)
+        return session
+
+    async def get_session(self, session_id):
+        return await self._routed("session", session_id, database.get_session, session_id)
+
+    async def increment_turn_count(self, session_id):
+        return await self._routed("session", session_id, database.increment_turn_count, session_id)
+
+    async def complete_session(self, session_id):
+        return await self._routed("session", session_id, database.complete_session, session_id)
+
+    async def close_expired_sessions(self, expired):
+        by_shard: dict[Path, list] = {}
+        for session_id, reason in expired:
+            path = await self.router.shard_of("session", session_id)
+            if path is not None:
+                by_shard.setdefault(path, []).append((session_id, reason))
+        closed = []
+        for path, batch in by_shard.items():
+            with database.use_database(path):
+                closed.extend(await database.close_expired_sessions(batch))
+        return closed
+
+    async def get_open_sessions(self):
+        return [row for rows in await self._on_every_shard(database.get_open_sessions) for row in rows]
+
+    # Messages and insights
+    async def add_message(self, session_id, role, content, audio_input=False):
+        return await self._routed("session", session_id, database.add_message, session_id, role, content, audio_input)
+
+    async def get_session_messages(self, session_id):
+        return await self._routed("session", session_id, database.get_session_messages, session_id, missing=[])
+
+    async def add_insight(self, session_id, insight_type, content, confidence=1.0):
+        return await self._routed(
+            "session", session_id, database.add_insight, session_id, insight_type, content, confidence
+        )
+
+    async def get_session_insights(self, session_id):
+        return await self._routed("session", session_id, database.get_session_insights, session_id, missing=[])
+
+    # Anonymous links
+    async def get_anonymous_link(self, instance_id):
+        return await self._routed("instance", instance_id, database.get_anonymous_link, instance_id)
+
+    async def create_anonymous_link(self, instance_id, base_url):
+        return await self._routed("instance", instance_id, database.create_anonymous_link, instance_id, base_url)
+
+    async def update_anonymous_link(self, instance_id, **kwargs):
+        return await self._routed("instance", instance_id, database.update_anonymous_link, instance_id, **kwargs)
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _copy(conn: sqlite3.Connection, table: str, where: str, params: tuple = ()) -> int:
+    """Copy ``src.table`` rows matching ``where`` into the same table of ``conn``."""
+    source_columns = set(_columns(conn, "src", table))
+    columns = ", ".join(c for c in _columns(conn, "main", table) if c in source_columns)
+    cursor = conn.execute(f"INSERT INTO main.{table} ({columns}) SELECT {columns} FROM src.{table} WHERE {where}", params)
+    return cursor.rowcount
+
+
+def split_database(source: Path, directory: Path) -> dict:
+    """Split a single-file database into a catalog and per-project shards.
+
+    The source is only read. Rows keep their ids and tokens and are indexed
+    in the catalog. Returns row counts per table.
+    """
+    source, directory = Path(source), Path(directory)
+    router = ShardRouter(directory)
+    if router.catalog.exists() or router.shards():
+        raise FileExistsError(f"{directory} already holds a sharded database")
+    router.ensure_catalog()
+
+    counts: dict[str, int] = {}
+    catalog = sqlite3.connect(router.catalog)
+    catalog.execute("ATTACH DATABASE ? AS src", (str(source),))
+    for table in ("users", "projects"):
+        counts[table] = _copy(catalog, table, "1")
+    projects = {row[0]: row for row in catalog.execute("SELECT * FROM projects")}
+    project_columns = _columns(catalog, "main", "projects")
+    orphans = catalog.execute("SELECT 1 FROM src.instances WHERE project_id IS NULL LIMIT 1").fetchone()
+
+    for project_id in sorted(projects) + ([0] if orphans else []):
+        path = router.shard_path(project_id)
+        project = dict(zip(project_columns, projects[project_id])) if project_id in projects else None
+        init_shard(path, project_id, project)
+        conn = sqlite3.connect(path)
+        conn.execute("ATTACH DATABASE ? AS src", (str(source),))
+        if project_id == 0:
+            # Shard 0 allocates below 1 << 32; continue after every id the source handed out
+            conn.execute(
+                """UPDATE main.sqlite_sequence
+                   SET seq = MAX(seq, IFNULL((SELECT s.seq FROM src.sqlite_sequence s
+                                              WHERE s.name = main.sqlite_sequence.name), 0))"""
+            )
+        in_project = "project_id IS NULL" if project_id == 0 else "project_id = ?"
+        copied = {
+            "instances": _copy(conn, "instances", in_project, () if project_id == 0 else (project_id,)),
+            "participants": _copy(conn, "participants", "instance_id IN (SELECT id FROM main.instances)"),
+            "anonymous_links": _copy(conn, "anonymous_links", "instance_id IN (SELECT id FROM main.instances)"),
+            "sessions": _copy(conn, "sessions", "participant_id IN (SELECT id FROM main.participants)"),
+            "messages": _copy(conn, "messages", "session_id IN (SELECT id FROM main.sessions)"),
+            "insights": _copy(conn, "insights", "session_id IN (SELECT id FROM main.sessions)"),
+            "archived_sessions": _copy(conn, "archived_sessions", "session_id IN (SELECT id FROM main.sessions)"),
+        }
+        # The copy fired the stats triggers row by row; recompute from the final rows
+        rebuild_instance_stats(conn)
+        conn.commit()
+        for kind, table in (("instance", "instances"), ("participant", "participants"), ("session", "sessions")):
+            catalog.executemany(
+                "INSERT OR REPLACE INTO shard_index (kind, row_id, project_id) VALUES (?, ?, ?)",
+                ((kind, row_id, project_id) for (row_id,) in conn.execute(f"SELECT id FROM {table}")),
+            )
+        catalog.executemany(
+            "INSERT OR REPLACE INTO participant_tokens (token, project_id) VALUES (?, ?)",
+            ((token, project_id) for (token,) in conn.execute("SELECT unique_token FROM participants")),
+        )
+        conn.execute("DETACH DATABASE src")
+        conn.close()
+        for table, count in copied.items():
+            counts[table] = counts.get(table, 0) + count
+
+    catalog.commit()
+    catalog.execute("DETACH DATABASE src")
+    catalog.close()
+    counts["shards"] = len(router.shards())
+    return counts
@@ -0,0 +1,349 @@
+"""Storage backends behind the API.
+
+Routes depend on :class:`StorageBackend` through ``Depends(get_storage)``
+rather than on a particular database. ``STORAGE_BACKEND`` picks the
+implementation:
+
+- ``sqlite`` (default): :class:`SQLiteStorage`, the ``db.database`` functions
+- ``memory``: :class:`~backend.db.memory.MemoryStorage`, process-local dicts
+  for tests and for load tests that should leave disk I/O out
+- ``sharded``: :class:`~backend.db.sharding.ShardedStorage`, a catalog
+  database plus one SQLite file per project under ``SHARD_DIR``
+
+A new backend subclasses :class:`StorageBackend`, implements every method
+with the same return shapes as the SQLite one, and is registered in
+``BACKENDS``. Lookups that a route would otherwise precede with an
+existence check return None for a missing parent, so the route answers 404
+from the same call.
+"""
+import os
+from typing import Optional
+
+from . import database
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite").lower()
+
+
+class StorageBackend:
+    """Persistence operations used by the API. Rows are returned as plain dicts."""
+
+    name = "abstract"
+
+    # Users
+    async def create_user(self, email: str, name: Optional[str] = None) -> dict:
+        raise NotImplementedError
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_or_create_user(self, email: str, name: Optional[str] = None) -> dict:
+        user = await self.get_user_by_email(email)
+        if user:
+            return user
+        return await self.create_user(email, name)
+
+    # Projects
+    async def create_project(self, user_id: int, name: str, description: Optional[str] = None) -> dict:
+        raise NotImplementedError
+
+    async def get_project(self, project_id: int) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_user_projects(self, user_id: int) -> list:
+        raise NotImplementedError
+
+    async def get_user_projects_by_email(self, email: str) -> Optional[list]:
+        """None if there is no user with ``email``."""
+        raise NotImplementedError
+
+    async def update_project(self, project_id: int, **kwargs) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_project_instances(self, project_id: int) -> Optional[list]:
+        """None if the project does not exist."""
+        raise NotImplementedError
+
+    async def close_project_instances(self, project_id: int) -> Optional[int]:
+        """Close every instance of the project in one transaction.
+
+        The number of instances closed, or None if the project does not exist.
+        """
+        raise NotImplementedError
+
+    async def archive_project(self, project_id: int) -> Optional[dict]:
+        """Archive the project, close its instances and end its open sessions, in one transaction.
+
+        ``{"project", "instances_closed", "sessions_closed"}``, or None if the
+        project does not exist; see ``database.archive_project``.
+        """
+        raise NotImplementedError
+
+    # Instances
+    async def create_instance(
+        self,
+        user_id: int,
+        name: str,
+        agent_type: str,
+        project_id: Optional[int] = None,
+        objective: Optional[str] = None,
+        questions: Optional[list] = None,
+        timebox_minutes: int = 30,
+        max_turns: int = 20,
+    ) -> Optional[dict]:
+        """None if ``project_id`` is given and the project does not exist."""
+        raise NotImplementedError
+
+    async def get_instance(self, instance_id: int) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_user_instances(self, user_id: int) -> list:
+        raise NotImplementedError
+
+    async def get_user_instances_by_email(self, email: str) -> Optional[list]:
+        """None if there is no user with ``email``."""
+        raise NotImplementedError
+
+    async def update_instance(self, instance_id: int, **kwargs) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def update_instance_status(self, instance_id: int, status: str) -> bool:
+        """False if the instance does not exist."""
+        raise NotImplementedError
+
+    async def clone_instance(
+        self,
+        instance_id: int,
+        name: Optional[str] = None,
+        include_participants: bool = False,
+    ) -> Optional[dict]:
+        """Copy the instance, optionally with its participants under new tokens, in one transaction.
+
+        The new instance with its ``participants``, or None if the instance
+        does not exist; see ``database.clone_instance``.
+        """
+        raise NotImplementedError
+
+    async def get_instance_stats(self, instance_id: int) -> Optional[dict]:
+        raise NotImplementedError
+
+    # Participants
+    async def create_participant(
+        self,
+        instance_id: int,
+        email: str,
+        name: Optional[str] = None,
+        background: Optional[str] = None,
+    ) -> Optional[dict]:
+        """None if the instance does not exist."""
+        raise NotImplementedError
+
+    async def get_participant_by_token(self, token: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_participant_with_instance(self, token: str) -> Optional[tuple]:
+        """``(participant, instance)`` for a participant token, in one lookup."""
+        raise NotImplementedError
+
+    async def update_participant_status(self, participant_id: int, status: str):
+        raise NotImplementedError
+
+    async def get_instance_participants(self, instance_id: int) -> Optional[list]:
+        """None if the instance does not exist."""
+        raise NotImplementedError
+
+    # Sessions
+    async def create_session(self, participant_id: int) -> dict:
+        raise NotImplementedError
+
+    async def get_session(self, session_id: int) -> Optional[dict]:
+        """The session row plus its participant's ``instance_id``."""
+        raise NotImplementedError
+
+    async def increment_turn_count(self, session_id: int) -> int:
+        raise NotImplementedError
+
+    async def complete_session(self, session_id: int) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def close_expired_sessions(self, expired: list) -> list:
+        raise NotImplementedError
+
+    async def get_open_sessions(self) -> list:
+        raise NotImplementedError
+
+    # Messages and insights
+    async def add_message(self, session_id: int, role: str, content: str, audio_input: bool = False) -> dict:
+        raise NotImplementedError
+
+    async def get_session_messages(self, session_id: int) -> list:
+        raise NotImplementedError
+
+    async def add_insight(self, session_id: int, insight_type: str, content: str, confidence: float = 1.0):
+        raise NotImplementedError
+
+    async def get_session_insights(self, session_id: int) -> list:
+        raise NotImplementedError
+
+    # Anonymous links
+    async def get_anonymous_link(self, instance_id: int) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def create_anonymous_link(self, instance_id: int, base_url: str) -> dict:
+        raise NotImplementedError
+
+    async def update_anonymous_link(self, instance_id: int, **kwargs) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_or_create_anonymous_link(self, instance_id: int, base_url: str) -> dict:
+        link = await self.get_anonymous_link(instance_id)
+        if link:
+            return link
+        return await self.create_anonymous_link(instance_id, base_url)
+
+
+class SQLiteStorage(StorageBackend):
+    """The SQLite database at ``DATABASE_PATH``, via ``db.database``."""
+
+    name = "sqlite"
+
+    async def create_user(self, email, name=None):
+        return await database.create_user(email, name)
+
+    async def get_user_by_email(self, email):
+        return await database.get_user_by_email(email)
+
+    async def create_project(self, user_id, name, description=None):
+        return await database.create_project(user_id, name, description)
+
+    async def get_project(self, project_id):
+        return await database.get_project(project_id)
+
+    async def get_user_projects(self, user_id):
+        return await database.get_user_projects(user_id)
+
+    async def get_user_projects_by_email(self, email):
+        return await database.get_user_projects_by_email(email)
+
+    async def update_project(self, project_id, **kwargs):
+        return await database.update_project(project_id, **kwargs)
+
+    async def get_project_instances(self, project_id):
+        return await database.get_project_instances(project_id)
+
+    async def close_project_instances(self, project_id):
+        return await database.close_project_instances(project_id)
+
+    async def archive_project(self, project_id):
+        return await database.archive_project(project_id)
+
+    async def create_instance(self, user_id, name, agent_type, project_id=None, objective=None,
+                              questions=None, timebox_minutes=30, max_turns=20):
+        return await database.create_instance(
+            user_id, name, agent_type, project_id, objective, questions, timebox_minutes, max_turns
+        )
+
+    async def get_instance(self, instance_id):
+        return await database.get_instance(instance_id)
+
+    async def get_user_instances(self, user_id):
+        return await database.get_user_instances(user_id)
+
+    async def get_user_instances_by_email(self, email):
+        return await database.get_user_instances_by_email(email)
+
+    async def update_instance(self, instance_id, **kwargs):
+        return await database.update_instance(instance_id, **kwargs)
+
+    async def update_instance_status(self, instance_id, status):
+        return await database.update_instance_status(instance_id, status)
+
+    async def clone_instance(self, instance_id, name=None, include_participants=False):
+        return await database.clone_instance(instance_id, name, include_participants)
+
+    async def get_instance_stats(self, instance_id):
+        return await database.get_instance_stats(instance_id)
+
+    async def create_participant(self, instance_id, email, name=None, background=None):
+        return await database.create_participant(instance_id, email, name, background)
+
+    async def get_participant_by_token(self, token):
+        return await database.get_participant_by_token(token)
+
+    async def get_participant_with_instance(self, token):
+        return await database.get_participant_with_instance(token)
+
+    async def update_participant_status(self, participant_id, status):
+        return await database.update_participant_status(participant_id, status)
+
+    async def get_instance_participants(self, instance_id):
+        return await database.get_instance_participants(instance_id)
+
+    async def create_session(self, participant_id):
+        return await database.create_session(participant_id)
+
+    async def get_session(self, session_id):
+        return await database.get_session(session_id)
+
+    async def increment_turn_count(self, session_id):
+        return await database.increment_turn_count(session_id)
+
+    async def complete_session(self, session_id):
+        return await database.complete_session(session_id)
+
+    async def close_expired_sessions(self, expired):
+        return await database.close_expired_sessions(expired)
+
+    async def get_open_sessions(self):
+        return await database.get_open_sessions()
+
+    async def add_message(self, session_id, role, content, audio_input=False):
+        return await database.add_message(session_id, role, content, audio_input)
+
+    async def get_session_messages(self, session_id):
+        return await database.get_session_messages(session_id)
+
+    async def add_insight(self, session_id, insight_type, content, confidence=1.0):
+        return await database.add_insight(session_id, insight_type, content, confidence)
+
+    async def get_session_insights(self, session_id):
+        return await database.get_session_insights(session_id)
+
+    async def get_anonymous_link(self, instance_id):
+        return await database.get_anonymous_link(instance_id)
+
+    async def create_anonymous_link(self, instance_id, base_url):
+        return await database.create_anonymous_link(instance_id, base_url)
+
+    async def update_anonymous_link(self, instance_id, **kwargs):
+        return await database.update_anonymous_link(instance_id, **kwargs)
+
+
+def _memory_backend() -> StorageBackend:
+    from .memory import MemoryStorage
+
+    return MemoryStorage()
+
+
+def _sharded_backend() -> StorageBackend:
+    from .sharding import ShardedStorage
+
+    return ShardedStorage()
+
+
+BACKENDS = {
+    "sqlite": SQLiteStorage,
+    "memory": _memory_backend,
+    "sharded": _sharded_backend,
+}
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """The configured backend; also the FastAPI dependency used by the routes."""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}; expected one of {sorted(BACKENDS)}")
+        _storage = BACKENDS[STORAGE_BACKEND]()
+    return _storage
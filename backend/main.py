@@ -1,17 +1,103 @@
 """Main FastAPI application."""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
-from .api.routes import router
+from .agents import generation, llm_cache, llm_client
+from .api import admission
+from .api.responses import FastJSONResponse
+from .api.routes import router, schedule_open_sessions, session_scheduler
+from .db import analytics, storage
+from .telemetry import metrics, profiling, tracing
+
+# Warm-up progress reported by /ready
+startup_state = {
+    "ready": False,
+    "llm_client_loaded": False,
+    "model_warm": False,
+    "warmup_attempts": 0,
+    "warmup_seconds": None,
+    "error": None,
+}
+
+# Delay before retrying a failed model warm-up, doubling up to the maximum
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "60"))
+
+
+async def warm_up():
+    """Load the LLM client and warm the model off the event loop.
+
+    A model server that is not up yet is retried with backoff; the app only
+    reports ready once the model answered.
+    """
+    start = time.perf_counter()
+    # Replayed responses come from the cache file; there may be no LLM server at all
+    if os.getenv("USE_MOCK_LLM", "false").lower() != "true" and llm_cache.LLM_CACHE_MODE != "replay":
+        await asyncio.to_thread(llm_client.get_litellm)
+        startup_state["llm_client_loaded"] = True
+        # The model interview turns are generated with, not the LLM_MODEL fallback
+        model = generation.tier_model(generation.TASKS["turn"].tier)
+        delay = WARMUP_RETRY_SECONDS
+        while True:
+            startup_state["warmup_attempts"] += 1
+            if await llm_client.warm_up(model):
+                break
+            startup_state["error"] = f"Model warm-up failed; retrying in {delay:g}s"
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+        startup_state["model_warm"] = True
+        startup_state["error"] = None
+    startup_state["warmup_seconds"] = round(time.perf_counter() - start, 3)
+    startup_state["ready"] = True
+
+
+def _warm_up_finished(task: asyncio.Task):
+    # An exception here (e.g. LiteLLM not installed) would otherwise vanish with the task
+    if not task.cancelled() and task.exception() is not None:
+        error = task.exception()
+        print(f"Warm-up failed: {error!r}")
+        startup_state["error"] = f"Warm-up failed: {error!r}"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve liveness checks immediately; /ready turns green once warm-up finishes
+    task = asyncio.create_task(warm_up())
+    task.add_done_callback(_warm_up_finished)
+    if session_scheduler.enabled:
+        await schedule_open_sessions()
+        session_scheduler.start()
+    # The replica is a copy of the SQLite file; other backends have nothing to copy
+    if analytics.refresher.enabled and storage.STORAGE_BACKEND == "sqlite":
+        analytics.refresher.start()
+    yield
+    task.cancel()
+    await session_scheduler.stop()
+    await analytics.refresher.stop()
+    await llm_client.aclose()
+
 
 app = FastAPI(
     title="Continuous Discovery Interview Platform",
     description="AI-powered interview agents for product discovery",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Rate limits and load shedding for participant requests; added before CORS so
+# that rejections still carry CORS headers
+if admission.ADMISSION_ENABLED:
+    app.add_middleware(admission.AdmissionMiddleware)
+
 # CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +116,11 @@ app.add_middleware(
 # Include API routes
 app.include_router(router, prefix="/api")
 
+# Admin-only profiling, opt-in via PROFILING_ENABLED
+if profiling.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+    app.include_router(profiling.router)
+
 
 @app.get("/health")
 def health_check():
@@ -37,6 +128,30 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness check: 503 until the LLM client is loaded and the model warmed."""
+    body = {
+        "status": "ready" if startup_state["ready"] else "warming",
+        **startup_state,
+        "litellm_import_seconds": llm_client.import_seconds,
+    }
+    return JSONResponse(body, status_code=200 if startup_state["ready"] else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(metrics.render_latest(), media_type="text/plain; version=0.0.4")
+
+
+if isinstance(tracing.exporter, tracing.MemoryExporter):
+    @app.get("/traces", include_in_schema=False)
+    def recent_traces(limit: int = 20, min_duration_ms: float = 0.0):
+        """Recent traces from the in-memory exporter, slowest-first filtering via min_duration_ms."""
+        return tracing.exporter.traces(limit=limit, min_duration_ms=min_duration_ms)
+
+
 @app.get("/")
 def root():
     """Root endpoint with API info."""
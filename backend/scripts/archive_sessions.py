@@ -0,0 +1,67 @@
+"""Move old transcripts to cold storage and enforce archive retention.
+
+Run from the repo root:
+
+    python -m backend.scripts.archive_sessions archive --older-than-days 30
+    python -m backend.scripts.archive_sessions purge --retention-days 365
+    python -m backend.scripts.archive_sessions all --vacuum
+
+With ``STORAGE_BACKEND=sharded`` every project shard is processed in turn.
+"""
+import argparse
+import asyncio
+import sys
+
+from ..db import archive, database, storage
+from ..db.sharding import ShardRouter
+
+
+def databases() -> list:
+    """Database files holding sessions for the configured storage backend."""
+    if storage.STORAGE_BACKEND == "sharded":
+        return ShardRouter().shards()
+    return [database.DB_PATH]
+
+
+async def _total(operation, paths: list) -> dict:
+    totals: dict = {}
+    for path in paths:
+        with database.use_database(path):
+            result = await operation()
+        for key, value in result.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+async def run(args):
+    paths = databases()
+    if args.command in ("archive", "all"):
+        result = await _total(lambda: archive.archive_sessions(args.older_than_days, args.batch_size), paths)
+        print(f"archived {result.get('sessions', 0)} sessions ({result.get('messages', 0)} messages, "
+              f"{result.get('bytes_written', 0)} compressed bytes) to {archive.ARCHIVE_DIR}")
+    if args.command in ("purge", "all"):
+        result = await _total(lambda: archive.purge(args.retention_days, args.batch_size), paths)
+        print(f"purged {result.get('sessions', 0)} archived sessions from {result.get('segments', 0)} segments")
+    if args.vacuum:
+        for path in paths:
+            with database.use_database(path):
+                await archive.vacuum()
+        print(f"vacuumed {len(paths)} database{'s' if len(paths) != 1 else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["archive", "purge", "all"])
+    parser.add_argument("--older-than-days", type=float, default=archive.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--retention-days", type=float, default=archive.ARCHIVE_RETENTION_DAYS,
+                        help="Delete archived transcripts older than this (0 keeps them)")
+    parser.add_argument("--batch-size", type=int, default=archive.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the database afterwards")
+    args = parser.parse_args()
+    if storage.STORAGE_BACKEND not in ("sqlite", "sharded"):
+        sys.exit(f"STORAGE_BACKEND={storage.STORAGE_BACKEND} keeps no transcripts on disk; nothing to archive")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
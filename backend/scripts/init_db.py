@@ -1,8 +1,9 @@
 """Initialize the SQLite database with schema."""
+import os
 import sqlite3
 from pathlib import Path
 
-DB_PATH = Path(__file__).parent.parent.parent / "interviews.db"
+DB_PATH = Path(os.getenv("DATABASE_PATH", Path(__file__).parent.parent.parent / "interviews.db"))
 
 SCHEMA = """
 -- Users (PMs at your company)
@@ -73,7 +74,8 @@ CREATE TABLE IF NOT EXISTS participants (
 CREATE TABLE IF NOT EXISTS sessions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     participant_id INTEGER,
-    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+    last_activity_at TIMESTAMP,
     completed_at TIMESTAMP,
     duration_seconds INTEGER,
     turn_count INTEGER DEFAULT 0,
@@ -88,7 +90,7 @@ CREATE TABLE IF NOT EXISTS messages (
     role TEXT CHECK(role IN ('user', 'assistant', 'system')),
     content TEXT NOT NULL,
     audio_input BOOLEAN DEFAULT FALSE,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    timestamp TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
     FOREIGN KEY (session_id) REFERENCES sessions(id)
 );
 
@@ -102,16 +104,193 @@ CREATE TABLE IF NOT EXISTS insights (
     extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (session_id) REFERENCES sessions(id)
 );
+
+-- Transcripts moved to cold storage (backend/db/archive.py): where each
+-- session's compressed messages live inside its instance's segment file
+CREATE TABLE IF NOT EXISTS archived_sessions (
+    session_id INTEGER PRIMARY KEY,
+    instance_id INTEGER,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    message_count INTEGER NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (session_id) REFERENCES sessions(id)
+);
+
+-- Per-instance response statistics for the monitor dashboard, maintained by
+-- the triggers below so reads never aggregate participants or sessions.
+-- Averages are derived from the sums at read time.
+CREATE TABLE IF NOT EXISTS instance_stats (
+    instance_id INTEGER PRIMARY KEY,
+    invited INTEGER NOT NULL DEFAULT 0,
+    started INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    abandoned INTEGER NOT NULL DEFAULT 0,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    completed_sessions INTEGER NOT NULL DEFAULT 0,
+    total_turns INTEGER NOT NULL DEFAULT 0,
+    completed_turns INTEGER NOT NULL DEFAULT 0,
+    completed_duration_seconds INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (instance_id) REFERENCES instances(id)
+);
+
+CREATE TRIGGER IF NOT EXISTS instance_stats_instance_insert
+AFTER INSERT ON instances
+BEGIN
+    INSERT OR IGNORE INTO instance_stats (instance_id) VALUES (NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS instance_stats_participant_insert
+AFTER INSERT ON participants WHEN NEW.instance_id IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO instance_stats (instance_id) VALUES (NEW.instance_id);
+    UPDATE instance_stats SET
+        invited = invited + (NEW.status IS 'invited'),
+        started = started + (NEW.status IS 'started'),
+        completed = completed + (NEW.status IS 'completed'),
+        abandoned = abandoned + (NEW.status IS 'abandoned')
+    WHERE instance_id = NEW.instance_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS instance_stats_participant_update
+AFTER UPDATE OF status, instance_id ON participants
+BEGIN
+    UPDATE instance_stats SET
+        invited = invited - (OLD.status IS 'invited'),
+        started = started - (OLD.status IS 'started'),
+        completed = completed - (OLD.status IS 'completed'),
+        abandoned = abandoned - (OLD.status IS 'abandoned')
+    WHERE instance_id = OLD.instance_id;
+    INSERT OR IGNORE INTO instance_stats (instance_id)
+        SELECT NEW.instance_id WHERE NEW.instance_id IS NOT NULL;
+    UPDATE instance_stats SET
+        invited = invited + (NEW.status IS 'invited'),
+        started = started + (NEW.status IS 'started'),
+        completed = completed + (NEW.status IS 'completed'),
+        abandoned = abandoned + (NEW.status IS 'abandoned')
+    WHERE instance_id = NEW.instance_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS instance_stats_participant_delete
+AFTER DELETE ON participants
+BEGIN
+    UPDATE instance_stats SET
+        invited = invited - (OLD.status IS 'invited'),
+        started = started - (OLD.status IS 'started'),
+        completed = completed - (OLD.status IS 'completed'),
+        abandoned = abandoned - (OLD.status IS 'abandoned')
+    WHERE instance_id = OLD.instance_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS instance_stats_session_insert
+AFTER INSERT ON sessions
+BEGIN
+    INSERT OR IGNORE INTO instance_stats (instance_id)
+        SELECT instance_id FROM participants WHERE id = NEW.participant_id AND instance_id IS NOT NULL;
+    UPDATE instance_stats SET
+        sessions = sessions + 1,
+        completed_sessions = completed_sessions + (NEW.completed_at IS NOT NULL),
+        total_turns = total_turns + IFNULL(NEW.turn_count, 0),
+        completed_turns = completed_turns + IIF(NEW.completed_at IS NOT NULL, IFNULL(NEW.turn_count, 0), 0),
+        completed_duration_seconds = completed_duration_seconds
+            + IIF(NEW.completed_at IS NOT NULL, IFNULL(NEW.duration_seconds, 0), 0)
+    WHERE instance_id = (SELECT instance_id FROM participants WHERE id = NEW.participant_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS instance_stats_session_update
+AFTER UPDATE OF turn_count, completed_at, duration_seconds ON sessions
+BEGIN
+    UPDATE instance_stats SET
+        completed_sessions = completed_sessions
+            + (NEW.completed_at IS NOT NULL) - (OLD.completed_at IS NOT NULL),
+        total_turns = total_turns + IFNULL(NEW.turn_count, 0) - IFNULL(OLD.turn_count, 0),
+        completed_turns = completed_turns
+            + IIF(NEW.completed_at IS NOT NULL, IFNULL(NEW.turn_count, 0), 0)
+            - IIF(OLD.completed_at IS NOT NULL, IFNULL(OLD.turn_count, 0), 0),
+        completed_duration_seconds = completed_duration_seconds
+            + IIF(NEW.completed_at IS NOT NULL, IFNULL(NEW.duration_seconds, 0), 0)
+            - IIF(OLD.completed_at IS NOT NULL, IFNULL(OLD.duration_seconds, 0), 0)
+    WHERE instance_id = (SELECT instance_id FROM participants WHERE id = NEW.participant_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS instance_stats_session_delete
+AFTER DELETE ON sessions
+BEGIN
+    UPDATE instance_stats SET
+        sessions = sessions - 1,
+        completed_sessions = completed_sessions - (OLD.completed_at IS NOT NULL),
+        total_turns = total_turns - IFNULL(OLD.turn_count, 0),
+        completed_turns = completed_turns - IIF(OLD.completed_at IS NOT NULL, IFNULL(OLD.turn_count, 0), 0),
+        completed_duration_seconds = completed_duration_seconds
+            - IIF(OLD.completed_at IS NOT NULL, IFNULL(OLD.duration_seconds, 0), 0)
+    WHERE instance_id = (SELECT instance_id FROM participants WHERE id = OLD.participant_id);
+END;
 """
 
+# Full recompute of instance_stats from participants and sessions; the
+# triggers must always agree with it (see verify_instance_stats.py)
+INSTANCE_STATS_RECOMPUTE = """
+WITH participant_counts AS (
+    SELECT instance_id,
+           SUM(status IS 'invited') AS invited,
+           SUM(status IS 'started') AS started,
+           SUM(status IS 'completed') AS completed,
+           SUM(status IS 'abandoned') AS abandoned
+    FROM participants
+    GROUP BY instance_id
+),
+session_counts AS (
+    SELECT p.instance_id,
+           COUNT(*) AS sessions,
+           SUM(s.completed_at IS NOT NULL) AS completed_sessions,
+           SUM(IFNULL(s.turn_count, 0)) AS total_turns,
+           SUM(IIF(s.completed_at IS NOT NULL, IFNULL(s.turn_count, 0), 0)) AS completed_turns,
+           SUM(IIF(s.completed_at IS NOT NULL, IFNULL(s.duration_seconds, 0), 0)) AS completed_duration_seconds
+    FROM sessions s
+    JOIN participants p ON p.id = s.participant_id
+    GROUP BY p.instance_id
+)
+SELECT i.id AS instance_id,
+       IFNULL(pc.invited, 0) AS invited,
+       IFNULL(pc.started, 0) AS started,
+       IFNULL(pc.completed, 0) AS completed,
+       IFNULL(pc.abandoned, 0) AS abandoned,
+       IFNULL(sc.sessions, 0) AS sessions,
+       IFNULL(sc.completed_sessions, 0) AS completed_sessions,
+       IFNULL(sc.total_turns, 0) AS total_turns,
+       IFNULL(sc.completed_turns, 0) AS completed_turns,
+       IFNULL(sc.completed_duration_seconds, 0) AS completed_duration_seconds
+FROM instances i
+LEFT JOIN participant_counts pc ON pc.instance_id = i.id
+LEFT JOIN session_counts sc ON sc.instance_id = i.id
+ORDER BY i.id
+"""
+
+
+def rebuild_instance_stats(conn: sqlite3.Connection):
+    """Replace instance_stats with a full recompute."""
+    conn.execute("DELETE FROM instance_stats")
+    conn.execute(f"INSERT INTO instance_stats {INSTANCE_STATS_RECOMPUTE}")
+
 
-def init_database():
-    conn = sqlite3.connect(DB_PATH)
+def init_database(db_path=None):
+    db_path = db_path or DB_PATH
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
+    has_stats = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'instance_stats'"
+    ).fetchone()
     cursor.executescript(SCHEMA)
+    session_columns = {row[1] for row in cursor.execute("PRAGMA table_info(sessions)")}
+    if "last_activity_at" not in session_columns:
+        cursor.execute("ALTER TABLE sessions ADD COLUMN last_activity_at TIMESTAMP")
+    if not has_stats:
+        # Backfill databases created before instance_stats existed
+        rebuild_instance_stats(conn)
     conn.commit()
     conn.close()
-    print(f"Database initialized at {DB_PATH}")
+    print(f"Database initialized at {db_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,25 @@
+"""Refresh the read-only analytics replica of the interview database.
+
+Run from the repo root (e.g. from cron when the app's background refresh is
+off with ANALYTICS_REFRESH_SECONDS=0):
+
+    python -m backend.scripts.refresh_analytics
+"""
+import argparse
+from pathlib import Path
+
+from ..db import analytics, database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", type=Path, default=database.DB_PATH)
+    parser.add_argument("--target", type=Path, default=analytics.replica_path())
+    args = parser.parse_args()
+    result = analytics.refresh(args.source, args.target)
+    print(f"snapshot of {args.source} written to {args.target}: copied in {result['copy_seconds'] * 1000:.1f} ms, "
+          f"built in {result['build_seconds'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
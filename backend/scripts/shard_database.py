@@ -0,0 +1,27 @@
+"""Split a single-file interview database into a catalog and per-project shards.
+
+The source database is only read; point the app at the result with
+STORAGE_BACKEND=sharded and SHARD_DIR. Run from the repo root:
+
+    python -m backend.scripts.shard_database --source interviews.db --target-dir shards
+"""
+import argparse
+from pathlib import Path
+
+from ..db import database, sharding
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", type=Path, default=database.DB_PATH)
+    parser.add_argument("--target-dir", type=Path, default=sharding.SHARD_DIR)
+    args = parser.parse_args()
+    counts = sharding.split_database(args.source, args.target_dir)
+    shards = counts.pop("shards")
+    print(f"split {args.source} into {shards} shards and a catalog under {args.target_dir}")
+    for table, count in counts.items():
+        print(f"  {table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
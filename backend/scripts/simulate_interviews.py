@@ -0,0 +1,123 @@
+"""Run synthetic interviews against an instance before it goes live.
+
+An LLM persona plays each participant (backgrounds cycle through
+``--backgrounds`` or a built-in list) while the real Explorer agent
+interviews them. Reports turns, latency, LLM slot wait, fallback rate and
+token usage; raising ``--llm-concurrency`` until latency degrades shows how
+many concurrent interviews the LLM server sustains. Run from the repo root:
+
+    python -m backend.scripts.simulate_interviews --instance-id 3 --interviews 200 --llm-concurrency 8
+    python -m backend.scripts.simulate_interviews --objective "month-end close" --transcripts sim.jsonl
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from ..agents.simulator import run_simulation
+from ..benchmarks.common import summarize, write_results
+from ..db.storage import get_storage
+
+
+async def _load_instance(args) -> dict:
+    if args.instance_id is None:
+        return {
+            "id": None,
+            "objective": args.objective,
+            "timebox_minutes": args.timebox_minutes,
+            "max_turns": args.max_turns,
+        }
+    instance = await get_storage().get_instance(args.instance_id)
+    if not instance:
+        raise SystemExit(f"instance {args.instance_id} not found")
+    return instance
+
+
+def _report(records: list, elapsed: float) -> dict:
+    turns = sum(r["turns"] for r in records)
+    fallbacks = sum(r["interviewer_fallbacks"] for r in records)
+    return {
+        "interviews": len(records),
+        "errors": sum(1 for r in records if r["error"]),
+        "turns": turns,
+        "turns_per_interview": round(turns / len(records), 2) if records else None,
+        "elapsed_seconds": round(elapsed, 3),
+        "turns_per_second": round(turns / elapsed, 2) if elapsed else None,
+        "interviewer_turn": summarize([s for r in records for s in r["interviewer_seconds"]]),
+        "persona_turn": summarize([s for r in records for s in r["persona_seconds"]]),
+        "llm_wait": summarize([s for r in records for s in r["llm_wait_seconds"]]),
+        "interview_duration": summarize([r["duration_seconds"] for r in records]),
+        "fallback_rate": round(fallbacks / turns, 4) if turns else None,
+        "persona_fallback_rate": round(sum(r["persona_fallbacks"] for r in records) / turns, 4) if turns else None,
+        "tokens": {
+            who: {
+                direction: sum(r[f"{who}_tokens"][direction] for r in records)
+                for direction in ("in", "out")
+            }
+            for who in ("interviewer", "persona")
+        },
+    }
+
+
+async def run(args) -> tuple:
+    instance = await _load_instance(args)
+    backgrounds = None
+    if args.backgrounds:
+        backgrounds = [line.strip() for line in args.backgrounds.read_text().splitlines() if line.strip()]
+
+    started = time.perf_counter()
+    records = await run_simulation(
+        instance,
+        args.interviews,
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+        turns=args.turns,
+        backgrounds=backgrounds,
+        keep_transcripts=args.transcripts is not None,
+    )
+    return records, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instance-id", type=int, default=None, help="Instance to simulate (its objective and limits)")
+    parser.add_argument("--objective", default="your daily workflows", help="Objective when no instance is given")
+    parser.add_argument("--timebox-minutes", type=int, default=10)
+    parser.add_argument("--max-turns", type=int, default=20)
+    parser.add_argument("--interviews", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=50, help="Interviews in progress at once")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="LLM calls in flight at once")
+    parser.add_argument("--turns", type=int, default=6, help="Participant answers per interview")
+    parser.add_argument("--backgrounds", type=Path, default=None, help="File with one persona background per line")
+    parser.add_argument("--transcripts", type=Path, default=None, help="Write one JSON transcript per line here")
+    parser.add_argument("--output", type=Path, default=None, help="Directory for the JSON result file")
+    args = parser.parse_args()
+
+    records, elapsed = asyncio.run(run(args))
+    results = _report(records, elapsed)
+
+    print(f"{results['interviews']} interviews, {results['turns']} turns in {results['elapsed_seconds']}s "
+          f"({results['turns_per_second']} turns/s, {results['errors']} errors)")
+    print(f"interviewer turn p50 {results['interviewer_turn'].get('p50_ms')} ms, "
+          f"p95 {results['interviewer_turn'].get('p95_ms')} ms; "
+          f"LLM slot wait p95 {results['llm_wait'].get('p95_ms')} ms")
+    print(f"fallback rate {results['fallback_rate']}, tokens {results['tokens']}")
+
+    if args.transcripts:
+        with open(args.transcripts, "w") as f:
+            for record in records:
+                f.write(json.dumps({
+                    "participant_id": record["participant_id"],
+                    "background": record["background"],
+                    "messages": record["transcript"],
+                }) + "\n")
+        print(f"transcripts written to {args.transcripts}")
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    path = write_results("simulate_interviews", config, results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
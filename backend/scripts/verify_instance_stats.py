@@ -0,0 +1,61 @@
+"""Check that the trigger-maintained instance_stats table matches a full recompute.
+
+Exits non-zero and lists the differing instances if any counter drifted;
+``--repair`` rebuilds the table from participants and sessions.
+
+    python backend/scripts/verify_instance_stats.py
+    python backend/scripts/verify_instance_stats.py --repair
+"""
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+try:
+    from .init_db import DB_PATH, INSTANCE_STATS_RECOMPUTE, rebuild_instance_stats
+except ImportError:
+    # Run as a file rather than a module
+    from init_db import DB_PATH, INSTANCE_STATS_RECOMPUTE, rebuild_instance_stats
+
+
+def find_mismatches(conn: sqlite3.Connection) -> list:
+    """(instance_id, stored row, recomputed row) for every instance that differs."""
+    conn.row_factory = sqlite3.Row
+    expected = {row["instance_id"]: dict(row) for row in conn.execute(INSTANCE_STATS_RECOMPUTE)}
+    stored = {row["instance_id"]: dict(row) for row in conn.execute("SELECT * FROM instance_stats")}
+    return [
+        (instance_id, stored.get(instance_id), expected.get(instance_id))
+        for instance_id in sorted(expected.keys() | stored.keys())
+        if stored.get(instance_id) != expected.get(instance_id)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify instance_stats against a full recompute.")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--repair", action="store_true", help="Rebuild instance_stats if it differs")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    mismatches = find_mismatches(conn)
+    instances = conn.execute("SELECT COUNT(*) FROM instances").fetchone()[0]
+    if not mismatches:
+        print(f"instance_stats matches a full recompute for all {instances} instances")
+        return
+
+    for instance_id, stored, expected in mismatches:
+        print(f"instance {instance_id}:")
+        for key in (expected or stored):
+            if (stored or {}).get(key) != (expected or {}).get(key):
+                print(f"    {key}: stored {(stored or {}).get(key)}, recomputed {(expected or {}).get(key)}")
+
+    if args.repair:
+        rebuild_instance_stats(conn)
+        conn.commit()
+        print(f"rebuilt instance_stats ({len(mismatches)} instances differed)")
+    else:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Prometheus-style metrics and stage timing for interview turns.
+
+Metrics live in a process-wide registry and are rendered in the Prometheus
+text exposition format at ``/metrics``. Set ``METRICS_ENABLED=false`` to turn
+recording into no-ops.
+"""
+import os
+import threading
+import time
+from typing import Callable
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Latency buckets in seconds, from sub-millisecond DB reads to slow LLM generations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class holding one value per label combination."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> list:
+        """(suffix, label values, extra label, value) tuples for rendering."""
+        with self._lock:
+            return [("", key, "", value) for key, value in self._values.items()]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: dict = {}
+
+    def set(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, callback: Callable[[], float], **labels):
+        """Read the value from ``callback`` whenever metrics are scraped."""
+        with self._lock:
+            self._callbacks[self._key(labels)] = callback
+
+    def samples(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+            callbacks = dict(self._callbacks)
+        for key, callback in callbacks.items():
+            values[key] = callback()
+        return [("", key, "", value) for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (non-cumulative), then sum and count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> list:
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        result = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                result.append(("_bucket", key, f'le="{_format_value(bound)}"', cumulative))
+            result.append(("_bucket", key, 'le="+Inf"', count))
+            result.append(("_sum", key, "", total))
+            result.append(("_count", key, "", count))
+        return result
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# Chat turn instrumentation
+STAGE_SECONDS = histogram(
+    "interview_stage_seconds",
+    "Time spent in each stage of a chat turn",
+    ("stage", "operation"),
+)
+LLM_FALLBACKS = counter(
+    "interview_llm_fallbacks_total",
+    "Turns answered from fallback responses instead of the LLM",
+    ("reason",),
+)
+LLM_TOKENS = counter(
+    "interview_llm_tokens_total",
+    "Tokens sent to and generated by the LLM",
+    ("model", "direction"),
+)
+LLM_HTTP_CONNECTIONS = counter(
+    "interview_llm_http_connections_total",
+    "New connections opened to the LLM server (requests minus these were reused)",
+)
+LLM_HTTP_REQUESTS = counter(
+    "interview_llm_http_requests_total",
+    "HTTP requests sent to the LLM server",
+    ("protocol",),
+)
+LLM_CACHE = counter(
+    "interview_llm_cache_total",
+    "LLM response cache lookups by result (hit, miss)",
+    ("result",),
+)
+LLM_MAX_TOKENS = gauge(
+    "interview_llm_max_tokens",
+    "max_tokens the next completion of each task will request",
+    ("task",),
+)
+ADMISSIONS = counter(
+    "interview_admissions_total",
+    "Participant requests by admission decision (admit, degrade, rate_limited, shed)",
+    ("request_class", "decision"),
+)
+ADMISSION_CHAT_P95 = gauge(
+    "interview_admission_chat_p95_seconds",
+    "Recent p95 latency of LLM-served chat turns, as seen by admission control",
+)
+ACTIVE_SESSIONS = gauge(
+    "interview_active_sessions",
+    "Interview sessions with a live agent in this process",
+)
+EVENTS = counter(
+    "interview_monitor_events_total",
+    "Monitoring events by outcome (published, coalesced, dropped)",
+    ("outcome",),
+)
+EVENT_SUBSCRIBERS = gauge(
+    "interview_monitor_subscribers",
+    "Connected live monitoring streams",
+)
+SESSIONS_EXPIRED = counter(
+    "interview_sessions_expired_total",
+    "Sessions closed by the scheduler, by reason (timebox, idle)",
+    ("reason",),
+)
+ANALYTICS_SNAPSHOT_AGE = gauge(
+    "interview_analytics_snapshot_age_seconds",
+    "Age of the analytics replica (0 before the first snapshot)",
+)
+DB_COALESCED_READS = counter(
+    "interview_db_coalesced_reads_total",
+    "Database reads answered by joining an identical read already in flight",
+    ("operation",),
+)
+AGENT_CACHE_SIZE = gauge(
+    "interview_agent_cache_size",
+    "Agents held in memory, by cache",
+    ("cache",),
+)
+IDEMPOTENT_REQUESTS = counter(
+    "interview_idempotent_requests_total",
+    "Chat submissions with an idempotency key, by outcome (new, joined, replayed, conflict)",
+    ("outcome",),
+)
+
+
+class _Timer:
+    """Context manager observing elapsed time into ``interview_stage_seconds``."""
+
+    __slots__ = ("stage", "operation", "start")
+
+    def __init__(self, stage: str, operation: str):
+        self.stage = stage
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, stage=self.stage, operation=self.operation)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(stage: str, operation: str = ""):
+    """Time a block as one stage of a chat turn.
+
+    Usage: ``with timed("db_read", "get_session"): ...``. Returns a shared
+    no-op context manager when metrics are disabled.
+    """
+    if not METRICS_ENABLED:
+        return _NULL_TIMER
+    return _Timer(stage, operation)
+
+
+def observe_stage(stage: str, seconds: float, operation: str = ""):
+    """Record a stage duration measured elsewhere (e.g. across threads)."""
+    STAGE_SECONDS.observe(seconds, stage=stage, operation=operation)
+
+
+def render_latest() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return REGISTRY.render()
@@ -0,0 +1,240 @@
+"""On-demand sampling profiler for the running server.
+
+Opt-in with ``PROFILING_ENABLED=true``; every endpoint also requires the
+``X-Admin-Token`` header to match ``ADMIN_TOKEN``. A background thread
+samples the Python stacks of all threads (the event loop, aiosqlite's
+connection threads and ``asyncio.to_thread`` workers) and the result is returned in the collapsed-stack format read by
+flamegraph.pl, speedscope and inferno:
+
+    POST /admin/profile?seconds=10
+    POST /admin/profile/requests?route=/api/sessions/{session_id}/chat&count=20
+"""
+import asyncio
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+MAX_PROFILE_SECONDS = 120
+
+# Leaf frames of threads that are blocked rather than running Python code
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("socketserver.py", "serve_forever"),
+}
+
+
+def _thread_label(name: str) -> str:
+    # Fold numbered pool threads ("asyncio_3", "Thread-12 (worker)") into one stack root
+    return re.sub(r"[-_]\d+", "", name)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples all thread stacks at a fixed interval on a background thread."""
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.gate = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if self.gate is not None and not self.gate():
+                continue
+            names = {thread.ident: _thread_label(thread.name) for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if not self.include_idle and (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in _IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[(names.get(thread_id, str(thread_id)), tuple(stack))] += 1
+            self.sample_count += 1
+
+    def collapsed(self, endpoint_code=None, loop_thread: Optional[str] = None) -> str:
+        """Render samples as ``thread;outer;...;inner count`` lines.
+
+        With ``endpoint_code``, stacks on the event-loop thread that are not
+        inside that endpoint are dropped so concurrent requests don't pollute
+        the profile.
+        """
+        folded: Counter = Counter()
+        for (thread_name, stack), count in self.samples.items():
+            if endpoint_code is not None and thread_name == loop_thread and endpoint_code not in stack:
+                continue
+            folded[";".join([thread_name, *(_frame_label(code) for code in stack)])] += count
+        return "\n".join(f"{line} {count}" for line, count in folded.most_common()) + "\n"
+
+
+class RequestCapture:
+    """Profiles the next ``count`` requests whose path matches a route template."""
+
+    def __init__(self, route: str, count: int, method: Optional[str] = None):
+        self.route = route
+        self.method = method.upper() if method else None
+        literal_parts = re.split(r"\{[^}/]+\}", route)
+        self.pattern = re.compile("^" + "[^/]+".join(re.escape(part) for part in literal_parts) + "$")
+        self.remaining = count
+        self.in_flight = 0
+        self.completed = 0
+        self.endpoint_code = None
+        self.done = asyncio.Event()
+
+    def matches(self, scope) -> bool:
+        if self.method and scope.get("method") != self.method:
+            return False
+        return bool(self.pattern.match(scope["path"]))
+
+    def try_start(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        self.in_flight += 1
+        return True
+
+    def finish(self, scope):
+        self.in_flight -= 1
+        self.completed += 1
+        endpoint = scope.get("endpoint")
+        if self.endpoint_code is None and endpoint is not None:
+            self.endpoint_code = getattr(endpoint, "__code__", None)
+        if self.remaining <= 0 and self.in_flight == 0:
+            self.done.set()
+
+
+_lock = asyncio.Lock()
+_active_capture: Optional[RequestCapture] = None
+
+
+class ProfilingMiddleware:
+    """Tracks in-flight requests for an armed per-route capture."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        capture = _active_capture
+        if capture is None or scope["type"] != "http" or not capture.matches(scope) or not capture.try_start():
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            capture.finish(scope)
+
+
+def require_admin(x_admin_token: str = Header(default="")):
+    """Allow only callers presenting ADMIN_TOKEN."""
+    if not ADMIN_TOKEN or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(prefix="/admin/profile", dependencies=[Depends(require_admin)])
+
+
+def _profile_response(sampler: StackSampler, elapsed: float, endpoint_code=None, **headers) -> PlainTextResponse:
+    # Endpoints run on the event-loop thread
+    loop_thread = _thread_label(threading.current_thread().name)
+    return PlainTextResponse(
+        sampler.collapsed(endpoint_code, loop_thread),
+        headers={
+            "X-Profile-Samples": str(sampler.sample_count),
+            "X-Profile-Seconds": f"{elapsed:.3f}",
+            **headers,
+        },
+    )
+
+
+@router.post("")
+async def profile_for_duration(seconds: float = 10.0, interval_ms: float = 5.0, include_idle: bool = False):
+    """Sample the whole process for ``seconds`` and return collapsed stacks."""
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_PROFILE_SECONDS}]")
+    if _lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    async with _lock:
+        sampler = StackSampler(interval_ms / 1000, include_idle)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+        return _profile_response(sampler, time.perf_counter() - start)
+
+
+@router.post("/requests")
+async def profile_requests(
+    route: str,
+    count: int = 10,
+    method: Optional[str] = None,
+    timeout: float = 60.0,
+    interval_ms: float = 5.0,
+):
+    """Sample while the next ``count`` requests to ``route`` run.
+
+    ``route`` is a path template such as ``/api/sessions/{session_id}/chat``.
+    Returns whatever was captured if ``timeout`` expires first.
+    """
+    global _active_capture
+    if count < 1 or not 0 < timeout <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"count must be >= 1 and timeout in (0, {MAX_PROFILE_SECONDS}]")
+    if _lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    async with _lock:
+        capture = RequestCapture(route, count, method)
+        sampler = StackSampler(interval_ms / 1000)
+        sampler.gate = lambda: capture.in_flight > 0
+        _active_capture = capture
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await asyncio.wait_for(capture.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            _active_capture = None
+            sampler.stop()
+        return _profile_response(
+            sampler,
+            time.perf_counter() - start,
+            capture.endpoint_code,
+            **{"X-Profile-Requests": str(capture.completed)},
+        )
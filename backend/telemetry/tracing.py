@@ -0,0 +1,286 @@
+"""Request-scoped tracing spans for routes, DB calls and LLM calls.
+
+Tracing is off unless ``TRACING_ENABLED=true``. Spans follow the
+OpenTelemetry model (trace/span ids, parent links, attributes) and are sent
+to the exporter named by ``TRACING_EXPORTER``:
+
+- ``memory`` (default): keep recent spans in process, served at ``/traces``
+- ``file``: append one JSON object per span to ``TRACING_FILE``
+- ``otel``: hand spans to the OpenTelemetry API (requires ``opentelemetry-api``
+  plus an SDK/exporter configured by the deployment)
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "memory").lower()
+TRACING_FILE = Path(os.getenv("TRACING_FILE", "traces.jsonl"))
+TRACING_MEMORY_SPANS = int(os.getenv("TRACING_MEMORY_SPANS", "10000"))
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_error(self, exc: BaseException):
+        self.status = "error"
+        self.attributes["error.type"] = type(exc).__name__
+        self.attributes["error.message"] = str(exc)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time_ns": self.start_ns,
+            "end_time_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class MemoryExporter:
+    """Keeps the most recent finished spans in a ring buffer."""
+
+    def __init__(self, max_spans: int = TRACING_MEMORY_SPANS):
+        self._spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+
+    def traces(self, limit: int = 20, min_duration_ms: float = 0.0) -> list:
+        """Most recent traces, each with its spans ordered by start time."""
+        with self._lock:
+            spans = list(self._spans)
+        by_trace: dict[str, list] = {}
+        for span in spans:
+            by_trace.setdefault(span.trace_id, []).append(span)
+
+        result = []
+        for trace_id, trace_spans in reversed(by_trace.items()):
+            root = next((s for s in trace_spans if s.parent_id is None), None)
+            if root is None or (root.duration_ms or 0) < min_duration_ms:
+                continue
+            trace_spans.sort(key=lambda s: s.start_ns)
+            result.append({
+                "trace_id": trace_id,
+                "name": root.name,
+                "duration_ms": root.duration_ms,
+                "spans": [s.to_dict() for s in trace_spans],
+            })
+            if len(result) >= limit:
+                break
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+class FileExporter:
+    """Appends finished spans as JSON lines."""
+
+    def __init__(self, path: Path = TRACING_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+def _make_exporter():
+    if TRACING_EXPORTER == "file":
+        return FileExporter()
+    return MemoryExporter()
+
+
+exporter = _make_exporter() if TRACING_ENABLED and TRACING_EXPORTER != "otel" else None
+
+_otel_tracer = None
+if TRACING_ENABLED and TRACING_EXPORTER == "otel":
+    try:
+        from opentelemetry import trace as _otel_trace
+
+        _otel_tracer = _otel_trace.get_tracer("discovery-agent")
+    except ImportError:
+        print("TRACING_EXPORTER=otel but opentelemetry is not installed; using the memory exporter")
+        exporter = MemoryExporter()
+
+
+class _SpanContext:
+    """Context manager that opens a child of the current span."""
+
+    __slots__ = ("name", "attributes", "span", "token")
+
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        self.span = Span(self.name, _current_span.get(), self.attributes)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.span.set_error(exc)
+        self.span.end_ns = time.time_ns()
+        _current_span.reset(self.token)
+        exporter.export(self.span)
+        return False
+
+
+class _OtelSpanContext:
+    """Context manager delegating to the OpenTelemetry API."""
+
+    __slots__ = ("name", "attributes", "manager")
+
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        # OpenTelemetry rejects None attribute values
+        attributes = {k: v for k, v in self.attributes.items() if v is not None}
+        self.manager = _otel_tracer.start_as_current_span(self.name, attributes=attributes)
+        return self.manager.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self.manager.__exit__(exc_type, exc, tb)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_attribute(self, key: str, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attributes):
+    """Open a span as a child of the current one.
+
+    Usage: ``with span("llm.completion", model=model) as s: s.set_attribute(...)``.
+    Returns a shared no-op when tracing is disabled.
+    """
+    if not TRACING_ENABLED:
+        return _NULL_SPAN
+    if _otel_tracer is not None:
+        return _OtelSpanContext(name, attributes)
+    return _SpanContext(name, attributes)
+
+
+def set_attribute(key: str, value):
+    """Set an attribute on the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attribute(key, value)
+    elif _otel_tracer is not None:
+        _otel_trace.get_current_span().set_attribute(key, value)
+
+
+# Arguments copied onto spans when a traced function takes them
+TRACED_ARGUMENTS = ("session_id", "instance_id", "project_id", "participant_id")
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping an async function in a span.
+
+    Arguments named in ``TRACED_ARGUMENTS`` become span attributes.
+    """
+    def decorator(fn):
+        if not TRACING_ENABLED:
+            return fn
+
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+        params = list(inspect.signature(fn).parameters)
+        positions = {arg: params.index(arg) for arg in TRACED_ARGUMENTS if arg in params}
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            attributes = {}
+            for arg, position in positions.items():
+                if arg in kwargs:
+                    attributes[arg] = kwargs[arg]
+                elif position < len(args):
+                    attributes[arg] = args[position]
+            with span(span_name, **attributes):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracedRoute(APIRoute):
+    """API route that opens a root span for every request it handles."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if not TRACING_ENABLED:
+            return handler
+
+        span_name = f"{','.join(sorted(self.methods))} {self.path}"
+
+        async def traced_handler(request):
+            attributes = {"http.route": self.path}
+            for key, value in request.path_params.items():
+                if key in TRACED_ARGUMENTS:
+                    attributes[key] = int(value) if str(value).isdigit() else value
+            with span(span_name, **attributes) as current:
+                try:
+                    response = await handler(request)
+                except HTTPException as e:
+                    current.set_attribute("http.status_code", e.status_code)
+                    raise
+                current.set_attribute("http.status_code", response.status_code)
+                return response
+
+        return traced_handler
@@ -1,4 +1,5 @@
 import { InterviewMessage, InterviewSession } from '../contracts';
+import { postIdempotent } from '@/lib/idempotency';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -78,15 +79,9 @@ export const interviewService = {
     message: string,
     audioInput: boolean = false
   ): Promise<ChatResponse> => {
-    const response = await fetch(`${API_BASE}/api/sessions/${sessionId}/chat`, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({
-        message,
-        audio_input: audioInput,
-      }),
+    const response = await postIdempotent(`${API_BASE}/api/sessions/${sessionId}/chat`, {
+      message,
+      audio_input: audioInput,
     });
     if (!response.ok) {
       const error = await response.json();
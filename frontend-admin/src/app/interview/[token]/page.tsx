@@ -2,6 +2,7 @@
 
 import { use, useEffect, useState, useRef, useCallback } from 'react';
 import { Send, Mic, MicOff, Paperclip, X, FileText, Image, AlertCircle } from 'lucide-react';
+import { postIdempotent } from '@/lib/idempotency';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -209,15 +210,9 @@ export default function InterviewPage({ params }: { params: Promise<{ token: str
     setThinkingMessage(THINKING_MESSAGES[0]);
 
     try {
-      const response = await fetch(`${API_BASE}/api/sessions/${sessionId}/chat`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          message: messageWithContext,
-          audio_input: false,
-        }),
+      const response = await postIdempotent(`${API_BASE}/api/sessions/${sessionId}/chat`, {
+        message: messageWithContext,
+        audio_input: false,
       });
 
       if (!response.ok) {
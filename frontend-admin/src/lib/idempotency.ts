@@ -0,0 +1,28 @@
+/**
+ * Chat submissions with idempotency keys.
+ *
+ * The server runs a message once per key, so resending it after a dropped
+ * connection returns the original answer instead of generating a second turn.
+ */
+
+/** A random key; `crypto.randomUUID` only exists in secure contexts (HTTPS, localhost). */
+export function newIdempotencyKey(): string {
+  if (typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID();
+  }
+  const bytes = crypto.getRandomValues(new Uint8Array(16));
+  return Array.from(bytes, (byte) => byte.toString(16).padStart(2, '0')).join('');
+}
+
+/** POST `body` as JSON under a fresh key, resending it once if the connection fails. */
+export function postIdempotent(url: string, body: Record<string, unknown>): Promise<Response> {
+  const payload = JSON.stringify({ ...body, idempotency_key: newIdempotencyKey() });
+  const send = () => fetch(url, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: payload,
+  });
+  return send().catch(send);
+}
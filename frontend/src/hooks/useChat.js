@@ -1,4 +1,5 @@
 import { useState, useCallback } from 'react';
+import { postIdempotent } from '../lib/idempotency';
 
 const API_BASE = '/api';
 
@@ -49,15 +50,9 @@ export function useChat() {
     setError(null);
 
     try {
-      const response = await fetch(`${API_BASE}/sessions/${sessionId}/chat`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          message: content,
-          audio_input: audioInput,
-        }),
+      const response = await postIdempotent(`${API_BASE}/sessions/${sessionId}/chat`, {
+        message: content,
+        audio_input: audioInput,
       });
 
       if (!response.ok) {